@@ -1,11 +1,41 @@
-from django.db.models import F, Q
+from datetime import datetime
+from typing import Literal
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models import Count, F, Max
+from django.http import StreamingHttpResponse
 from ninja import Router, Schema
 from ninja.errors import HttpError
+from apps.assets.autocomplete import asset_index
+from apps.assets.cache import normalize_search, read_through
+from apps.assets.changes import ChangeToken, changes_since, decode_token
+from apps.assets.counting import count_assets
+from apps.assets.history import candle_history
 from apps.assets.models import Asset
-
+from apps.assets.pagination import (
+    Cursor,
+    InvalidCursor,
+    decode_cursor,
+    encode_cursor,
+    seek_after,
+)
+from apps.assets.search import search_assets
+from apps.assets.serializers import asset_from_row, parse_fields
+from apps.assets.streaming import price_events
+from apps.favorites.models import Favorite
+from apps.portfolio.models import PortfolioItem
+from config.api import render
+from config.budgets import query_budget
+from config.conditional import Fingerprint, conditional
 
 router = Router()
 
+MAX_BATCH_IDS = 100
+MAX_HISTORY_CANDLES = 1000
+MAX_STREAM_IDS = 500
+MAX_CHANGES = 1000
+
 
 class AssetOut(Schema):
     id: str
@@ -18,51 +48,273 @@ class AssetOut(Schema):
     market_cap_rank: int | None = None
 
 
+class AssetSuggestionOut(Schema):
+    id: str
+    symbol: str
+    name: str
+    image: str
+    market_cap_rank: int | None = None
+
+
+class AssetBatchOut(Schema):
+    data: list[AssetOut]
+    missing: list[str]
+
+
+class CandleOut(Schema):
+    time: datetime
+    open: float
+    high: float
+    low: float
+    close: float
+
+
+class AssetChangesOut(Schema):
+    changed: list[AssetOut]
+    deleted: list[str]
+    next: str
+    hasMore: bool
+
+
 class AssetListOut(Schema):
     data: list[AssetOut]
     page: int
     pageSize: int
-    total: int
+    total: int | None = None
     hasMore: bool
+    nextCursor: str | None = None
+
+
+def parse_fields_param(fields: str) -> tuple[str, ...]:
+    try:
+        return parse_fields(fields)
+    except ValueError as exc:
+        raise HttpError(400, f"Unknown fields: {exc}")
+
+
+async def _catalog_fingerprint(request, **kwargs) -> Fingerprint:
+    async def load() -> Fingerprint:
+        stats = await Asset.objects.aaggregate(
+            last_modified=Max("updated_at"), count=Count("pk")
+        )
+        return Fingerprint(**stats)
+
+    # A stale fingerprint would answer 304 for data that has changed.
+    return await read_through("fingerprint", load=load, shared_only=True)
+
+
+async def _asset_fingerprint(request, asset_id: str) -> Fingerprint | None:
+    async def load() -> Fingerprint | None:
+        updated_at = (
+            await Asset.objects.filter(id=asset_id)
+            .values_list("updated_at", flat=True)
+            .afirst()
+        )
+        return Fingerprint(updated_at) if updated_at else None
+
+    return await read_through("fingerprint", asset_id, load=load, shared_only=True)
 
 
 @router.get("", response=AssetListOut)
-def list_assets(
+@query_budget(3)
+@conditional(_catalog_fingerprint, last_modified=False)
+async def list_assets(
     request,
     page: int = 1,
     page_size: int = 20,
     search: str = "",
+    cursor: str | None = None,
+    include_total: bool = True,
+    fields: str = "",
 ):
     page = max(1, page)
     page_size = min(max(1, page_size), 100)
+    search = normalize_search(search)
+    selected = parse_fields_param(fields)
+
+    payload = await read_through(
+        "list",
+        page,
+        page_size,
+        search,
+        cursor or "",
+        include_total,
+        selected,
+        load=lambda: _load_asset_page(
+            page, page_size, search, cursor, include_total, selected
+        ),
+    )
+    return render(request, payload)
+
 
+async def _load_asset_page(
+    page: int,
+    page_size: int,
+    search: str,
+    cursor: str | None,
+    include_total: bool,
+    selected: tuple[str, ...],
+) -> dict:
     qs = Asset.objects.all()
+    ordering = [F("market_cap_rank").asc(nulls_last=True), "symbol", "id"]
     if search:
-        qs = qs.filter(
-            Q(symbol__icontains=search)
-            | Q(name__icontains=search)
-            | Q(id__icontains=search)
-        )
+        qs = search_assets(qs, search)
+        ordering.insert(0, "search_rank")
+
+    qs = qs.order_by(*ordering)
+
+    total = await count_assets(qs, search) if include_total else None
+
+    if cursor:
+        try:
+            position = decode_cursor(cursor)
+        except InvalidCursor:
+            raise HttpError(400, "Invalid cursor")
+        if (position.search_rank is not None) != bool(search):
+            raise HttpError(400, "Cursor does not match search")
+        qs = qs.filter(seek_after(position))
+        offset = 0
+    else:
+        offset = (page - 1) * page_size
 
-    qs = qs.order_by(F("market_cap_rank").asc(nulls_last=True), "symbol")
+    # The cursor needs the ordering columns even when they are not selected.
+    columns = tuple(dict.fromkeys((*selected, "market_cap_rank", "symbol")))
+    if search:
+        columns = (*columns, "search_rank")
+    rows = [
+        row async for row in qs.values_list(*columns)[offset : offset + page_size + 1]
+    ]
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
 
-    total = qs.count()
-    offset = (page - 1) * page_size
-    items = list(qs[offset : offset + page_size])
+    next_cursor = None
+    if has_more and rows:
+        last = dict(zip(columns, rows[-1]))
+        next_cursor = encode_cursor(
+            Cursor(
+                last["market_cap_rank"],
+                last["symbol"],
+                last["id"],
+                last.get("search_rank"),
+            )
+        )
 
     return {
-        "data": items,
+        "data": [asset_from_row(row, fields=selected) for row in rows],
         "page": page,
         "pageSize": page_size,
         "total": total,
-        "hasMore": offset + page_size < total,
+        "hasMore": has_more,
+        "nextCursor": next_cursor,
     }
 
 
+@router.get("/autocomplete", response=list[AssetSuggestionOut])
+@query_budget(5)
+@conditional(_catalog_fingerprint, last_modified=False)
+async def autocomplete_assets(request, q: str = "", limit: int = 10):
+    # Lookups may (re)load the index from the database: reload rows written
+    # here, then on a due check read other processes' writes and the row
+    # count, and rebuild if that disagrees.
+    return await sync_to_async(asset_index.lookup)(q, limit)
+
+
+@router.get("/batch", response=AssetBatchOut)
+@query_budget(2)
+@conditional(_catalog_fingerprint, last_modified=False)
+async def batch_assets(request, ids: str = ""):
+    requested = [part.strip() for part in ids.split(",") if part.strip()]
+    requested = list(dict.fromkeys(requested))
+    if len(requested) > MAX_BATCH_IDS:
+        raise HttpError(400, f"At most {MAX_BATCH_IDS} ids per batch")
+
+    found = await Asset.objects.ain_bulk(requested) if requested else {}
+    return {
+        "data": [found[asset_id] for asset_id in requested if asset_id in found],
+        "missing": [asset_id for asset_id in requested if asset_id not in found],
+    }
+
+
+@router.get("/changes", response=AssetChangesOut)
+@query_budget(2)
+async def asset_changes(request, since: str | None = None, limit: int = 500):
+    try:
+        token = decode_token(since) if since else ChangeToken()
+    except InvalidCursor:
+        raise HttpError(400, "Invalid sync token")
+
+    limit = min(max(1, limit), MAX_CHANGES)
+    return render(request, await changes_since(token, limit))
+
+
+async def _related_asset_ids(model) -> list[str]:
+    return [
+        asset_id async for asset_id in model.objects.values_list("asset_id", flat=True)
+    ]
+
+
+@router.get("/stream")
+@query_budget(2)
+async def stream_prices(
+    request, ids: str = "", favorites: bool = False, portfolio: bool = False
+):
+    if not isinstance(request, ASGIRequest):
+        raise HttpError(501, "Price streaming requires an ASGI server")
+
+    asset_ids = {part.strip() for part in ids.split(",") if part.strip()}
+    if len(asset_ids) > MAX_STREAM_IDS:
+        raise HttpError(400, f"At most {MAX_STREAM_IDS} ids per stream")
+    if favorites:
+        asset_ids.update(await _related_asset_ids(Favorite))
+    if portfolio:
+        asset_ids.update(await _related_asset_ids(PortfolioItem))
+
+    subscribed = asset_ids if ids or favorites or portfolio else None
+    response = StreamingHttpResponse(
+        price_events(subscribed), content_type="text/event-stream"
+    )
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
 @router.get("/{asset_id}", response=AssetOut)
-def get_asset(request, asset_id: str):
-    asset = Asset.objects.filter(id=asset_id).first()
+@query_budget(2)
+@conditional(_asset_fingerprint)
+async def get_asset(request, asset_id: str):
+    asset = await read_through("asset", asset_id, load=lambda: _load_asset(asset_id))
     if not asset:
         raise HttpError(404, "Asset not found")
     return asset
 
+
+async def _load_asset(asset_id: str) -> dict | None:
+    asset = await Asset.objects.filter(id=asset_id).afirst()
+    return AssetOut.from_orm(asset).dict() if asset else None
+
+
+@router.get("/{asset_id}/history", response=list[CandleOut])
+@query_budget(2)
+async def get_asset_history(
+    request,
+    asset_id: str,
+    interval: Literal["1m", "1h", "1d"] = "1h",
+    start: datetime | None = None,
+    end: datetime | None = None,
+    limit: int = 500,
+):
+    limit = min(max(1, limit), MAX_HISTORY_CANDLES)
+    candles = await candle_history(asset_id, interval, start, end, limit)
+    if not candles and not await Asset.objects.filter(id=asset_id).aexists():
+        raise HttpError(404, "Asset not found")
+
+    return [
+        {
+            "time": candle.bucket,
+            "open": candle.open,
+            "high": candle.high,
+            "low": candle.low,
+            "close": candle.close,
+        }
+        for candle in candles
+    ]
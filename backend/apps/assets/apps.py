@@ -9,6 +9,8 @@ class AssetsConfig(AppConfig):
         import os
         from django.conf import settings
 
+        from . import signals  # noqa: F401
+
         if os.getenv("DJANGO_SEED_ASSETS", "true").lower() != "true":
             return
 
@@ -0,0 +1,217 @@
+from __future__ import annotations
+
+import heapq
+import threading
+import time
+from bisect import bisect_left, insort
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from functools import partial
+from typing import Iterable, Iterator, NamedTuple
+
+from django.conf import settings
+from django.db import transaction
+from django.dispatch import receiver
+
+from .cache import catalog_version
+from .models import Asset
+from .signals import assets_changed
+
+_NO_RANK = float("inf")
+
+MAX_LIMIT = 50
+
+# One- and two-character prefixes match a large slice of the catalog, so
+# their top results are memoized until the next change to the index.
+_MEMOIZED_PREFIX_LENGTH = 2
+
+
+@dataclass(frozen=True)
+class Suggestion:
+    id: str
+    symbol: str
+    name: str
+    image: str
+    market_cap_rank: int | None
+
+    @property
+    def sort_key(self) -> tuple:
+        rank = self.market_cap_rank if self.market_cap_rank is not None else _NO_RANK
+        return (rank, self.symbol, self.id)
+
+
+def _index_keys(suggestion: Suggestion) -> set[str]:
+    name = suggestion.name.lower()
+    return {suggestion.symbol.lower(), suggestion.id.lower(), name, *name.split()}
+
+
+class _Snapshot(NamedTuple):
+    keys: list[tuple[str, str]]
+    entries: dict[str, Suggestion]
+    memo: dict[str, list[Suggestion]]
+
+
+class PrefixIndex:
+    """Sorted-array prefix index over asset symbol, id and name words.
+
+    The index is built lazily on the first lookup. Writes reported through
+    `assets_changed` in this process mark ids dirty and only those rows are
+    reloaded on the next lookup; writes without ids trigger a full rebuild.
+
+    Signals do not reach other processes. When the shared catalog version
+    moves without a local write, and otherwise at most every
+    `ASSETS_AUTOCOMPLETE_CHECK_SECONDS` (the cache may be per process), a
+    lookup reloads the rows whose `updated_at` moved past the index's
+    watermark, and rebuilds only when the row count disagrees with the
+    index (deletes). Refreshes swap in a new snapshot rather than mutating
+    the one concurrent lookups may be scanning.
+    """
+
+    _FIELDS = ("id", "symbol", "name", "image", "market_cap_rank")
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._snapshot = _Snapshot([], {}, {})
+        self._built = False
+        self._version: int | None = None
+        self._local_bumps = 0
+        self._dirty: set[str] = set()
+        self._stale = False
+        self._since: datetime | None = None
+        self._checked_at = float("-inf")
+
+    def mark_changed(self, ids: list[str] | None) -> None:
+        with self._lock:
+            self._local_bumps += 1
+            if ids is None:
+                self._stale = True
+            else:
+                self._dirty.update(ids)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._stale = True
+
+    def lookup(self, prefix: str, limit: int = 10) -> list[Suggestion]:
+        prefix = " ".join(prefix.split()).lower()
+        if not prefix:
+            return []
+
+        limit = min(max(1, limit), MAX_LIMIT)
+        self._refresh()
+        snapshot = self._snapshot
+
+        if len(prefix) > _MEMOIZED_PREFIX_LENGTH:
+            return self._scan(snapshot, prefix, limit)
+
+        memo = snapshot.memo
+        if prefix not in memo:
+            memo[prefix] = self._scan(snapshot, prefix, MAX_LIMIT)
+        return memo[prefix][:limit]
+
+    @staticmethod
+    def _scan(snapshot: _Snapshot, prefix: str, limit: int) -> list[Suggestion]:
+        keys, entries, _ = snapshot
+        matched: set[str] = set()
+        position = bisect_left(keys, (prefix, ""))
+        while position < len(keys) and keys[position][0].startswith(prefix):
+            matched.add(keys[position][1])
+            position += 1
+
+        return heapq.nsmallest(
+            limit,
+            (entries[asset_id] for asset_id in matched),
+            key=lambda suggestion: suggestion.sort_key,
+        )
+
+    def _refresh(self) -> None:
+        version = catalog_version()
+        with self._lock:
+            expected = (self._version or 0) + self._local_bumps
+            if not self._built or self._stale:
+                self._rebuild(version)
+            else:
+                if self._dirty:
+                    self._reload(self._dirty)
+                # Another process wrote (or a check is due): read what it
+                # wrote instead of reloading the whole table.
+                if self._check_due(force=version != expected):
+                    self._catch_up(version)
+                self._version = version
+            self._local_bumps = 0
+            self._dirty = set()
+            self._stale = False
+
+    def _check_due(self, force: bool = False) -> bool:
+        now = time.monotonic()
+        interval = settings.ASSETS_AUTOCOMPLETE_CHECK_SECONDS
+        if not force and now - self._checked_at < interval:
+            return False
+        self._checked_at = now
+        return True
+
+    def _rows(self, queryset) -> Iterator[dict]:
+        """Rows of `queryset`, moving the watermark past their updated_at."""
+        for row in queryset.values(*self._FIELDS, "updated_at").iterator():
+            updated_at = row.pop("updated_at")
+            if self._since is None or updated_at > self._since:
+                self._since = updated_at
+            yield row
+
+    def _rebuild(self, version: int) -> None:
+        self._since = None
+        self._checked_at = time.monotonic()
+        entries = {
+            row["id"]: Suggestion(**row) for row in self._rows(Asset.objects.all())
+        }
+        keys = sorted(
+            (key, asset_id)
+            for asset_id, suggestion in entries.items()
+            for key in _index_keys(suggestion)
+        )
+        self._snapshot = _Snapshot(keys, entries, {})
+        self._version = version
+        self._built = True
+
+    def _catch_up(self, version: int) -> None:
+        """Pick up writes from other processes since the last check."""
+        written = Asset.objects.all()
+        if self._since is not None:
+            lag = timedelta(seconds=settings.ASSETS_COMMIT_LAG_SECONDS)
+            written = written.filter(updated_at__gte=self._since - lag)
+        rows = list(self._rows(written))
+        if rows:
+            self._reload({row["id"] for row in rows}, rows)
+        if Asset.objects.count() != len(self._snapshot.entries):
+            self._rebuild(version)
+
+    def _reload(self, ids: set[str], rows: Iterable[dict] | None = None) -> None:
+        # The watermark is left alone: rows written by other processes
+        # before these may not have been read yet.
+        if rows is None:
+            rows = Asset.objects.filter(id__in=ids).values(*self._FIELDS)
+        keys = list(self._snapshot.keys)
+        entries = dict(self._snapshot.entries)
+
+        for asset_id in ids:
+            previous = entries.pop(asset_id, None)
+            if previous is not None:
+                for key in _index_keys(previous):
+                    del keys[bisect_left(keys, (key, asset_id))]
+
+        for row in rows:
+            suggestion = Suggestion(**row)
+            entries[suggestion.id] = suggestion
+            for key in _index_keys(suggestion):
+                insort(keys, (key, suggestion.id))
+
+        self._snapshot = _Snapshot(keys, entries, {})
+
+
+asset_index = PrefixIndex()
+
+
+@receiver(assets_changed)
+def _mark_index_changed(sender, ids=None, **kwargs):
+    # A reload before the commit would read the old rows and clear the mark.
+    transaction.on_commit(partial(asset_index.mark_changed, ids))
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import hashlib
+from typing import Any, Awaitable, Callable
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+CATALOG_VERSION_KEY = "assets:catalog-version"
+
+_MISSING = object()
+
+
+def catalog_version() -> int:
+    return cache.get_or_set(CATALOG_VERSION_KEY, 1, timeout=None)
+
+
+async def acatalog_version() -> int:
+    return await cache.aget_or_set(CATALOG_VERSION_KEY, 1, timeout=None)
+
+
+def bump_catalog_version() -> None:
+    try:
+        cache.incr(CATALOG_VERSION_KEY)
+    except ValueError:
+        cache.set(CATALOG_VERSION_KEY, 2, timeout=None)
+
+
+def is_shared_cache() -> bool:
+    """Whether the default cache is one store for every process, rather than
+    a per-process one that other workers' writes never invalidate."""
+    return not isinstance(caches["default"], (LocMemCache, DummyCache))
+
+
+def normalize_search(search: str) -> str:
+    return " ".join(search.split()).lower()
+
+
+async def versioned_key(prefix: str, *parts: object) -> str:
+    digest = hashlib.md5(
+        "|".join(str(part) for part in parts).encode(), usedforsecurity=False
+    ).hexdigest()
+    return f"assets:{prefix}:v{await acatalog_version()}:{digest}"
+
+
+async def read_through(
+    prefix: str,
+    *parts: object,
+    load: Callable[[], Awaitable[Any]],
+    shared_only: bool = False,
+) -> Any:
+    """Return the cached value for `parts`, awaiting `load()` on a miss.
+
+    Keys embed the catalog version, so every Asset write makes all earlier
+    entries unreachable at once; the backend's TTL and size bound (LRU
+    culling on the default local-memory cache) reclaim them. A per-process
+    cache only sees its own process's writes, so values that must never be
+    stale (`shared_only`) are loaded every time unless the cache is shared.
+    """
+    if shared_only and not is_shared_cache():
+        return await load()
+    key = await versioned_key(prefix, *parts)
+    value = await cache.aget(key, _MISSING)
+    if value is _MISSING:
+        value = await load()
+        await cache.aset(key, value, settings.ASSETS_CACHE_TIMEOUT)
+    return value
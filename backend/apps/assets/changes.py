@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import NamedTuple
+
+from django.conf import settings
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+
+from .models import Asset, AssetTombstone
+from .pagination import InvalidCursor, _pack, _unpack
+from .serializers import ASSET_FIELDS, asset_from_row
+
+
+class ChangeToken(NamedTuple):
+    """Last `(updated_at, id)` of the assets and `(deleted_at, asset_id)`
+    of the tombstones a client has already seen."""
+
+    updated_at: datetime | None = None
+    id: str = ""
+    deleted_at: datetime | None = None
+    deleted_id: str = ""
+
+
+def encode_token(token: ChangeToken) -> str:
+    return _pack(
+        [value.isoformat() if isinstance(value, datetime) else value for value in token]
+    )
+
+
+def decode_token(token: str) -> ChangeToken:
+    values = _unpack(token)
+    try:
+        updated_at, asset_id, deleted_at, deleted_id = values
+        return ChangeToken(
+            datetime.fromisoformat(updated_at) if updated_at else None,
+            str(asset_id),
+            datetime.fromisoformat(deleted_at) if deleted_at else None,
+            str(deleted_id),
+        )
+    except (ValueError, TypeError) as exc:
+        raise InvalidCursor(token) from exc
+
+
+def _after(field: str, key: str, position: datetime | None, last: str) -> Q:
+    if position is None:
+        return Q()
+    return Q(**{f"{field}__gt": position}) | Q(**{field: position, f"{key}__gt": last})
+
+
+async def changes_since(token: ChangeToken, limit: int) -> dict:
+    """Assets written and assets deleted after `token`, oldest first.
+
+    Each list is keyset-paginated on its own timestamp; `hasMore` means
+    either one was cut at `limit` and the client should ask again.
+    """
+    horizon = timezone.now() - timedelta(seconds=settings.ASSETS_CHANGES_SETTLE_SECONDS)
+
+    changed_qs = (
+        Asset.objects.filter(updated_at__lte=horizon)
+        .filter(_after("updated_at", "id", token.updated_at, token.id))
+        .order_by("updated_at", "id")
+        .values_list(*ASSET_FIELDS, "updated_at")
+    )
+    changed = [row async for row in changed_qs[: limit + 1]]
+
+    # An id that was deleted and then created again is reported as changed.
+    deleted_qs = (
+        AssetTombstone.objects.filter(deleted_at__lte=horizon)
+        .filter(_after("deleted_at", "asset_id", token.deleted_at, token.deleted_id))
+        .filter(~Exists(Asset.objects.filter(id=OuterRef("asset_id"))))
+        .order_by("deleted_at", "asset_id")
+        .values_list("asset_id", "deleted_at")
+    )
+    deleted = [row async for row in deleted_qs[: limit + 1]]
+
+    has_more = len(changed) > limit or len(deleted) > limit
+    changed, deleted = changed[:limit], deleted[:limit]
+
+    next_token = token
+    if changed:
+        next_token = next_token._replace(updated_at=changed[-1][-1], id=changed[-1][0])
+    if deleted:
+        next_token = next_token._replace(
+            deleted_at=deleted[-1][1], deleted_id=deleted[-1][0]
+        )
+
+    return {
+        "changed": [asset_from_row(row) for row in changed],
+        "deleted": [asset_id for asset_id, _ in deleted],
+        "next": encode_token(next_token),
+        "hasMore": has_more,
+    }
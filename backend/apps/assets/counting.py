@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import QuerySet
+
+from .cache import versioned_key
+from .models import Asset
+
+
+def estimate_asset_rows() -> int | None:
+    """Planner row estimate for the asset table, or None when unavailable."""
+    if connection.vendor != "postgresql":
+        return None
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+            [Asset._meta.db_table],
+        )
+        row = cursor.fetchone()
+
+    if not row or row[0] < 0:
+        return None
+    return int(row[0])
+
+
+async def count_assets(qs: QuerySet[Asset], search: str = "") -> int:
+    if not search:
+        estimate = await sync_to_async(estimate_asset_rows)()
+        if estimate is not None and estimate >= settings.ASSETS_COUNT_ESTIMATE_MIN_ROWS:
+            return estimate
+
+    key = await versioned_key("count", search)
+    total = await cache.aget(key)
+    if total is None:
+        total = await qs.acount()
+        await cache.aset(key, total, settings.ASSETS_COUNT_CACHE_TIMEOUT)
+    return total
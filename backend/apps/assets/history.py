@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Callable, Iterable
+
+from django.db import transaction
+
+from .models import DayCandle, HourCandle, MinuteCandle, PriceCandle, PriceTick
+
+
+@dataclass(frozen=True)
+class Tick:
+    asset_id: str
+    timestamp: datetime
+    price: Decimal
+
+
+def _minute(ts: datetime) -> datetime:
+    return ts.replace(second=0, microsecond=0)
+
+
+def _hour(ts: datetime) -> datetime:
+    return ts.replace(minute=0, second=0, microsecond=0)
+
+
+def _day(ts: datetime) -> datetime:
+    return ts.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+@dataclass(frozen=True)
+class Rollup:
+    model: type[PriceCandle]
+    truncate: Callable[[datetime], datetime]
+
+
+ROLLUPS: dict[str, Rollup] = {
+    "1m": Rollup(MinuteCandle, _minute),
+    "1h": Rollup(HourCandle, _hour),
+    "1d": Rollup(DayCandle, _day),
+}
+
+_CANDLE_FIELDS = ["open", "high", "low", "close", "open_time", "close_time"]
+
+
+def record_ticks(ticks: Iterable[Tick]) -> int:
+    """Store price ticks and fold them into every OHLC rollup.
+
+    Ticks are deduplicated on (asset, timestamp) and replaying one that is
+    already stored leaves the candles unchanged, so ingestion can safely be
+    retried. Returns the number of distinct ticks processed.
+    """
+    unique: dict[tuple[str, datetime], Tick] = {}
+    for tick in ticks:
+        timestamp = tick.timestamp.astimezone(timezone.utc)
+        unique[(tick.asset_id, timestamp)] = Tick(tick.asset_id, timestamp, tick.price)
+    if not unique:
+        return 0
+
+    batch = list(unique.values())
+    with transaction.atomic():
+        PriceTick.objects.bulk_create(
+            [
+                PriceTick(
+                    asset_id=tick.asset_id, timestamp=tick.timestamp, price=tick.price
+                )
+                for tick in batch
+            ],
+            ignore_conflicts=True,
+            batch_size=1000,
+        )
+        for rollup in ROLLUPS.values():
+            _roll_up(rollup, batch)
+
+    return len(batch)
+
+
+def _roll_up(rollup: Rollup, ticks: list[Tick]) -> None:
+    model = rollup.model
+    candles: dict[tuple[str, datetime], PriceCandle] = {}
+
+    for tick in sorted(ticks, key=lambda t: t.timestamp):
+        key = (tick.asset_id, rollup.truncate(tick.timestamp))
+        candle = candles.get(key)
+        if candle is None:
+            candles[key] = model(
+                asset_id=key[0],
+                bucket=key[1],
+                open=tick.price,
+                high=tick.price,
+                low=tick.price,
+                close=tick.price,
+                open_time=tick.timestamp,
+                close_time=tick.timestamp,
+            )
+        else:
+            candle.high = max(candle.high, tick.price)
+            candle.low = min(candle.low, tick.price)
+            candle.close = tick.price
+            candle.close_time = tick.timestamp
+
+    buckets = [bucket for _, bucket in candles]
+    existing = model.objects.select_for_update().filter(
+        asset_id__in={asset_id for asset_id, _ in candles},
+        bucket__gte=min(buckets),
+        bucket__lte=max(buckets),
+    )
+    for stored in existing:
+        candle = candles.get((stored.asset_id, stored.bucket))
+        if candle is not None:
+            _merge_into(candle, stored)
+
+    model.objects.bulk_create(
+        candles.values(),
+        update_conflicts=True,
+        unique_fields=["asset", "bucket"],
+        update_fields=_CANDLE_FIELDS,
+        batch_size=1000,
+    )
+
+
+def _merge_into(candle: PriceCandle, stored: PriceCandle) -> None:
+    candle.high = max(candle.high, stored.high)
+    candle.low = min(candle.low, stored.low)
+    if stored.open_time <= candle.open_time:
+        candle.open, candle.open_time = stored.open, stored.open_time
+    if stored.close_time >= candle.close_time:
+        candle.close, candle.close_time = stored.close, stored.close_time
+
+
+async def candle_history(
+    asset_id: str,
+    interval: str,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    limit: int = 500,
+) -> list[PriceCandle]:
+    """Most recent `limit` candles of one resolution, oldest first."""
+    qs = ROLLUPS[interval].model.objects.filter(asset_id=asset_id)
+    if start is not None:
+        qs = qs.filter(bucket__gte=start)
+    if end is not None:
+        qs = qs.filter(bucket__lt=end)
+    candles = [candle async for candle in qs.order_by("-bucket")[:limit]]
+    return candles[::-1]
@@ -0,0 +1,249 @@
+from __future__ import annotations
+
+import csv
+import json
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from decimal import Decimal, InvalidOperation
+from functools import partial
+from itertools import islice
+from typing import IO, Iterable, Iterator
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .history import Tick, record_ticks
+from .models import Asset
+from .signals import assets_changed
+
+PRICE_FIELDS = ("current_price", "price_change_percentage_24h", "market_cap_rank")
+
+DEFAULT_BATCH_SIZE = 5000
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class PriceUpdate:
+    id: str
+    current_price: Decimal | None = None
+    price_change_percentage_24h: Decimal | None = None
+    market_cap_rank: int | None = None
+    timestamp: datetime | None = None
+
+
+@dataclass
+class IngestResult:
+    rows: int = 0
+    updated: int = 0
+    missing: list[str] = field(default_factory=list)
+    seconds: float = 0.0
+    # Longest time between stamping a batch's updated_at and its commit.
+    commit_lag: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+def _decimal(value) -> Decimal | None:
+    if value in (None, ""):
+        return None
+    try:
+        return Decimal(str(value))
+    except InvalidOperation:
+        raise ValueError(f"Invalid decimal: {value!r}") from None
+
+
+def _price_update(record: dict) -> PriceUpdate:
+    asset_id = record.get("id")
+    if not asset_id:
+        raise ValueError("Missing asset id")
+
+    rank = record.get("market_cap_rank")
+    rank = int(rank) if rank not in (None, "") else None
+    if rank is not None and rank < 0:
+        raise ValueError(f"Invalid market_cap_rank: {rank}")
+
+    timestamp = record.get("timestamp") or None
+    if timestamp is not None:
+        timestamp = parse_datetime(timestamp)
+        if timestamp is None:
+            raise ValueError(f"Invalid timestamp: {record['timestamp']!r}")
+        if timezone.is_naive(timestamp):
+            timestamp = timezone.make_aware(timestamp)
+
+    return PriceUpdate(
+        id=str(asset_id),
+        current_price=_decimal(record.get("current_price")),
+        price_change_percentage_24h=_decimal(record.get("price_change_percentage_24h")),
+        market_cap_rank=rank,
+        timestamp=timestamp,
+    )
+
+
+def read_updates(stream: IO[str], fmt: str = "ndjson") -> Iterator[PriceUpdate]:
+    """Parse price updates lazily from an NDJSON or CSV (with header) stream.
+
+    A naive `timestamp` is taken to be in the default timezone, as trades
+    are in the ledger.
+    """
+    if fmt == "ndjson":
+        records = ((num, line) for num, line in enumerate(stream, 1) if line.strip())
+        decode = partial(json.loads, parse_float=Decimal)
+    elif fmt == "csv":
+        records = enumerate(csv.DictReader(stream), start=2)
+        decode = dict
+    else:
+        raise ValueError(f"Unsupported format: {fmt}")
+
+    for line_num, raw in records:
+        try:
+            update = _price_update(decode(raw))
+        except (ValueError, TypeError, AttributeError) as exc:
+            raise ValueError(f"Line {line_num}: {exc}") from exc
+        yield update
+
+
+def _batches(updates: Iterable[PriceUpdate], size: int) -> Iterator[list[PriceUpdate]]:
+    iterator = iter(updates)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def ingest_prices(
+    updates: Iterable[PriceUpdate],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    record_history: bool = True,
+) -> IngestResult:
+    """Apply price updates in batches and, optionally, record them as ticks.
+
+    Fields left empty in an update keep their stored value. Updates for ids
+    that are not in the catalog are reported in `missing` and skipped.
+
+    `/api/assets/changes` trusts every row stamped before its settle window
+    to have committed, so each batch stamps `updated_at` in its last
+    statement; a batch whose commit still lags its stamp by more than
+    `ASSETS_CHANGES_SETTLE_SECONDS` is logged and should be made smaller.
+    """
+    result = IngestResult()
+    started = time.perf_counter()
+
+    for batch in _batches(updates, batch_size):
+        received = timezone.now()
+        latest = {update.id: update for update in batch}
+        with transaction.atomic():
+            if connection.vendor == "postgresql":
+                updated = _stage_with_copy(list(latest.values()))
+            else:
+                assets = _load_for_upsert(list(latest.values()))
+                updated = set(assets)
+            if record_history:
+                record_ticks(
+                    Tick(update.id, update.timestamp or received, update.current_price)
+                    for update in batch
+                    if update.current_price is not None and update.id in updated
+                )
+            stamped = timezone.now()
+            if connection.vendor == "postgresql":
+                _apply_staged(updated, stamped)
+            else:
+                _apply_with_upsert(assets)
+        _check_commit_lag(result, timezone.now() - stamped)
+
+        result.rows += len(batch)
+        result.updated += len(updated)
+        result.missing.extend(sorted(latest.keys() - updated))
+
+    result.seconds = time.perf_counter() - started
+    return result
+
+
+def _check_commit_lag(result: IngestResult, lag: timedelta) -> None:
+    seconds = lag.total_seconds()
+    result.commit_lag = max(result.commit_lag, seconds)
+    if seconds > settings.ASSETS_CHANGES_SETTLE_SECONDS:
+        logger.warning(
+            "Price batch committed %.2fs after stamping updated_at, past the "
+            "%ss ASSETS_CHANGES_SETTLE_SECONDS; lower the batch size",
+            seconds,
+            settings.ASSETS_CHANGES_SETTLE_SECONDS,
+        )
+
+
+def _load_for_upsert(batch: list[PriceUpdate]) -> dict[str, Asset]:
+    assets = Asset.objects.in_bulk([update.id for update in batch])
+    for update in batch:
+        asset = assets.get(update.id)
+        if asset is None:
+            continue
+        for name in PRICE_FIELDS:
+            value = getattr(update, name)
+            if value is not None:
+                setattr(asset, name, value)
+    return assets
+
+
+def _apply_with_upsert(assets: dict[str, Asset]) -> None:
+    # updated_at is stamped by auto_now as the statement is compiled.
+    # bulk_update() compiles one CASE per field and row, which is far slower
+    # than letting INSERT ... ON CONFLICT DO UPDATE rewrite the rows.
+    Asset.objects.bulk_create(
+        assets.values(),
+        update_conflicts=True,
+        unique_fields=["id"],
+        update_fields=[*PRICE_FIELDS, "updated_at"],
+    )
+
+
+def _stage_with_copy(batch: list[PriceUpdate]) -> set[str]:
+    """COPY the batch into a staging table; the ids found in the catalog."""
+    table = Asset._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "CREATE TEMP TABLE IF NOT EXISTS asset_price_staging ("
+            " id varchar(64) PRIMARY KEY,"
+            " current_price numeric(20, 8),"
+            " price_change_percentage_24h numeric(10, 4),"
+            " market_cap_rank integer"
+            ") ON COMMIT DELETE ROWS"
+        )
+        with cursor.copy(
+            "COPY asset_price_staging (id, current_price,"
+            " price_change_percentage_24h, market_cap_rank) FROM STDIN"
+        ) as copy:
+            for update in batch:
+                copy.write_row(
+                    (
+                        update.id,
+                        update.current_price,
+                        update.price_change_percentage_24h,
+                        update.market_cap_rank,
+                    )
+                )
+        cursor.execute(
+            f"SELECT s.id FROM asset_price_staging AS s JOIN {table} AS a"
+            " ON a.id = s.id"
+        )
+        return {row[0] for row in cursor.fetchall()}
+
+
+def _apply_staged(updated: set[str], now: datetime) -> None:
+    table = Asset._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"UPDATE {table} AS a SET"
+            " current_price = COALESCE(s.current_price, a.current_price),"
+            " price_change_percentage_24h = COALESCE("
+            "s.price_change_percentage_24h, a.price_change_percentage_24h),"
+            " market_cap_rank = COALESCE(s.market_cap_rank, a.market_cap_rank),"
+            " updated_at = %s"
+            " FROM asset_price_staging AS s WHERE a.id = s.id",
+            [now],
+        )
+    if updated:
+        assets_changed.send(sender=Asset, ids=sorted(updated))
@@ -0,0 +1,63 @@
+import sys
+from contextlib import ExitStack
+from itertools import chain
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.assets.ingest import DEFAULT_BATCH_SIZE, ingest_prices, read_updates
+
+
+class Command(BaseCommand):
+    help = "Apply price updates from NDJSON/CSV files or stdin"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "paths", nargs="*", help="Files to read; '-' or nothing reads stdin"
+        )
+        parser.add_argument("--format", choices=["ndjson", "csv"])
+        parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument(
+            "--no-history",
+            action="store_true",
+            help="Do not record the prices as history ticks",
+        )
+
+    def handle(self, *args, **options):
+        paths = options["paths"] or ["-"]
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be positive")
+
+        with ExitStack() as stack:
+            sources = []
+            for path in paths:
+                if path == "-":
+                    stream, fmt = sys.stdin, options["format"] or "ndjson"
+                else:
+                    try:
+                        stream = stack.enter_context(open(path, newline=""))
+                    except OSError as exc:
+                        raise CommandError(str(exc)) from exc
+                    suffix = Path(path).suffix.lstrip(".").lower()
+                    fmt = options["format"] or ("csv" if suffix == "csv" else "ndjson")
+                sources.append(read_updates(stream, fmt))
+
+            try:
+                result = ingest_prices(
+                    chain.from_iterable(sources),
+                    batch_size=options["batch_size"],
+                    record_history=not options["no_history"],
+                )
+            except ValueError as exc:
+                raise CommandError(str(exc)) from exc
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{result.rows} rows, {result.updated} updated in "
+                f"{result.seconds:.2f}s ({result.rows_per_second:,.0f} rows/sec)"
+            )
+        )
+        if result.missing:
+            self.stdout.write(
+                self.style.WARNING(f"{len(result.missing)} unknown asset ids skipped")
+            )
@@ -1,15 +1,148 @@
-from django.core.management.base import BaseCommand
+import time
+from datetime import timedelta
+from itertools import islice
 
-from apps.assets.seed import seed_assets_if_empty
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apps.assets.history import record_ticks
+from apps.assets.models import Asset
+from apps.assets.seed import (
+    SYNTHETIC_ID_PREFIX,
+    insert_batched,
+    seed_assets_if_empty,
+    synthetic_assets,
+    synthetic_sample,
+    synthetic_ticks,
+)
+from apps.favorites.models import Favorite
+from apps.portfolio.models import PortfolioItem, PortfolioTransaction
+
+# How many assets get price history when no favorites or portfolio items
+# are generated to pick them from.
+DEFAULT_HISTORY_ASSETS = 20
+
+HISTORY_STEP = timedelta(hours=1)
 
 
 class Command(BaseCommand):
     help = "Seed the assets"
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--count",
+            type=int,
+            help="Generate this many synthetic assets instead of the demo catalog",
+        )
+        parser.add_argument("--favorites", type=int, default=0)
+        parser.add_argument("--portfolio-items", type=int, default=0)
+        parser.add_argument(
+            "--history-days",
+            type=int,
+            default=0,
+            help="Hourly price history for the favorite and portfolio assets",
+        )
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--seed", type=int, default=42)
+
     def handle(self, *args, **options):
-        inserted = seed_assets_if_empty()
-        if inserted:
-            self.stdout.write(self.style.SUCCESS("seeded"))
-        else:
-            self.stdout.write("assets exists. skipping...")
+        if options["count"] is None:
+            inserted = seed_assets_if_empty()
+            if inserted:
+                self.stdout.write(self.style.SUCCESS("seeded"))
+            else:
+                self.stdout.write("assets exists. skipping...")
+            return
+
+        count = options["count"]
+        batch_size = options["batch_size"]
+        seed = options["seed"]
+        if count < 1 or batch_size < 1:
+            raise CommandError("--count and --batch-size must be positive")
+
+        self._insert("assets", Asset, synthetic_assets(count, seed), batch_size)
+
+        favorite_ids = synthetic_sample(count, options["favorites"], seed + 1)
+        if favorite_ids:
+            self._insert(
+                "favorites",
+                Favorite,
+                (Favorite(asset_id=asset_id) for asset_id in favorite_ids),
+                batch_size,
+            )
+
+        portfolio_ids = synthetic_sample(count, options["portfolio_items"], seed + 2)
+        if portfolio_ids:
+            # Assets that already have a position keep it, and their ledger,
+            # so a second run does not write entries for items never inserted.
+            portfolio_prices = Asset.objects.filter(
+                id__in=portfolio_ids, portfolio_item__isnull=True
+            ).values_list("id", "current_price")
+            now = timezone.now()
+            items = [
+                PortfolioItem(
+                    asset_id=asset_id,
+                    quantity=index % 50 + 1,
+                    avg_price=price,
+                    last_executed_at=now,
+                )
+                for index, (asset_id, price) in enumerate(sorted(portfolio_prices))
+            ]
+            self._insert("portfolio items", PortfolioItem, items, batch_size)
+            self._insert(
+                "portfolio transactions",
+                PortfolioTransaction,
+                (
+                    PortfolioTransaction(
+                        portfolio_item_id=item.id,
+                        side=PortfolioTransaction.Side.ADJUST,
+                        quantity=item.quantity,
+                        price=item.avg_price,
+                        executed_at=now,
+                    )
+                    for item in items
+                ),
+                batch_size,
+            )
+
+        if options["history_days"] > 0:
+            history_ids = sorted({*favorite_ids, *portfolio_ids}) or list(
+                Asset.objects.filter(
+                    id__startswith=SYNTHETIC_ID_PREFIX, market_cap_rank__isnull=False
+                )
+                .order_by("market_cap_rank")
+                .values_list("id", flat=True)[:DEFAULT_HISTORY_ASSETS]
+            )
+            prices = dict(
+                Asset.objects.filter(id__in=history_ids).values_list(
+                    "id", "current_price"
+                )
+            )
+            self._record_history(
+                synthetic_ticks(prices, options["history_days"], HISTORY_STEP, seed),
+                batch_size,
+            )
+
+    def _insert(self, label, model, objs, batch_size):
+        started = time.perf_counter()
+        total = 0
+        for inserted in insert_batched(model, objs, batch_size):
+            total += inserted
+            self.stdout.write(f"  {label}: {total}", ending="\r")
+        self._report(label, total, time.perf_counter() - started)
+
+    def _record_history(self, ticks, batch_size):
+        started = time.perf_counter()
+        total = 0
+        while batch := list(islice(ticks, batch_size)):
+            total += record_ticks(batch)
+            self.stdout.write(f"  price ticks: {total}", ending="\r")
+        self._report("price ticks", total, time.perf_counter() - started)
 
+    def _report(self, label, total, seconds):
+        rate = total / seconds if seconds else 0
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{label}: {total} rows in {seconds:.2f}s ({rate:,.0f} rows/sec)"
+            )
+        )
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        (
+            "assets",
+            "0002_rename_assets_asse_status_7fb64f_idx_assets_asse_status_3b4017_idx",
+        ),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="asset",
+            index=models.Index(
+                fields=["market_cap_rank", "symbol", "id"],
+                name="assets_asse_market__667051_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("assets", "0004_asset_trigram_search_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="asset",
+            index=models.Index(
+                fields=["updated_at"], name="assets_asse_updated_16bcc3_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("assets", "0006_price_history"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AssetTombstone",
+            fields=[
+                (
+                    "asset_id",
+                    models.CharField(max_length=64, primary_key=True, serialize=False),
+                ),
+                ("deleted_at", models.DateTimeField()),
+            ],
+        ),
+        migrations.RemoveIndex(
+            model_name="asset",
+            name="assets_asse_updated_16bcc3_idx",
+        ),
+        migrations.AddIndex(
+            model_name="asset",
+            index=models.Index(
+                fields=["updated_at", "id"], name="assets_asse_updated_8eccb3_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="assettombstone",
+            index=models.Index(
+                fields=["deleted_at", "asset_id"], name="assets_asse_deleted_fd9eee_idx"
+            ),
+        ),
+    ]
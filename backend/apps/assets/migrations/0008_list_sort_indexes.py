@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("assets", "0007_asset_changes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="asset",
+            index=models.Index(
+                fields=["price_change_percentage_24h", "id"],
+                name="assets_asse_price_c_994cb2_idx",
+            ),
+        ),
+    ]
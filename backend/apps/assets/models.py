@@ -1,4 +1,45 @@
+from contextvars import ContextVar
+
 from django.db import models
+from django.utils import timezone
+
+from .signals import assets_changed
+
+# bulk_update() issues plain update() calls internally; it reports the
+# touched ids itself, so the nested updates must stay silent.
+_in_bulk_update: ContextVar[bool] = ContextVar("_in_bulk_update", default=False)
+
+
+class AssetQuerySet(models.QuerySet):
+    def update(self, **kwargs):
+        kwargs.setdefault("updated_at", timezone.now())
+        rows = super().update(**kwargs)
+        if rows and not _in_bulk_update.get():
+            assets_changed.send(sender=self.model, ids=None)
+        return rows
+
+    def bulk_update(self, objs, fields, batch_size=None):
+        objs = list(objs)
+        if "updated_at" not in fields:
+            now = timezone.now()
+            for obj in objs:
+                obj.updated_at = now
+            fields = [*fields, "updated_at"]
+        token = _in_bulk_update.set(True)
+        try:
+            rows = super().bulk_update(objs, fields, batch_size=batch_size)
+        finally:
+            _in_bulk_update.reset(token)
+        if rows:
+            assets_changed.send(sender=self.model, ids=[obj.pk for obj in objs])
+        return rows
+
+    def bulk_create(self, objs, *args, **kwargs):
+        created = super().bulk_create(objs, *args, **kwargs)
+        if created:
+            assets_changed.send(sender=self.model, ids=[obj.pk for obj in created])
+        return created
+
 
 class Asset(models.Model):
     class Status(models.TextChoices):
@@ -25,11 +66,73 @@ class Asset(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = AssetQuerySet.as_manager()
+
     class Meta:
         indexes = [
             models.Index(fields=["status", "symbol"]),
+            models.Index(fields=["market_cap_rank", "symbol", "id"]),
+            models.Index(fields=["price_change_percentage_24h", "id"]),
+            models.Index(fields=["updated_at", "id"]),
         ]
 
     def __str__(self) -> str:
         return f"{self.symbol.upper()} - {self.name}"
 
+
+class AssetTombstone(models.Model):
+    """Records a deleted asset so syncing clients can drop it too."""
+
+    asset_id = models.CharField(primary_key=True, max_length=64)
+    deleted_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["deleted_at", "asset_id"]),
+        ]
+
+
+class PriceTick(models.Model):
+    pk = models.CompositePrimaryKey("asset_id", "timestamp")
+    asset = models.ForeignKey(
+        Asset, on_delete=models.CASCADE, related_name="price_ticks", db_index=False
+    )
+    timestamp = models.DateTimeField()
+    price = models.DecimalField(max_digits=20, decimal_places=8)
+
+    def __str__(self) -> str:
+        return f"{self.asset_id} @ {self.timestamp.isoformat()}: {self.price}"
+
+
+class PriceCandle(models.Model):
+    """OHLC rollup of the ticks in [bucket, bucket + interval).
+
+    `open_time`/`close_time` record which ticks set `open`/`close`, so late
+    or replayed ticks merge correctly into an existing candle.
+    """
+
+    pk = models.CompositePrimaryKey("asset_id", "bucket")
+    asset = models.ForeignKey(Asset, on_delete=models.CASCADE, db_index=False)
+    bucket = models.DateTimeField()
+
+    open = models.DecimalField(max_digits=20, decimal_places=8)
+    high = models.DecimalField(max_digits=20, decimal_places=8)
+    low = models.DecimalField(max_digits=20, decimal_places=8)
+    close = models.DecimalField(max_digits=20, decimal_places=8)
+    open_time = models.DateTimeField()
+    close_time = models.DateTimeField()
+
+    class Meta:
+        abstract = True
+
+
+class MinuteCandle(PriceCandle):
+    pass
+
+
+class HourCandle(PriceCandle):
+    pass
+
+
+class DayCandle(PriceCandle):
+    pass
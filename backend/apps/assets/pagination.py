@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import base64
+import json
+from typing import Callable, NamedTuple
+
+from django.core.exceptions import ValidationError
+from django.db.models import Expression, F, Q, QuerySet
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def _pack(values: list) -> str:
+    """URL-safe token for a list of JSON values."""
+    payload = json.dumps(values, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def _unpack(token: str) -> list:
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded))
+    except ValueError as exc:
+        raise InvalidCursor(token) from exc
+    if not isinstance(values, list):
+        raise InvalidCursor(token)
+    return values
+
+
+class Cursor(NamedTuple):
+    market_cap_rank: int | None
+    symbol: str
+    id: str
+    search_rank: int | None = None
+
+
+def encode_cursor(position: Cursor) -> str:
+    values = list(position)
+    if position.search_rank is None:
+        values.pop()
+    return _pack(values)
+
+
+def decode_cursor(cursor: str) -> Cursor:
+    try:
+        decoded = Cursor(*_unpack(cursor))
+    except TypeError as exc:
+        raise InvalidCursor(cursor) from exc
+
+    for value in (decoded.market_cap_rank, decoded.search_rank):
+        if value is not None and not isinstance(value, int):
+            raise InvalidCursor(cursor)
+    if not isinstance(decoded.symbol, str) or not isinstance(decoded.id, str):
+        raise InvalidCursor(cursor)
+
+    return decoded
+
+
+def seek_after(cursor: Cursor) -> Q:
+    """Rows strictly after the cursor in
+    `[search_rank,] market_cap_rank NULLS LAST, symbol, id`."""
+    same_rank_after = Q(symbol__gt=cursor.symbol) | Q(
+        symbol=cursor.symbol, id__gt=cursor.id
+    )
+
+    if cursor.market_cap_rank is None:
+        after = Q(market_cap_rank__isnull=True) & same_rank_after
+    else:
+        after = (
+            Q(market_cap_rank__gt=cursor.market_cap_rank)
+            | Q(market_cap_rank__isnull=True)
+            | (Q(market_cap_rank=cursor.market_cap_rank) & same_rank_after)
+        )
+
+    if cursor.search_rank is None:
+        return after
+    return Q(search_rank__gt=cursor.search_rank) | (
+        Q(search_rank=cursor.search_rank) & after
+    )
+
+
+class SortKey(NamedTuple):
+    """A `sort=` option: the field path or expression to order by and how
+    to read its value back from a cursor."""
+
+    expression: str | Expression
+    parse: Callable[[str], object]
+
+
+class Keyset(NamedTuple):
+    sort: str
+    value: str | None
+    id: str
+
+
+def encode_keyset(sort: str, value, pk) -> str:
+    return _pack([sort, None if value is None else str(value), str(pk)])
+
+
+def decode_keyset(cursor: str) -> Keyset:
+    try:
+        decoded = Keyset(*_unpack(cursor))
+    except TypeError as exc:
+        raise InvalidCursor(cursor) from exc
+
+    if not all(isinstance(value, (str, type(None))) for value in decoded):
+        raise InvalidCursor(cursor)
+    return decoded
+
+
+def sort_rows(
+    qs: QuerySet, keys: dict[str, SortKey], sort: str, cursor: str | None = None
+) -> QuerySet:
+    """Order `qs` by `sort` (a key of `keys`, `-` prefixed for descending),
+    nulls last with the primary key breaking ties, and seek past `cursor`.
+
+    The sort value is annotated as `sort_value` so pages can select it for
+    the next cursor.
+    """
+    name = sort.removeprefix("-")
+    descending = sort != name
+    key = keys[name]
+    expression = (
+        F(key.expression) if isinstance(key.expression, str) else key.expression
+    )
+    order = (
+        F("sort_value").desc(nulls_last=True)
+        if descending
+        else F("sort_value").asc(nulls_last=True)
+    )
+    qs = qs.annotate(sort_value=expression).order_by(order, "id")
+    if not cursor:
+        return qs
+
+    position = decode_keyset(cursor)
+    if position.sort != sort or position.id is None:
+        raise InvalidCursor(cursor)
+    try:
+        pk = qs.model._meta.pk.to_python(position.id)
+        value = None if position.value is None else key.parse(position.value)
+    except (ValidationError, ValueError, ArithmeticError) as exc:
+        raise InvalidCursor(cursor) from exc
+
+    if value is None:
+        return qs.filter(sort_value__isnull=True, id__gt=pk)
+    beyond = Q(sort_value__lt=value) if descending else Q(sort_value__gt=value)
+    return qs.filter(
+        beyond | Q(sort_value__isnull=True) | Q(sort_value=value, id__gt=pk)
+    )
+
+
+def split_page(rows: list, limit: int, sort: str) -> tuple[list, str | None]:
+    """Trim rows fetched with one extra (`[: limit + 1]`) to the page and
+    return the cursor of the next one. Rows start with the primary key and
+    end with `sort_value`."""
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_keyset(sort, rows[-1][-1], rows[-1][0])
+
+
+def link_next_page(request, response, cursor: str | None):
+    """Point at the next page from the headers, leaving array bodies as-is."""
+    if cursor is not None:
+        query = request.GET.copy()
+        query["cursor"] = cursor
+        response["Link"] = f'<{request.path}?{query.urlencode()}>; rel="next"'
+        response[NEXT_CURSOR_HEADER] = cursor
+    return response
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+from django.db import connection
+from django.db.models import Case, IntegerField, Q, QuerySet, Value, When
+from django.db.models.functions import Upper
+
+from .models import Asset
+
+EXACT, PREFIX, CONTAINS, FUZZY = range(4)
+
+# Trigram similarity on one or two characters matches almost everything.
+FUZZY_MIN_LENGTH = 3
+
+
+def supports_fuzzy_search() -> bool:
+    return connection.vendor == "postgresql"
+
+
+def search_assets(qs: QuerySet[Asset], term: str) -> QuerySet[Asset]:
+    """Filter `qs` to assets matching `term`, annotated with `search_rank`.
+
+    Substring matches go through `UPPER(col) LIKE`, which the trigram GIN
+    indexes from migration 0004 serve on Postgres. There, names that are
+    only close to the term (typos, partial words) are also returned via
+    pg_trgm word similarity. Other backends get the substring match only.
+    """
+    contains = (
+        Q(symbol__icontains=term) | Q(name__icontains=term) | Q(id__icontains=term)
+    )
+    match = contains
+
+    if supports_fuzzy_search() and len(term) >= FUZZY_MIN_LENGTH:
+        qs = qs.alias(name_upper=Upper("name"))
+        match |= Q(name_upper__trigram_word_similar=term.upper())
+
+    return qs.filter(match).annotate(
+        search_rank=Case(
+            When(Q(symbol__iexact=term) | Q(id__iexact=term), then=Value(EXACT)),
+            When(
+                Q(symbol__istartswith=term)
+                | Q(name__istartswith=term)
+                | Q(id__istartswith=term),
+                then=Value(PREFIX),
+            ),
+            When(contains, then=Value(CONTAINS)),
+            default=Value(FUZZY),
+            output_field=IntegerField(),
+        )
+    )
@@ -1,13 +1,18 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from datetime import timedelta
 from decimal import Decimal
+from itertools import islice
+import math
 import random
-from typing import Iterable
+from typing import Iterable, Iterator
 
-from django.db import transaction
+from django.db import models, transaction
 from django.db.utils import OperationalError, ProgrammingError
+from django.utils import timezone
 
+from .history import Tick
 from .models import Asset
 
 
@@ -210,3 +215,120 @@ def seed_assets_if_empty() -> bool:
 
     return True
 
+
+SYNTHETIC_ID_PREFIX = "synthetic-"
+
+_NAME_SYLLABLES = [
+    "bit",
+    "coin",
+    "chain",
+    "nova",
+    "lum",
+    "ether",
+    "sol",
+    "quant",
+    "zen",
+    "hex",
+    "astra",
+    "flux",
+    "orbi",
+    "terra",
+    "vex",
+    "kai",
+    "mint",
+    "pulse",
+    "arc",
+    "byte",
+]
+_NAME_SUFFIXES = ["", " Coin", " Token", " Protocol", " Network", " Finance", " Chain"]
+
+# Share of the synthetic catalog that gets a market cap rank; like real
+# listings, the long tail of tiny assets is unranked.
+_RANKED_SHARE = 0.6
+
+
+def synthetic_asset_id(index: int) -> str:
+    return f"{SYNTHETIC_ID_PREFIX}{index}"
+
+
+def _synthetic_symbol(index: int) -> str:
+    letters = ""
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(ord("a") + remainder) + letters
+    return f"x{letters}"
+
+
+def synthetic_assets(count: int, seed: int = 42) -> Iterator[Asset]:
+    """Deterministic catalog of `count` assets, best ranked first.
+
+    Prices follow a log-normal distribution that shrinks with rank, and
+    24h changes are normally distributed with fatter swings in the tail.
+    """
+    rng = random.Random(seed)
+    ranked = math.ceil(count * _RANKED_SHARE)
+
+    for index in range(count):
+        rank = index + 1 if index < ranked else None
+        depth = math.log10(index + 1)
+        name = "".join(rng.choice(_NAME_SYLLABLES) for _ in range(2)).title()
+        price = rng.lognormvariate(6 - 2 * depth, 2)
+        change = rng.gauss(0, 2 + depth)
+        yield Asset(
+            id=synthetic_asset_id(index),
+            symbol=_synthetic_symbol(index),
+            name=f"{name}{rng.choice(_NAME_SUFFIXES)}",
+            image=f"https://example.com/synthetic/{index}.png",
+            status=_status_from_rank(index + 1),
+            current_price=Decimal(f"{min(max(price, 1e-8), 1e9):.8f}"),
+            price_change_percentage_24h=Decimal(f"{max(min(change, 999), -99):.4f}"),
+            market_cap_rank=rank,
+        )
+
+
+def synthetic_sample(count: int, size: int, seed: int) -> list[str]:
+    """`size` distinct synthetic asset ids, biased towards the top ranks."""
+    rng = random.Random(seed)
+    size = min(size, count)
+    chosen: set[int] = set()
+    while len(chosen) < size:
+        if rng.random() < 0.5:
+            chosen.add(min(int(rng.paretovariate(0.5)) - 1, count - 1))
+        else:
+            chosen.add(rng.randrange(count))
+    return [synthetic_asset_id(index) for index in sorted(chosen)]
+
+
+def synthetic_ticks(
+    prices: dict[str, Decimal], days: int, step: timedelta, seed: int = 42
+) -> Iterator[Tick]:
+    """Random-walk ticks over the last `days` days ending at `prices`."""
+    rng = random.Random(seed)
+    end = timezone.now().replace(second=0, microsecond=0)
+    steps = int(timedelta(days=days) / step)
+
+    for asset_id, price in sorted(prices.items()):
+        value = float(price or 1)
+        walk = [value]
+        for _ in range(steps - 1):
+            value /= math.exp(rng.gauss(0, 0.01))
+            walk.append(value)
+        for offset, value in enumerate(walk):
+            yield Tick(
+                asset_id,
+                end - offset * step,
+                Decimal(f"{max(value, 1e-8):.8f}"),
+            )
+
+
+def insert_batched(
+    model: type[models.Model], objs: Iterable[models.Model], batch_size: int
+) -> Iterator[int]:
+    """Insert `objs` one batch at a time, yielding each batch's size so
+    callers can report progress without materializing the whole stream."""
+    iterator = iter(objs)
+    while batch := list(islice(iterator, batch_size)):
+        with transaction.atomic():
+            model.objects.bulk_create(batch, ignore_conflicts=True)
+        yield len(batch)
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+from decimal import Decimal
+
+# Column order shared by every `values_list()` fast path; must stay aligned
+# with the fields of `AssetOut`.
+ASSET_FIELDS = (
+    "id",
+    "symbol",
+    "name",
+    "image",
+    "status",
+    "current_price",
+    "price_change_percentage_24h",
+    "market_cap_rank",
+)
+
+
+_DECIMAL_FIELDS = frozenset({"current_price", "price_change_percentage_24h"})
+
+
+def related_fields(
+    relation: str, fields: Sequence[str] = ASSET_FIELDS
+) -> tuple[str, ...]:
+    return tuple(f"{relation}__{field}" for field in fields)
+
+
+def to_float(value: Decimal | None) -> float | None:
+    return None if value is None else float(value)
+
+
+def parse_fields(fields: str) -> tuple[str, ...]:
+    """Resolve a comma-separated `fields=` value to a subset of
+    `ASSET_FIELDS`, in canonical order and always including `id`."""
+    requested = {field.strip() for field in fields.split(",") if field.strip()}
+    if not requested:
+        return ASSET_FIELDS
+
+    unknown = requested.difference(ASSET_FIELDS)
+    if unknown:
+        raise ValueError(", ".join(sorted(unknown)))
+
+    return tuple(field for field in ASSET_FIELDS if field == "id" or field in requested)
+
+
+def asset_from_row(
+    row: Sequence, start: int = 0, fields: Sequence[str] = ASSET_FIELDS
+) -> dict:
+    """Build an `AssetOut`-shaped dict from `fields` values at `start`."""
+    asset = dict(zip(fields, row[start : start + len(fields)]))
+    for field in _DECIMAL_FIELDS.intersection(asset):
+        asset[field] = to_float(asset[field])
+    return asset
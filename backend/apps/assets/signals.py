@@ -0,0 +1,36 @@
+from django.apps import apps
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+from django.utils import timezone
+
+from .cache import bump_catalog_version
+
+# Sent after any write to Asset rows, including bulk and queryset updates
+# that bypass post_save. `ids` lists the touched primary keys, or is None
+# when they are not known (e.g. QuerySet.update).
+assets_changed = Signal()
+
+
+@receiver(post_save, sender="assets.Asset")
+@receiver(post_delete, sender="assets.Asset")
+def _asset_row_changed(sender, instance, **kwargs):
+    assets_changed.send(sender=sender, ids=[instance.pk])
+
+
+@receiver(post_delete, sender="assets.Asset")
+def _record_tombstone(sender, instance, **kwargs):
+    tombstone = apps.get_model("assets", "AssetTombstone")
+    tombstone.objects.bulk_create(
+        [tombstone(asset_id=instance.pk, deleted_at=timezone.now())],
+        update_conflicts=True,
+        unique_fields=["asset_id"],
+        update_fields=["deleted_at"],
+    )
+
+
+@receiver(assets_changed)
+def _invalidate_catalog_cache(sender, **kwargs):
+    # Bumped inside the writer's transaction, the version would let readers
+    # cache the old rows under the new key until it commits.
+    transaction.on_commit(bump_catalog_version)
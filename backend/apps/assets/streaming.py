@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Iterable
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import Asset
+from .serializers import to_float
+
+# Upper bound, in seconds, of the wait between polls after failures.
+_MAX_BACKOFF = 30.0
+
+logger = logging.getLogger(__name__)
+
+_DELTA_FIELDS = ("id", "current_price", "price_change_percentage_24h")
+
+
+def _delta(row: dict) -> dict:
+    return {
+        "id": row["id"],
+        "current_price": to_float(row["current_price"]),
+        "price_change_percentage_24h": to_float(row["price_change_percentage_24h"]),
+    }
+
+
+class Subscription:
+    """Pending price deltas for one client, keyed by asset.
+
+    A later delta for the same asset replaces the queued one, so a burst
+    of updates reaches the client as a single message per tick.
+    """
+
+    def __init__(self, asset_ids: Iterable[str] | None = None) -> None:
+        self.asset_ids = frozenset(asset_ids) if asset_ids is not None else None
+        self._pending: dict[str, dict] = {}
+        self._ready = asyncio.Event()
+
+    def push(self, deltas: Iterable[dict]) -> None:
+        for delta in deltas:
+            if self.asset_ids is None or delta["id"] in self.asset_ids:
+                self._pending[delta["id"]] = delta
+        if self._pending:
+            self._ready.set()
+
+    async def next_batch(self, timeout: float) -> list[dict]:
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return []
+        batch = list(self._pending.values())
+        self._pending.clear()
+        self._ready.clear()
+        return batch
+
+
+class PriceBroadcaster:
+    """Polls the catalog for price changes while anyone is subscribed.
+
+    One indexed `updated_at` range query per tick serves every subscriber
+    of the process, and it also sees writes made by other processes such
+    as the `ingest_prices` command.
+    """
+
+    def __init__(self) -> None:
+        self._subscribers: set[Subscription] = set()
+        self._task: asyncio.Task | None = None
+        self._started: datetime | None = None
+        self._since: datetime | None = None
+        self._last_sent: dict[str, dict] = {}
+
+    @property
+    def interval(self) -> float:
+        return settings.ASSETS_STREAM_INTERVAL
+
+    def subscribe(self, asset_ids: Iterable[str] | None = None) -> Subscription:
+        subscription = Subscription(asset_ids)
+        self._subscribers.add(subscription)
+        if self._task is None or self._task.done():
+            self._started = self._since = timezone.now()
+            self._last_sent = {}
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._subscribers.discard(subscription)
+
+    async def _run(self) -> None:
+        # A failed poll must not end the task: subscribers would be left
+        # with keep-alives until someone new subscribed.
+        delay = self.interval
+        while self._subscribers:
+            await asyncio.sleep(delay)
+            try:
+                deltas = await self.poll()
+            except Exception:
+                delay = min(max(delay, self.interval) * 2, _MAX_BACKOFF)
+                logger.exception("Price poll failed, retrying in %.1fs", delay)
+                continue
+            delay = self.interval
+            for subscription in self._subscribers:
+                subscription.push(deltas)
+
+    async def poll(self) -> list[dict]:
+        # The last-sent prices filter out rows re-read from the lag window.
+        lag = timedelta(seconds=settings.ASSETS_COMMIT_LAG_SECONDS)
+        start = max(self._started, self._since - lag)
+        rows = Asset.objects.filter(updated_at__gte=start).values(
+            *_DELTA_FIELDS, "updated_at"
+        )
+        deltas = []
+        async for row in rows:
+            self._since = max(self._since, row.pop("updated_at"))
+            delta = _delta(row)
+            if self._last_sent.get(delta["id"]) != delta:
+                self._last_sent[delta["id"]] = delta
+                deltas.append(delta)
+        return deltas
+
+
+broadcaster = PriceBroadcaster()
+
+
+def _event(name: str, data) -> str:
+    return f"event: {name}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+async def price_events(asset_ids: Iterable[str] | None = None) -> AsyncIterator[str]:
+    """Server-Sent Events stream: a snapshot of the requested assets, then
+    one `prices` event per tick with the deltas since the previous one."""
+    subscription = broadcaster.subscribe(asset_ids)
+    try:
+        yield f"retry: {int(settings.ASSETS_STREAM_INTERVAL * 1000)}\n\n"
+        if subscription.asset_ids is not None:
+            snapshot = Asset.objects.filter(id__in=subscription.asset_ids).values(
+                *_DELTA_FIELDS
+            )
+            yield _event("snapshot", [_delta(row) async for row in snapshot])
+
+        while True:
+            batch = await subscription.next_batch(settings.ASSETS_STREAM_KEEPALIVE)
+            yield _event("prices", batch) if batch else ": keep-alive\n\n"
+    finally:
+        broadcaster.unsubscribe(subscription)
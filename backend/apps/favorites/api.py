@@ -1,14 +1,51 @@
+from datetime import datetime
+from decimal import Decimal
+from typing import Literal
 from uuid import UUID
 
+from asgiref.sync import sync_to_async
+from django.db import IntegrityError
+from django.db.models import Count, Exists, Max
+from django.utils import timezone
 from ninja import Router, Schema
 from ninja.errors import HttpError
 
-from apps.assets.api import AssetOut
+from apps.assets.api import AssetOut, parse_fields_param
 from apps.assets.models import Asset
+from apps.assets.pagination import (
+    InvalidCursor,
+    SortKey,
+    link_next_page,
+    sort_rows,
+    split_page,
+)
+from apps.assets.serializers import asset_from_row, related_fields
 from apps.favorites.models import Favorite
+from apps.favorites.writes import (
+    add_favorite,
+    add_favorites,
+    remove_favorites,
+    replace_favorites,
+)
+from config.api import render
+from config.budgets import query_budget
+from config.conditional import Fingerprint, conditional, latest
 
 router = Router()
 
+MAX_PAGE_SIZE = 500
+MAX_BATCH_IDS = 500
+
+SORT_KEYS = {
+    "created_at": SortKey("created_at", datetime.fromisoformat),
+    "rank": SortKey("asset__market_cap_rank", int),
+    "change_24h": SortKey("asset__price_change_percentage_24h", Decimal),
+}
+
+FavoriteSort = Literal[
+    "created_at", "-created_at", "rank", "-rank", "change_24h", "-change_24h"
+]
+
 
 class FavoriteCreateIn(Schema):
     asset_id: str
@@ -23,56 +60,163 @@ class FavoriteOut(Schema):
     asset: AssetOut
 
 
+class FavoriteBatchIn(Schema):
+    asset_ids: list[str]
+
+
+class FavoriteOutcomeOut(Schema):
+    asset_id: str
+    status: Literal["added", "exists", "removed", "not_favorite", "not_found"]
+
+
+class FavoriteBatchOut(Schema):
+    results: list[FavoriteOutcomeOut]
+
+
+async def _favorites_fingerprint(request, **kwargs) -> Fingerprint:
+    stats = await Favorite.objects.aaggregate(
+        count=Count("pk"),
+        favorite_updated_at=Max("updated_at"),
+        asset_updated_at=Max("asset__updated_at"),
+    )
+    return Fingerprint(
+        latest(stats["favorite_updated_at"], stats["asset_updated_at"]),
+        stats["count"],
+    )
+
+
+async def _favorite_fingerprint(request, favorite_id: str) -> Fingerprint | None:
+    try:
+        favorite_id = UUID(favorite_id)
+    except ValueError:
+        return None
+
+    row = (
+        await Favorite.objects.filter(id=favorite_id)
+        .values_list("updated_at", "asset__updated_at")
+        .afirst()
+    )
+    return Fingerprint(latest(*row)) if row else None
+
+
 @router.get("", response=list[FavoriteOut])
-def list_favorites(request):
-    qs = Favorite.objects.select_related("asset").order_by("-created_at")
-    return list(qs)
+@query_budget(2)
+@conditional(_favorites_fingerprint, last_modified=False)
+async def list_favorites(
+    request,
+    fields: str = "",
+    sort: FavoriteSort = "-created_at",
+    limit: int = 100,
+    cursor: str | None = None,
+):
+    selected = parse_fields_param(fields)
+    try:
+        rows = sort_rows(Favorite.objects.all(), SORT_KEYS, sort, cursor)
+    except InvalidCursor:
+        raise HttpError(400, "Invalid cursor")
+    rows = rows.values_list("id", *related_fields("asset", selected), "sort_value")
+    limit = min(max(1, limit), MAX_PAGE_SIZE)
+    rows = rows[: limit + 1]
+
+    page, next_cursor = split_page([row async for row in rows], limit, sort)
+    response = render(
+        request,
+        [{"id": row[0], "asset": asset_from_row(row, 1, selected)} for row in page],
+    )
+    return link_next_page(request, response, next_cursor)
 
 
 @router.post("", response=FavoriteOut)
-def create_favorite(request, payload: FavoriteCreateIn):
-    asset = Asset.objects.filter(id=payload.asset_id).first()
+@query_budget(2)
+async def create_favorite(request, payload: FavoriteCreateIn):
+    asset = await Asset.objects.filter(id=payload.asset_id).afirst()
     if not asset:
         raise HttpError(404, "Asset not found")
 
-    favorite = Favorite.objects.filter(asset=asset).select_related("asset").first()
-    if favorite:
-        return favorite
+    # The unique constraint on the asset makes repeated clicks idempotent.
+    return {"id": await sync_to_async(add_favorite)(asset.id), "asset": asset}
 
-    return Favorite.objects.create(asset=asset)
+
+def _batch_ids(payload: FavoriteBatchIn) -> list[str]:
+    asset_ids = list(dict.fromkeys(part.strip() for part in payload.asset_ids))
+    asset_ids = [asset_id for asset_id in asset_ids if asset_id]
+    if len(asset_ids) > MAX_BATCH_IDS:
+        raise HttpError(400, f"At most {MAX_BATCH_IDS} ids per batch")
+    return asset_ids
+
+
+def _batch_out(outcomes: list[tuple[str, str]]) -> dict:
+    return {
+        "results": [
+            {"asset_id": asset_id, "status": status} for asset_id, status in outcomes
+        ]
+    }
+
+
+@router.post("/batch", response=FavoriteBatchOut)
+@query_budget(2)
+async def add_favorites_batch(request, payload: FavoriteBatchIn):
+    outcomes = await sync_to_async(add_favorites)(_batch_ids(payload))
+    return _batch_out(outcomes)
+
+
+@router.post("/batch/remove", response=FavoriteBatchOut)
+@query_budget(2)
+async def remove_favorites_batch(request, payload: FavoriteBatchIn):
+    outcomes = await sync_to_async(remove_favorites)(_batch_ids(payload))
+    return _batch_out(outcomes)
+
+
+@router.put("/batch", response=FavoriteBatchOut)
+@query_budget(5)
+async def replace_favorites_batch(request, payload: FavoriteBatchIn):
+    outcomes = await sync_to_async(replace_favorites)(_batch_ids(payload))
+    return _batch_out(outcomes)
 
 
 @router.get("/{favorite_id}", response=FavoriteOut)
-def get_favorite(request, favorite_id: UUID):
-    favorite = Favorite.objects.filter(id=favorite_id).select_related("asset").first()
+@query_budget(2)
+@conditional(_favorite_fingerprint)
+async def get_favorite(request, favorite_id: UUID):
+    favorite = (
+        await Favorite.objects.filter(id=favorite_id).select_related("asset").afirst()
+    )
     if not favorite:
         raise HttpError(404, "Favorite not found")
     return favorite
 
 
 @router.put("/{favorite_id}", response=FavoriteOut)
-def update_favorite(request, favorite_id: UUID, payload: FavoriteUpdateIn):
-    favorite = Favorite.objects.filter(id=favorite_id).select_related("asset").first()
-    if not favorite:
-        raise HttpError(404, "Favorite not found")
-
-    asset = Asset.objects.filter(id=payload.asset_id).first()
+@query_budget(3)
+async def update_favorite(request, favorite_id: UUID, payload: FavoriteUpdateIn):
+    asset = await Asset.objects.filter(id=payload.asset_id).afirst()
     if not asset:
         raise HttpError(404, "Asset not found")
 
-    existing = Favorite.objects.filter(asset=asset).exclude(id=favorite_id).first()
-    if existing:
+    # The duplicate check rides along in the UPDATE; the unique constraint
+    # still catches a favorite added for the asset in between.
+    duplicate = Favorite.objects.filter(asset=asset).exclude(id=favorite_id)
+    try:
+        updated = (
+            await Favorite.objects.filter(id=favorite_id)
+            .exclude(Exists(duplicate))
+            .aupdate(asset=asset, updated_at=timezone.now())
+        )
+    except IntegrityError:
+        updated = 0
+
+    if not updated:
+        # Only failed updates pay for telling the two cases apart.
+        if not await Favorite.objects.filter(id=favorite_id).aexists():
+            raise HttpError(404, "Favorite not found")
         raise HttpError(409, "Favorite already exists for asset")
-
-    favorite.asset = asset
-    favorite.save(update_fields=["asset", "updated_at"])
-    return favorite
+    return {"id": favorite_id, "asset": asset}
 
 
 @router.delete("/{favorite_id}", response={204: None})
-def delete_favorite(request, favorite_id: UUID):
-    deleted, _ = Favorite.objects.filter(id=favorite_id).delete()
+@query_budget(1)
+async def delete_favorite(request, favorite_id: UUID):
+    deleted, _ = await Favorite.objects.filter(id=favorite_id).adelete()
     if not deleted:
         raise HttpError(404, "Favorite not found")
     return 204, None
-
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("assets", "0008_list_sort_indexes"),
+        (
+            "favorites",
+            "0002_rename_favorites_f_asset_6bdfcc_idx_favorites_f_asset_i_f28939_idx",
+        ),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="favorite",
+            index=models.Index(
+                fields=["created_at", "id"], name="favorites_f_created_be4db0_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:51
+
+from django.db import migrations, models
+
+
+def drop_duplicate_favorites(apps, schema_editor):
+    """Keep the oldest favorite of each asset before making them unique."""
+    Favorite = apps.get_model("favorites", "Favorite")
+    oldest = Favorite.objects.filter(asset_id=models.OuterRef("asset_id")).order_by(
+        "created_at", "id"
+    )
+    Favorite.objects.exclude(id=models.Subquery(oldest.values("id")[:1])).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("assets", "0008_list_sort_indexes"),
+        ("favorites", "0003_list_sort_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_duplicate_favorites, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name="favorite",
+            name="favorites_f_asset_i_f28939_idx",
+        ),
+        migrations.AddConstraint(
+            model_name="favorite",
+            constraint=models.UniqueConstraint(
+                fields=("asset",), name="unique_favorite_asset"
+            ),
+        ),
+    ]
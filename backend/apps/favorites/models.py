@@ -16,6 +16,10 @@ class Favorite(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
+        constraints = [
+            # Lets writes rely on ON CONFLICT instead of check-then-insert.
+            models.UniqueConstraint(fields=["asset"], name="unique_favorite_asset"),
+        ]
         indexes = [
-            models.Index(fields=["asset"]),
+            models.Index(fields=["created_at", "id"]),
         ]
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+from uuid import UUID, uuid4
+
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.assets.models import Asset
+from apps.favorites.models import Favorite
+
+
+def add_favorite(asset_id: str) -> UUID:
+    """Favorite an existing asset and return the favorite's id, in one
+    statement whether or not it was already a favorite.
+
+    The no-op `DO UPDATE` (rather than `DO NOTHING`) makes `RETURNING` hand
+    back the id of the row that won a concurrent insert.
+    """
+    pk = Favorite._meta.pk
+    now = connection.ops.adapt_datetimefield_value(timezone.now())
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {Favorite._meta.db_table}"
+            " (id, asset_id, created_at, updated_at) VALUES (%s, %s, %s, %s)"
+            " ON CONFLICT (asset_id) DO UPDATE SET asset_id = EXCLUDED.asset_id"
+            " RETURNING id",
+            [pk.get_db_prep_value(uuid4(), connection), asset_id, now, now],
+        )
+        (favorite_id,) = cursor.fetchone()
+    return pk.to_python(favorite_id)
+
+
+ADDED = "added"
+EXISTS = "exists"
+REMOVED = "removed"
+NOT_FAVORITE = "not_favorite"
+NOT_FOUND = "not_found"
+
+
+def _favorited(asset_ids: list[str], everything: bool = False) -> dict[str, bool]:
+    """Which of `asset_ids` exist and whether each is a favorite, in one
+    query; with `everything`, every currently favorited asset too."""
+    lookup = Q(id__in=asset_ids)
+    if everything:
+        lookup |= Q(favorites__isnull=False)
+    return {
+        asset_id: favorite_id is not None
+        for asset_id, favorite_id in Asset.objects.filter(lookup).values_list(
+            "id", "favorites__id"
+        )
+    }
+
+
+def _insert(asset_ids: list[str]) -> None:
+    # A favorite added concurrently is skipped by the unique constraint.
+    Favorite.objects.bulk_create(
+        [Favorite(asset_id=asset_id) for asset_id in asset_ids],
+        ignore_conflicts=True,
+    )
+
+
+def _outcomes(
+    asset_ids: list[str], known: dict[str, bool], favorite: str, not_favorite: str
+) -> list[tuple[str, str]]:
+    outcomes = []
+    for asset_id in asset_ids:
+        if asset_id not in known:
+            outcomes.append((asset_id, NOT_FOUND))
+        else:
+            outcomes.append((asset_id, favorite if known[asset_id] else not_favorite))
+    return outcomes
+
+
+def add_favorites(asset_ids: list[str]) -> list[tuple[str, str]]:
+    """Favorite every known asset of `asset_ids`, with each id's outcome."""
+    if not asset_ids:
+        return []
+    known = _favorited(asset_ids)
+    _insert([asset_id for asset_id in asset_ids if known.get(asset_id) is False])
+    return _outcomes(asset_ids, known, EXISTS, ADDED)
+
+
+def remove_favorites(asset_ids: list[str]) -> list[tuple[str, str]]:
+    """Unfavorite `asset_ids` in one DELETE, with each id's outcome."""
+    if not asset_ids:
+        return []
+    known = _favorited(asset_ids)
+    favorited = [asset_id for asset_id in asset_ids if known.get(asset_id)]
+    if favorited:
+        Favorite.objects.filter(asset_id__in=favorited).delete()
+    return _outcomes(asset_ids, known, REMOVED, NOT_FAVORITE)
+
+
+def replace_favorites(asset_ids: list[str]) -> list[tuple[str, str]]:
+    """Make the known assets of `asset_ids` the only favorites.
+
+    Outcomes cover the requested ids, then every favorite that was removed.
+    """
+    requested = set(asset_ids)
+    with transaction.atomic():
+        known = _favorited(asset_ids, everything=True)
+        stale = sorted(
+            asset_id
+            for asset_id, favorited in known.items()
+            if favorited and asset_id not in requested
+        )
+        if stale:
+            Favorite.objects.filter(asset_id__in=stale).delete()
+        _insert([asset_id for asset_id in asset_ids if known.get(asset_id) is False])
+    outcomes = _outcomes(asset_ids, known, EXISTS, ADDED)
+    return outcomes + [(asset_id, REMOVED) for asset_id in stale]
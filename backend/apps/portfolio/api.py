@@ -1,14 +1,70 @@
+import codecs
+from datetime import datetime
+from decimal import Decimal
+from typing import Literal
 from uuid import UUID
 
-from ninja import Router, Schema
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.db import IntegrityError
+from django.db.models import Count, Max
+from django.http import StreamingHttpResponse
+from ninja import File, Router, Schema, UploadedFile
 from ninja.errors import HttpError
 
-from apps.assets.api import AssetOut
+from apps.assets.api import AssetOut, parse_fields_param
 from apps.assets.models import Asset
-from apps.portfolio.models import PortfolioItem
+from apps.assets.pagination import (
+    InvalidCursor,
+    SortKey,
+    link_next_page,
+    sort_rows,
+    split_page,
+)
+from apps.assets.serializers import asset_from_row, related_fields
+from apps.portfolio.ledger import LedgerError, open_position, record_trade
+from apps.portfolio.models import PortfolioItem, PortfolioTransaction
+from apps.portfolio.transfer import (
+    aexport_positions,
+    export_positions,
+    import_positions,
+    read_positions,
+)
+from apps.portfolio.valuation import MARKET_VALUE, PNL, portfolio_summary
+from config.api import render
+from config.budgets import query_budget
+from config.conditional import Fingerprint, conditional, latest
 
 router = Router()
 
+MAX_TRANSACTIONS = 1000
+MAX_PAGE_SIZE = 500
+
+SORT_KEYS = {
+    "updated_at": SortKey("updated_at", datetime.fromisoformat),
+    "rank": SortKey("asset__market_cap_rank", int),
+    "change_24h": SortKey("asset__price_change_percentage_24h", Decimal),
+    "market_value": SortKey(MARKET_VALUE, Decimal),
+    "pnl": SortKey(PNL, Decimal),
+}
+
+PortfolioSort = Literal[
+    "updated_at",
+    "-updated_at",
+    "rank",
+    "-rank",
+    "change_24h",
+    "-change_24h",
+    "market_value",
+    "-market_value",
+    "pnl",
+    "-pnl",
+]
+
+TransferFormat = Literal["csv", "ndjson"]
+
+_CONTENT_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+
 
 class PortfolioItemCreateIn(Schema):
     asset_id: str
@@ -26,37 +82,193 @@ class PortfolioItemOut(Schema):
     asset: AssetOut
     quantity: float
     avg_price: float
+    realized_pnl: float
+
+
+class PortfolioTransactionIn(Schema):
+    side: Literal["buy", "sell", "adjust"]
+    quantity: Decimal
+    price: Decimal
+    executed_at: datetime | None = None
+
+
+class PortfolioTransactionOut(Schema):
+    id: UUID
+    side: str
+    quantity: float
+    price: float
+    executed_at: datetime
+
+
+class PortfolioPositionOut(Schema):
+    id: UUID
+    asset_id: str
+    symbol: str
+    name: str
+    current_price: float | None = None
+    quantity: float
+    avg_price: float
+    market_value: float
+    cost_basis: float
+    pnl: float
+    pnl_percentage: float | None = None
+    realized_pnl: float
+    weight: float | None = None
+
+
+class PortfolioImportOut(Schema):
+    rows: int
+    created: int
+    updated: int
+    missing: list[str]
+
+
+class PortfolioSummaryOut(Schema):
+    total_value: float
+    total_cost: float
+    pnl: float
+    realized_pnl: float
+    pnl_percentage: float | None = None
+    positions: list[PortfolioPositionOut]
+
+
+async def _portfolio_fingerprint(request, **kwargs) -> Fingerprint:
+    stats = await PortfolioItem.objects.aaggregate(
+        count=Count("pk"),
+        item_updated_at=Max("updated_at"),
+        asset_updated_at=Max("asset__updated_at"),
+    )
+    return Fingerprint(
+        latest(stats["item_updated_at"], stats["asset_updated_at"]),
+        stats["count"],
+    )
+
+
+async def _portfolio_item_fingerprint(
+    request, portfolio_item_id: str
+) -> Fingerprint | None:
+    try:
+        portfolio_item_id = UUID(portfolio_item_id)
+    except ValueError:
+        return None
+
+    row = (
+        await PortfolioItem.objects.filter(id=portfolio_item_id)
+        .values_list("updated_at", "asset__updated_at")
+        .afirst()
+    )
+    return Fingerprint(latest(*row)) if row else None
 
 
 @router.get("", response=list[PortfolioItemOut])
-def list_portfolio(request):
-    qs = PortfolioItem.objects.select_related("asset").order_by("-updated_at")
-    return list(qs)
+@query_budget(2)
+@conditional(_portfolio_fingerprint, last_modified=False)
+async def list_portfolio(
+    request,
+    fields: str = "",
+    sort: PortfolioSort = "-updated_at",
+    limit: int = 100,
+    cursor: str | None = None,
+):
+    selected = parse_fields_param(fields)
+    try:
+        rows = sort_rows(PortfolioItem.objects.all(), SORT_KEYS, sort, cursor)
+    except InvalidCursor:
+        raise HttpError(400, "Invalid cursor")
+    rows = rows.values_list(
+        "id",
+        "quantity",
+        "avg_price",
+        "realized_pnl",
+        *related_fields("asset", selected),
+        "sort_value",
+    )
+    limit = min(max(1, limit), MAX_PAGE_SIZE)
+    rows = rows[: limit + 1]
+
+    page, next_cursor = split_page([row async for row in rows], limit, sort)
+    response = render(
+        request,
+        [
+            {
+                "id": row[0],
+                "asset": asset_from_row(row, 4, selected),
+                "quantity": float(row[1]),
+                "avg_price": float(row[2]),
+                "realized_pnl": float(row[3]),
+            }
+            for row in page
+        ],
+    )
+    return link_next_page(request, response, next_cursor)
 
 
 @router.post("", response=PortfolioItemOut)
-def create_portfolio_item(request, payload: PortfolioItemCreateIn):
-    asset = Asset.objects.filter(id=payload.asset_id).first()
+@query_budget(5)
+async def create_portfolio_item(request, payload: PortfolioItemCreateIn):
+    asset = await Asset.objects.filter(id=payload.asset_id).afirst()
     if not asset:
         raise HttpError(404, "Asset not found")
 
-    existing = PortfolioItem.objects.filter(asset=asset).select_related("asset").first()
-    if existing:
+    # One position per asset is enforced by the unique column, not a
+    # separate lookup that a concurrent request could slip past.
+    try:
+        return await sync_to_async(open_position)(
+            asset, payload.quantity, payload.avg_price
+        )
+    except IntegrityError:
         raise HttpError(409, "Portfolio item already exists for asset")
+    except LedgerError as exc:
+        raise HttpError(400, str(exc))
+
+
+@router.get("/summary", response=PortfolioSummaryOut)
+@query_budget(2)
+@conditional(_portfolio_fingerprint, last_modified=False)
+async def get_portfolio_summary(request):
+    return await portfolio_summary()
+
+
+@router.post("/import", response=PortfolioImportOut)
+@query_budget(None)
+async def import_portfolio(
+    request, file: UploadedFile = File(...), format: TransferFormat | None = None
+):
+    if format is None:
+        format = "csv" if (file.name or "").lower().endswith(".csv") else "ndjson"
+
+    # Django spools large uploads to disk; rows are decoded and parsed one
+    # line at a time and written in batches, so the file is never loaded whole.
+    lines = codecs.iterdecode(file, "utf-8-sig")
+    try:
+        return await sync_to_async(import_positions)(read_positions(lines, format))
+    except (ValueError, UnicodeDecodeError) as exc:
+        raise HttpError(400, str(exc))
+    except IntegrityError:
+        raise HttpError(409, "Portfolio changed during import, retry")
 
-    return PortfolioItem.objects.create(
-        asset=asset,
-        quantity=payload.quantity,
-        avg_price=payload.avg_price,
-    )
+
+@router.get("/export")
+@query_budget(0)
+async def export_portfolio(request, format: TransferFormat = "csv"):
+    # Rows are read while the body streams, after the view has returned.
+    if isinstance(request, ASGIRequest):
+        lines = aexport_positions(format)
+    else:
+        lines = export_positions(format)
+    response = StreamingHttpResponse(lines, content_type=_CONTENT_TYPES[format])
+    response["Content-Disposition"] = f'attachment; filename="portfolio.{format}"'
+    return response
 
 
 @router.get("/{portfolio_item_id}", response=PortfolioItemOut)
-def get_portfolio_item(request, portfolio_item_id: UUID):
+@query_budget(2)
+@conditional(_portfolio_item_fingerprint)
+async def get_portfolio_item(request, portfolio_item_id: UUID):
     item = (
-        PortfolioItem.objects.filter(id=portfolio_item_id)
+        await PortfolioItem.objects.filter(id=portfolio_item_id)
         .select_related("asset")
-        .first()
+        .afirst()
     )
     if not item:
         raise HttpError(404, "Portfolio item not found")
@@ -64,40 +276,78 @@ def get_portfolio_item(request, portfolio_item_id: UUID):
 
 
 @router.put("/{portfolio_item_id}", response=PortfolioItemOut)
-def update_portfolio_item(
+@query_budget(5)
+async def update_portfolio_item(
     request, portfolio_item_id: UUID, payload: PortfolioItemUpdateIn
 ):
-    item = (
-        PortfolioItem.objects.filter(id=portfolio_item_id)
-        .select_related("asset")
-        .first()
+    if payload.quantity is None and payload.avg_price is None:
+        item = (
+            await PortfolioItem.objects.filter(id=portfolio_item_id)
+            .select_related("asset")
+            .afirst()
+        )
+        if not item:
+            raise HttpError(404, "Portfolio item not found")
+        return item
+
+    # Manual edits go through the ledger as `adjust` entries.
+    return await _record(
+        portfolio_item_id,
+        PortfolioTransaction.Side.ADJUST,
+        payload.quantity,
+        payload.avg_price,
     )
-    if not item:
+
+
+async def _record(portfolio_item_id, side, quantity, price, executed_at=None):
+    try:
+        return await sync_to_async(record_trade)(
+            portfolio_item_id, side, quantity, price, executed_at
+        )
+    except PortfolioItem.DoesNotExist:
         raise HttpError(404, "Portfolio item not found")
+    except LedgerError as exc:
+        raise HttpError(400, str(exc))
 
-    changed = False
-    update_fields: list[str] = []
 
-    if payload.quantity is not None:
-        item.quantity = payload.quantity
-        update_fields.append("quantity")
-        changed = True
-    if payload.avg_price is not None:
-        item.avg_price = payload.avg_price
-        update_fields.append("avg_price")
-        changed = True
+@router.get("/{portfolio_item_id}/transactions", response=list[PortfolioTransactionOut])
+@query_budget(2)
+async def list_portfolio_transactions(
+    request, portfolio_item_id: UUID, limit: int = 100
+):
+    limit = min(max(1, limit), MAX_TRANSACTIONS)
+    entries = [
+        entry
+        async for entry in PortfolioTransaction.objects.filter(
+            portfolio_item_id=portfolio_item_id
+        ).order_by("-executed_at", "-created_at")[:limit]
+    ]
+    if (
+        not entries
+        and not await PortfolioItem.objects.filter(id=portfolio_item_id).aexists()
+    ):
+        raise HttpError(404, "Portfolio item not found")
+    return entries
 
-    if changed:
-        update_fields.append("updated_at")
-        item.save(update_fields=update_fields)
 
-    return item
+@router.post("/{portfolio_item_id}/transactions", response=PortfolioItemOut)
+@query_budget(6)
+async def create_portfolio_transaction(
+    request, portfolio_item_id: UUID, payload: PortfolioTransactionIn
+):
+    return await _record(
+        portfolio_item_id,
+        payload.side,
+        payload.quantity,
+        payload.price,
+        payload.executed_at,
+    )
 
 
 @router.delete("/{portfolio_item_id}", response={204: None})
-def delete_portfolio_item(request, portfolio_item_id: UUID):
-    deleted, _ = PortfolioItem.objects.filter(id=portfolio_item_id).delete()
+@query_budget(3)
+async def delete_portfolio_item(request, portfolio_item_id: UUID):
+    deleted, _ = await PortfolioItem.objects.filter(id=portfolio_item_id).adelete()
     if not deleted:
         raise HttpError(404, "Portfolio item not found")
     return 204, None
-
@@ -0,0 +1,237 @@
+from __future__ import annotations
+
+from datetime import datetime
+from decimal import ROUND_HALF_EVEN, Decimal, InvalidOperation
+from typing import Iterable, Iterator, NamedTuple
+from uuid import UUID
+
+from django.db import transaction
+from django.utils import timezone
+
+from apps.portfolio.models import PortfolioItem, PortfolioTransaction
+
+Side = PortfolioTransaction.Side
+
+_PLACES = Decimal("0.00000001")
+
+# Integer digits left by the quantity (28, 8) and price (20, 8) columns.
+_MAX_QUANTITY = Decimal(10) ** 20
+_MAX_PRICE = Decimal(10) ** 12
+
+AGGREGATE_FIELDS = ("quantity", "avg_price", "realized_pnl", "last_executed_at")
+
+
+class LedgerError(ValueError):
+    pass
+
+
+class Position(NamedTuple):
+    quantity: Decimal = Decimal(0)
+    avg_price: Decimal = Decimal(0)
+    realized_pnl: Decimal = Decimal(0)
+
+
+def _round(value: Decimal) -> Decimal:
+    return value.quantize(_PLACES, rounding=ROUND_HALF_EVEN)
+
+
+def _decimal(value) -> Decimal:
+    # str() keeps floats from the API at the precision they were written in;
+    # rounding to the column scale makes stored entries replay identically.
+    try:
+        value = value if isinstance(value, Decimal) else Decimal(str(value))
+    except InvalidOperation:
+        raise LedgerError(f"Invalid number: {value}") from None
+    if not value.is_finite():
+        raise LedgerError(f"Invalid number: {value}")
+    try:
+        return _round(value)
+    except InvalidOperation:
+        raise LedgerError(f"Number is too large: {value}") from None
+
+
+def apply_trade(
+    position: Position, side: str, quantity: Decimal, price: Decimal
+) -> Position:
+    """Fold one ledger entry into a position at average cost.
+
+    Buys move the average price; sells realize `(price - avg_price)` per
+    unit and leave it alone. Both the per-trade path and the replay use
+    this, so they round identically.
+    """
+    quantity, price = _decimal(quantity), _decimal(price)
+    if quantity < 0 or price < 0:
+        raise LedgerError("Quantity and price must not be negative")
+    if quantity >= _MAX_QUANTITY or price >= _MAX_PRICE:
+        raise LedgerError("Quantity or price is too large")
+
+    if side == Side.ADJUST:
+        return Position(quantity, price, position.realized_pnl)
+    if quantity == 0:
+        raise LedgerError("Quantity must be positive")
+
+    if side == Side.BUY:
+        held = position.quantity + quantity
+        if held >= _MAX_QUANTITY:
+            raise LedgerError("Quantity is too large")
+        cost = position.quantity * position.avg_price + quantity * price
+        return Position(held, _round(cost / held), position.realized_pnl)
+
+    if side == Side.SELL:
+        if quantity > position.quantity:
+            raise LedgerError(f"Cannot sell {quantity}, only {position.quantity} held")
+        realized = position.realized_pnl + quantity * (price - position.avg_price)
+        return Position(
+            position.quantity - quantity, position.avg_price, _round(realized)
+        )
+
+    raise LedgerError(f"Unknown side: {side}")
+
+
+def _position(item: PortfolioItem) -> Position:
+    return Position(item.quantity, item.avg_price, item.realized_pnl)
+
+
+def _set_position(item: PortfolioItem, position: Position, executed_at) -> None:
+    item.quantity, item.avg_price, item.realized_pnl = position
+    item.last_executed_at = executed_at
+
+
+def record_trade(
+    item_id: UUID,
+    side: str,
+    quantity: Decimal | None,
+    price: Decimal | None,
+    executed_at: datetime | None = None,
+) -> PortfolioItem:
+    """Append an entry to a position's ledger and update its aggregates.
+
+    In-order entries are folded into the locked row in O(1); a backdated
+    one changes what every later entry saw, so that position is replayed.
+    An `adjust` entry keeps the current quantity or price when given None.
+    A naive `executed_at` is taken to be in the default timezone.
+    Raises PortfolioItem.DoesNotExist or LedgerError.
+    """
+    executed_at = executed_at or timezone.now()
+    if timezone.is_naive(executed_at):
+        executed_at = timezone.make_aware(executed_at)
+    with transaction.atomic():
+        item = (
+            PortfolioItem.objects.select_for_update(of=("self",))
+            .select_related("asset")
+            .get(id=item_id)
+        )
+        if side == Side.ADJUST:
+            quantity = item.quantity if quantity is None else quantity
+            price = item.avg_price if price is None else price
+        quantity, price = _decimal(quantity), _decimal(price)
+        entry = PortfolioTransaction(
+            portfolio_item=item,
+            side=side,
+            quantity=quantity,
+            price=price,
+            executed_at=executed_at,
+        )
+
+        if item.last_executed_at is None or executed_at >= item.last_executed_at:
+            _set_position(
+                item, apply_trade(_position(item), side, quantity, price), executed_at
+            )
+            entry.save()
+        else:
+            entry.save()
+            [(_, _, position, last)] = _replay(_ledger([item.id]))
+            _set_position(item, position, last)
+
+        item.save(update_fields=[*AGGREGATE_FIELDS, "updated_at"])
+    return item
+
+
+def open_position(asset, quantity: Decimal, avg_price: Decimal) -> PortfolioItem:
+    """Create a position whose ledger starts with an `adjust` entry."""
+    position = apply_trade(Position(), Side.ADJUST, quantity, avg_price)
+    executed_at = timezone.now()
+    with transaction.atomic():
+        item = PortfolioItem.objects.create(
+            asset=asset,
+            quantity=position.quantity,
+            avg_price=position.avg_price,
+            last_executed_at=executed_at,
+        )
+        PortfolioTransaction.objects.create(
+            portfolio_item=item,
+            side=Side.ADJUST,
+            quantity=position.quantity,
+            price=position.avg_price,
+            executed_at=executed_at,
+        )
+    return item
+
+
+def _ledger(item_ids: Iterable[UUID] | None = None, chunk_size: int = 2000):
+    entries = PortfolioTransaction.objects.order_by(
+        "portfolio_item_id", "executed_at", "created_at", "id"
+    )
+    if item_ids is not None:
+        entries = entries.filter(portfolio_item_id__in=list(item_ids))
+    return entries.values_list(
+        "portfolio_item_id",
+        "portfolio_item__asset_id",
+        "side",
+        "quantity",
+        "price",
+        "executed_at",
+    ).iterator(chunk_size=chunk_size)
+
+
+def _replay(entries) -> Iterator[tuple[UUID, str, Position, datetime]]:
+    """Positions rebuilt from ledger entries sorted by item, one item at a
+    time, so only the current position is held in memory."""
+    current = None
+    for item_id, asset_id, side, quantity, price, executed_at in entries:
+        if current is None or item_id != current[0]:
+            if current is not None:
+                yield current
+            current = (item_id, asset_id, Position(), None)
+        try:
+            position = apply_trade(current[2], side, quantity, price)
+        except LedgerError as exc:
+            raise LedgerError(f"Position {item_id} at {executed_at}: {exc}") from exc
+        current = (item_id, asset_id, position, executed_at)
+    if current is not None:
+        yield current
+
+
+def _write(items: list[PortfolioItem]) -> None:
+    # An upsert on the primary key writes the whole batch in one statement,
+    # where bulk_update() would build a CASE expression per row and field.
+    PortfolioItem.objects.bulk_create(
+        items,
+        update_conflicts=True,
+        unique_fields=["id"],
+        update_fields=[*AGGREGATE_FIELDS, "updated_at"],
+    )
+
+
+def replay_ledger(
+    item_ids: Iterable[UUID] | None = None, batch_size: int = 1000
+) -> Iterator[int]:
+    """Rebuild the aggregates of every position (or of `item_ids`) from
+    the ledger in one pass, yielding how many positions each batch wrote.
+
+    Positions must not be traded or deleted while this runs.
+    """
+    batch: list[PortfolioItem] = []
+    for item_id, asset_id, position, executed_at in _replay(
+        _ledger(item_ids, chunk_size=batch_size)
+    ):
+        item = PortfolioItem(id=item_id, asset_id=asset_id)
+        _set_position(item, position, executed_at)
+        batch.append(item)
+        if len(batch) >= batch_size:
+            _write(batch)
+            yield len(batch)
+            batch = []
+    if batch:
+        _write(batch)
+        yield len(batch)
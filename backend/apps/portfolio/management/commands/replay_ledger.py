@@ -0,0 +1,37 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from apps.portfolio.ledger import LedgerError, replay_ledger
+
+
+class Command(BaseCommand):
+    help = "Rebuild portfolio positions from the transaction ledger"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "items", nargs="*", help="Portfolio item ids; all positions by default"
+        )
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be positive")
+
+        started = time.perf_counter()
+        total = 0
+        try:
+            with transaction.atomic():
+                for written in replay_ledger(
+                    options["items"] or None, batch_size=options["batch_size"]
+                ):
+                    total += written
+                    self.stdout.write(f"  positions: {total}", ending="\r")
+        except LedgerError as exc:
+            raise CommandError(str(exc)) from exc
+
+        seconds = time.perf_counter() - started
+        self.stdout.write(
+            self.style.SUCCESS(f"{total} positions replayed in {seconds:.2f}s")
+        )
@@ -0,0 +1,101 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:40
+
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+from django.db import migrations, models
+
+
+def open_ledgers(apps, schema_editor):
+    """Start every existing position's ledger with an `adjust` entry, so
+    replaying the ledger reproduces its current quantity and price."""
+    PortfolioItem = apps.get_model("portfolio", "PortfolioItem")
+    PortfolioTransaction = apps.get_model("portfolio", "PortfolioTransaction")
+
+    items = PortfolioItem.objects.only("id", "quantity", "avg_price", "created_at")
+    PortfolioTransaction.objects.bulk_create(
+        (
+            PortfolioTransaction(
+                portfolio_item_id=item.id,
+                side="adjust",
+                quantity=item.quantity,
+                price=item.avg_price,
+                executed_at=item.created_at,
+            )
+            for item in items.iterator(chunk_size=2000)
+        ),
+        batch_size=2000,
+    )
+    PortfolioItem.objects.update(last_executed_at=models.F("created_at"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        (
+            "portfolio",
+            "0002_rename_portfolio_por_asset_52d3de_idx_portfolio_p_asset_i_b4a56f_idx",
+        ),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="portfolioitem",
+            name="last_executed_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="portfolioitem",
+            name="realized_pnl",
+            field=models.DecimalField(decimal_places=8, default=0, max_digits=28),
+        ),
+        migrations.CreateModel(
+            name="PortfolioTransaction",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "side",
+                    models.CharField(
+                        choices=[
+                            ("buy", "Buy"),
+                            ("sell", "Sell"),
+                            ("adjust", "Adjust"),
+                        ],
+                        max_length=6,
+                    ),
+                ),
+                ("quantity", models.DecimalField(decimal_places=8, max_digits=28)),
+                ("price", models.DecimalField(decimal_places=8, max_digits=20)),
+                (
+                    "executed_at",
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "portfolio_item",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="transactions",
+                        to="portfolio.portfolioitem",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["portfolio_item", "executed_at", "created_at"],
+                        name="portfolio_p_portfol_e6c7d2_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(open_ledgers, migrations.RunPython.noop),
+    ]
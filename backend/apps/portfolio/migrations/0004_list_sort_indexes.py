@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("assets", "0008_list_sort_indexes"),
+        ("portfolio", "0003_transaction_ledger"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="portfolioitem",
+            index=models.Index(
+                fields=["updated_at", "id"], name="portfolio_p_updated_9dcafc_idx"
+            ),
+        ),
+    ]
@@ -1,6 +1,7 @@
 import uuid
 
 from django.db import models
+from django.utils import timezone
 
 
 class PortfolioItem(models.Model):
@@ -12,8 +13,11 @@ class PortfolioItem(models.Model):
         related_name="portfolio_item",
     )
 
+    # Running aggregates of the transaction ledger, see apps.portfolio.ledger.
     quantity = models.DecimalField(max_digits=28, decimal_places=8)
     avg_price = models.DecimalField(max_digits=20, decimal_places=8)
+    realized_pnl = models.DecimalField(max_digits=28, decimal_places=8, default=0)
+    last_executed_at = models.DateTimeField(null=True, blank=True)
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -21,8 +25,39 @@ class PortfolioItem(models.Model):
     class Meta:
         indexes = [
             models.Index(fields=["asset"]),
+            models.Index(fields=["updated_at", "id"]),
         ]
 
     def __str__(self) -> str:
         return f"{self.asset.symbol.upper()} - {self.quantity} @ {self.avg_price}"
 
+
+class PortfolioTransaction(models.Model):
+    """One entry of a position's ledger.
+
+    `adjust` entries set the position to `quantity` at an average price of
+    `price`; they record manual edits and opening balances.
+    """
+
+    class Side(models.TextChoices):
+        BUY = "buy", "Buy"
+        SELL = "sell", "Sell"
+        ADJUST = "adjust", "Adjust"
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    portfolio_item = models.ForeignKey(
+        PortfolioItem, on_delete=models.CASCADE, related_name="transactions"
+    )
+    side = models.CharField(max_length=6, choices=Side.choices)
+    quantity = models.DecimalField(max_digits=28, decimal_places=8)
+    price = models.DecimalField(max_digits=20, decimal_places=8)
+    executed_at = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["portfolio_item", "executed_at", "created_at"]),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.side} {self.quantity} @ {self.price}"
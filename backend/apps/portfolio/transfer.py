@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import csv
+import json
+import uuid
+from dataclasses import dataclass, field
+from decimal import Decimal, InvalidOperation
+from functools import partial
+from itertools import islice
+from typing import AsyncIterator, Iterable, Iterator
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from apps.assets.models import Asset
+from apps.portfolio.ledger import LedgerError, Position, apply_trade
+from apps.portfolio.models import PortfolioItem, PortfolioTransaction
+from config.budgets import query_budget_block
+
+DEFAULT_BATCH_SIZE = 1000
+
+# Asset lookup, position upsert and ledger insert, plus the savepoint pair
+# around them when the import already runs inside a transaction.
+BATCH_QUERY_BUDGET = 5
+
+EXPORT_FIELDS = ("asset_id", "symbol", "quantity", "avg_price", "realized_pnl")
+
+_EXPORT_CHUNK_SIZE = 2000
+
+
+@dataclass(frozen=True)
+class PositionRow:
+    asset_id: str
+    quantity: Decimal
+    avg_price: Decimal
+
+
+@dataclass
+class ImportResult:
+    rows: int = 0
+    created: int = 0
+    updated: int = 0
+    missing: list[str] = field(default_factory=list)
+
+
+def _position_row(record: dict) -> PositionRow:
+    asset_id = record.get("asset_id")
+    if not asset_id:
+        raise ValueError("Missing asset_id")
+    try:
+        quantity = Decimal(str(record["quantity"]))
+        avg_price = Decimal(str(record["avg_price"]))
+    except KeyError as exc:
+        raise ValueError(f"Missing {exc.args[0]}") from None
+    except InvalidOperation:
+        raise ValueError("Invalid quantity or avg_price") from None
+    try:
+        position = apply_trade(
+            Position(), PortfolioTransaction.Side.ADJUST, quantity, avg_price
+        )
+    except LedgerError as exc:
+        raise ValueError(str(exc)) from None
+    return PositionRow(str(asset_id), position.quantity, position.avg_price)
+
+
+def read_positions(lines: Iterable[str], fmt: str = "csv") -> Iterator[PositionRow]:
+    """Parse positions lazily from CSV (with header) or NDJSON lines."""
+    if fmt == "ndjson":
+        records = ((num, line) for num, line in enumerate(lines, 1) if line.strip())
+        decode = partial(json.loads, parse_float=Decimal)
+    elif fmt == "csv":
+        records = enumerate(csv.DictReader(lines), start=2)
+        decode = dict
+    else:
+        raise ValueError(f"Unsupported format: {fmt}")
+
+    for line_num, raw in records:
+        try:
+            row = _position_row(decode(raw))
+        except (ValueError, TypeError, AttributeError) as exc:
+            raise ValueError(f"Line {line_num}: {exc}") from exc
+        yield row
+
+
+def import_positions(
+    rows: Iterable[PositionRow], batch_size: int = DEFAULT_BATCH_SIZE
+) -> ImportResult:
+    """Create or overwrite positions in batches, all in one transaction.
+
+    Each batch resolves its assets and their current positions in a single
+    query, upserts the positions and opens their ledger with `adjust`
+    entries. A later row for the same asset wins; unknown assets are
+    reported in `missing`.
+    """
+    result = ImportResult()
+    iterator = iter(rows)
+    with transaction.atomic():
+        while batch := list(islice(iterator, batch_size)):
+            with query_budget_block(BATCH_QUERY_BUDGET, "portfolio import batch"):
+                _import_batch(batch, result)
+    return result
+
+
+def _import_batch(batch: list[PositionRow], result: ImportResult) -> None:
+    result.rows += len(batch)
+    latest = {row.asset_id: row for row in batch}
+    known = dict(
+        Asset.objects.filter(id__in=latest).values_list("id", "portfolio_item__id")
+    )
+    result.missing.extend(asset_id for asset_id in latest if asset_id not in known)
+
+    now = timezone.now()
+    items = []
+    for asset_id, row in latest.items():
+        if asset_id not in known:
+            continue
+        item_id = known[asset_id]
+        if item_id is None:
+            result.created += 1
+        else:
+            result.updated += 1
+        items.append(
+            PortfolioItem(
+                id=item_id or uuid.uuid4(),
+                asset_id=asset_id,
+                quantity=row.quantity,
+                avg_price=row.avg_price,
+                last_executed_at=now,
+            )
+        )
+    if not items:
+        return
+
+    PortfolioItem.objects.bulk_create(
+        items,
+        update_conflicts=True,
+        unique_fields=["id"],
+        update_fields=["quantity", "avg_price", "last_executed_at", "updated_at"],
+    )
+    PortfolioTransaction.objects.bulk_create(
+        PortfolioTransaction(
+            portfolio_item_id=item.id,
+            side=PortfolioTransaction.Side.ADJUST,
+            quantity=item.quantity,
+            price=item.avg_price,
+            executed_at=now,
+        )
+        for item in items
+    )
+
+
+class _Echo:
+    """File-like object whose write() hands the line back to csv.writer."""
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def _export_rows():
+    # values() rather than values_list(): the latter runs its query as soon
+    # as aiterator() sets it up, which is still on the event loop.
+    return PortfolioItem.objects.order_by("asset_id").values(
+        *EXPORT_FIELDS[:1], *EXPORT_FIELDS[2:], symbol=F("asset__symbol")
+    )
+
+
+def _csv_line(writer, row: dict) -> str:
+    return writer.writerow([row[name] for name in EXPORT_FIELDS])
+
+
+def _ndjson_line(row: dict) -> str:
+    # Decimals are written as strings so nothing is lost to floats.
+    values = {name: str(row[name]) for name in EXPORT_FIELDS}
+    return json.dumps(values, separators=(",", ":")) + "\n"
+
+
+def _encoder(fmt: str):
+    if fmt == "csv":
+        writer = csv.writer(_Echo())
+        return writer.writerow(EXPORT_FIELDS), partial(_csv_line, writer)
+    if fmt == "ndjson":
+        return None, _ndjson_line
+    raise ValueError(f"Unsupported format: {fmt}")
+
+
+def export_positions(fmt: str = "csv") -> Iterator[str]:
+    """Every position as CSV or NDJSON lines, read in chunks from a cursor."""
+    header, encode = _encoder(fmt)
+    if header is not None:
+        yield header
+    for row in _export_rows().iterator(chunk_size=_EXPORT_CHUNK_SIZE):
+        yield encode(row)
+
+
+async def aexport_positions(fmt: str = "csv") -> AsyncIterator[str]:
+    """export_positions() for ASGI servers, which stream async iterators."""
+    header, encode = _encoder(fmt)
+    if header is not None:
+        yield header
+    async for row in _export_rows().aiterator(chunk_size=_EXPORT_CHUNK_SIZE):
+        yield encode(row)
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+from decimal import Decimal
+
+from django.db.models import DecimalField, ExpressionWrapper, F, Sum, Window
+from django.db.models.functions import Coalesce
+
+from apps.portfolio.models import PortfolioItem
+
+_MONEY = DecimalField(max_digits=48, decimal_places=16)
+
+# Positions without a current price are valued at their average price,
+# matching how the dashboard has always estimated them.
+MARKET_VALUE = ExpressionWrapper(
+    F("quantity") * Coalesce("asset__current_price", "avg_price"),
+    output_field=_MONEY,
+)
+COST_BASIS = ExpressionWrapper(F("quantity") * F("avg_price"), output_field=_MONEY)
+PNL = ExpressionWrapper(MARKET_VALUE - COST_BASIS, output_field=_MONEY)
+
+
+def _ratio(numerator: Decimal, denominator: Decimal) -> float | None:
+    return float(numerator / denominator) if denominator else None
+
+
+async def portfolio_summary() -> dict:
+    """Value every position and the portfolio totals in one query.
+
+    Totals come from window sums over the same rows, so no second aggregate
+    query is needed.
+    """
+    rows = (
+        PortfolioItem.objects.annotate(
+            market_value=MARKET_VALUE,
+            cost_basis=COST_BASIS,
+            total_value=Window(Sum(MARKET_VALUE)),
+            total_cost=Window(Sum(COST_BASIS)),
+            total_realized=Window(Sum("realized_pnl")),
+        )
+        .order_by("-market_value", "asset_id")
+        .values(
+            "id",
+            "asset_id",
+            "asset__symbol",
+            "asset__name",
+            "asset__current_price",
+            "quantity",
+            "avg_price",
+            "realized_pnl",
+            "market_value",
+            "cost_basis",
+            "total_value",
+            "total_cost",
+            "total_realized",
+        )
+    )
+
+    positions = []
+    total_value = total_cost = total_realized = Decimal(0)
+    async for row in rows:
+        total_value, total_cost = row["total_value"], row["total_cost"]
+        total_realized = row["total_realized"]
+        pnl = row["market_value"] - row["cost_basis"]
+        positions.append(
+            {
+                "id": row["id"],
+                "asset_id": row["asset_id"],
+                "symbol": row["asset__symbol"],
+                "name": row["asset__name"],
+                "current_price": row["asset__current_price"],
+                "quantity": row["quantity"],
+                "avg_price": row["avg_price"],
+                "market_value": row["market_value"],
+                "cost_basis": row["cost_basis"],
+                "pnl": pnl,
+                "pnl_percentage": _ratio(pnl * 100, row["cost_basis"]),
+                "realized_pnl": row["realized_pnl"],
+                "weight": _ratio(row["market_value"], total_value),
+            }
+        )
+
+    pnl = total_value - total_cost
+    return {
+        "total_value": total_value,
+        "total_cost": total_cost,
+        "pnl": pnl,
+        "pnl_percentage": _ratio(pnl * 100, total_cost),
+        "realized_pnl": total_realized,
+        "positions": positions,
+    }
@@ -0,0 +1,241 @@
+"""Latency and queries-per-request for the main API endpoints.
+
+    python -m benchmarks.bench_api [--assets 20000] [--repeat 30]
+        [--output bench-results.json] [--baseline previous.json]
+        [--max-regression 0.25]
+
+Seeds a throwaway test database (in-memory SQLite by default; run with
+DJANGO_SETTINGS_MODULE=config.settings and DATABASE_URL pointing at a
+PostgreSQL server to benchmark there) with a synthetic catalog, then
+requests every scenario through Django's test client. "cold" clears the
+cache before each request so the database path is measured; "warm"
+repeats the request against a primed cache.
+
+With --baseline, exits with status 1 when any scenario's p95 grew by more
+than --max-regression (and by at least --min-delta-ms) or it issues more
+queries than in the baseline.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+
+@dataclass(frozen=True)
+class Scenario:
+    path: str
+    params: dict
+    cold: bool = True
+
+
+def _scenarios(assets: int, deep_cursor: str) -> dict[str, Scenario]:
+    deep_page = max(1, assets // 20 // 2)
+    return {
+        "assets_first_page": Scenario("/api/assets", {"page_size": 20}),
+        "assets_deep_page": Scenario(
+            "/api/assets", {"page": deep_page, "page_size": 20}
+        ),
+        "assets_deep_cursor": Scenario(
+            "/api/assets",
+            {"cursor": deep_cursor, "page_size": 20, "include_total": "false"},
+        ),
+        "assets_search": Scenario("/api/assets", {"search": "bit", "page_size": 20}),
+        "assets_search_exact": Scenario(
+            "/api/assets", {"search": "xabc", "page_size": 20}
+        ),
+        "asset_detail": Scenario("/api/assets/synthetic-100", {}),
+        "assets_autocomplete": Scenario(
+            "/api/assets/autocomplete", {"q": "bi"}, cold=False
+        ),
+        "assets_changes": Scenario("/api/assets/changes", {"limit": 100}),
+        "favorites": Scenario("/api/favorites", {}),
+        "portfolio": Scenario("/api/portfolio", {}),
+        "portfolio_summary": Scenario("/api/portfolio/summary", {}),
+    }
+
+
+def _setup(args) -> None:
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.test_settings")
+    os.environ.setdefault("DJANGO_SEED_ASSETS", "false")
+
+    import django
+
+    django.setup()
+
+    from django.test.runner import DiscoverRunner
+    from django.test.utils import setup_test_environment
+
+    setup_test_environment()
+    DiscoverRunner(verbosity=0).setup_databases()
+
+    from apps.assets.models import Asset
+    from apps.assets.seed import insert_batched, synthetic_assets, synthetic_sample
+    from apps.favorites.models import Favorite
+    from apps.portfolio.models import PortfolioItem
+
+    started = time.perf_counter()
+    for _ in insert_batched(Asset, synthetic_assets(args.assets), 5000):
+        pass
+    Favorite.objects.bulk_create(
+        Favorite(asset_id=asset_id)
+        for asset_id in synthetic_sample(args.assets, args.favorites, 1)
+    )
+    prices = Asset.objects.filter(
+        id__in=synthetic_sample(args.assets, args.portfolio_items, 2)
+    ).values_list("id", "current_price")
+    PortfolioItem.objects.bulk_create(
+        PortfolioItem(asset_id=asset_id, quantity=1, avg_price=price)
+        for asset_id, price in prices
+    )
+    print(
+        f"seeded {args.assets} assets in {time.perf_counter() - started:.1f}s",
+        file=sys.stderr,
+    )
+
+
+def _deep_cursor(assets: int) -> str:
+    from django.db.models import F
+
+    from apps.assets.models import Asset
+    from apps.assets.pagination import Cursor, encode_cursor
+
+    row = Asset.objects.order_by(
+        F("market_cap_rank").asc(nulls_last=True), "symbol", "id"
+    ).values_list("market_cap_rank", "symbol", "id")[assets // 2]
+    return encode_cursor(Cursor(*row))
+
+
+def _measure(client, scenario: Scenario, repeat: int, cold: bool) -> dict:
+    from django.core.cache import cache
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    samples, queries = [], 0
+    for attempt in range(repeat + 1):
+        if cold:
+            cache.clear()
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            response = client.get(scenario.path, scenario.params)
+            elapsed = time.perf_counter() - started
+        assert response.status_code == 200, (scenario.path, response.status_code)
+        if attempt:  # the first request only warms up
+            samples.append(elapsed * 1000)
+            queries = max(queries, len(captured))
+
+    percentiles = statistics.quantiles(samples, n=100)
+    return {
+        "p50_ms": round(percentiles[49], 3),
+        "p95_ms": round(percentiles[94], 3),
+        "p99_ms": round(percentiles[98], 3),
+        "queries": queries,
+    }
+
+
+def run(args) -> dict:
+    _setup(args)
+
+    from django.db import connection
+    from django.test import Client
+
+    from apps.assets.autocomplete import asset_index
+
+    client = Client()
+    asset_index.invalidate()
+    results = {}
+    for name, scenario in _scenarios(args.assets, _deep_cursor(args.assets)).items():
+        modes = ("cold", "warm") if scenario.cold else ("warm",)
+        results[name] = {
+            mode: _measure(client, scenario, args.repeat, cold=mode == "cold")
+            for mode in modes
+        }
+
+    return {
+        "meta": {
+            "vendor": connection.vendor,
+            "assets": args.assets,
+            "favorites": args.favorites,
+            "portfolio_items": args.portfolio_items,
+            "repeat": args.repeat,
+            "python": platform.python_version(),
+            "created_at": datetime.now(timezone.utc).isoformat(),
+        },
+        "scenarios": results,
+    }
+
+
+def compare(
+    current: dict, baseline: dict, max_regression: float, min_delta_ms: float
+) -> list[str]:
+    failures = []
+    for name, modes in baseline["scenarios"].items():
+        for mode, before in modes.items():
+            after = current["scenarios"].get(name, {}).get(mode)
+            if after is None:
+                continue
+            if after["queries"] > before["queries"]:
+                failures.append(
+                    f"{name}/{mode}: {after['queries']} queries "
+                    f"(baseline {before['queries']})"
+                )
+            limit = max(
+                before["p95_ms"] * (1 + max_regression),
+                before["p95_ms"] + min_delta_ms,
+            )
+            if after["p95_ms"] > limit:
+                failures.append(
+                    f"{name}/{mode}: p95 {after['p95_ms']:.2f} ms "
+                    f"> {limit:.2f} ms (baseline {before['p95_ms']:.2f} ms)"
+                )
+    return failures
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--assets", type=int, default=20000)
+    parser.add_argument("--favorites", type=int, default=200)
+    parser.add_argument("--portfolio-items", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument("--output", default="bench-results.json")
+    parser.add_argument("--baseline")
+    parser.add_argument("--max-regression", type=float, default=0.25)
+    parser.add_argument(
+        "--min-delta-ms",
+        type=float,
+        default=1.0,
+        help="Ignore p95 increases smaller than this, whatever the ratio",
+    )
+    args = parser.parse_args()
+
+    results = run(args)
+    with open(args.output, "w") as output:
+        json.dump(results, output, indent=2)
+
+    print(f"{'scenario':<22} {'mode':<5} {'p50':>9} {'p95':>9} {'p99':>9} queries")
+    for name, modes in results["scenarios"].items():
+        for mode, stats in modes.items():
+            print(
+                f"{name:<22} {mode:<5} {stats['p50_ms']:>7.2f}ms "
+                f"{stats['p95_ms']:>7.2f}ms {stats['p99_ms']:>7.2f}ms "
+                f"{stats['queries']:>7}"
+            )
+
+    if args.baseline:
+        with open(args.baseline) as baseline:
+            failures = compare(
+                results, json.load(baseline), args.max_regression, args.min_delta_ms
+            )
+        for failure in failures:
+            print(f"REGRESSION {failure}", file=sys.stderr)
+        if failures:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""Compare the schema-validated and the fast list rendering paths.
+
+    python -m benchmarks.bench_rendering [--rows 100] [--repeat 200]
+
+Runs against an in-memory SQLite database seeded with `--rows` portfolio
+items and renders the same page both ways: model instances validated by
+`PortfolioItemOut` and rendered by ninja's JSONRenderer, versus
+`values_list()` rows shaped by hand and rendered by ORJSONRenderer.
+"""
+
+import argparse
+import os
+import statistics
+import time
+from decimal import Decimal
+
+
+def _setup(rows: int) -> None:
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.test_settings")
+
+    import django
+
+    django.setup()
+
+    from django.core.management import call_command
+
+    from apps.assets.models import Asset
+    from apps.portfolio.models import PortfolioItem
+
+    call_command("migrate", verbosity=0)
+    assets = Asset.objects.bulk_create(
+        Asset(
+            id=f"asset-{index}",
+            symbol=f"a{index}",
+            name=f"Asset {index}",
+            image=f"https://example.com/{index}.png",
+            current_price=Decimal("1234.56789012"),
+            price_change_percentage_24h=Decimal("-1.2345"),
+            market_cap_rank=index + 1,
+        )
+        for index in range(rows)
+    )
+    PortfolioItem.objects.bulk_create(
+        PortfolioItem(asset=asset, quantity=Decimal("1.5"), avg_price=Decimal("10"))
+        for asset in assets
+    )
+
+
+def _schema_path() -> bytes:
+    from ninja.renderers import JSONRenderer
+
+    from apps.portfolio.api import PortfolioItemOut
+    from apps.portfolio.models import PortfolioItem
+
+    items = PortfolioItem.objects.select_related("asset").order_by("-updated_at")
+    data = [PortfolioItemOut.from_orm(item).dict() for item in items]
+    return JSONRenderer().render(None, data, response_status=200).encode()
+
+
+def _fast_path() -> bytes:
+    from apps.assets.serializers import asset_from_row, related_fields
+    from apps.portfolio.models import PortfolioItem
+    from config.renderers import ORJSONRenderer
+
+    rows = PortfolioItem.objects.order_by("-updated_at").values_list(
+        "id", "quantity", "avg_price", "realized_pnl", *related_fields("asset")
+    )
+    data = [
+        {
+            "id": row[0],
+            "asset": asset_from_row(row, 4),
+            "quantity": float(row[1]),
+            "avg_price": float(row[2]),
+            "realized_pnl": float(row[3]),
+        }
+        for row in rows
+    ]
+    return ORJSONRenderer().render(None, data, response_status=200)
+
+
+def _measure(func, repeat: int) -> list[float]:
+    func()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    _setup(args.rows)
+
+    import json
+
+    assert json.loads(_schema_path()) == json.loads(_fast_path())
+
+    results = {
+        "schema": _measure(_schema_path, args.repeat),
+        "fast": _measure(_fast_path, args.repeat),
+    }
+    for name, samples in results.items():
+        print(
+            f"{name:>6}: median {statistics.median(samples):.3f} ms, "
+            f"p95 {statistics.quantiles(samples, n=20)[-1]:.3f} ms"
+        )
+
+    speedup = statistics.median(results["schema"]) / statistics.median(results["fast"])
+    print(f"speed-up: {speedup:.2f}x for {args.rows} rows")
+
+
+if __name__ == "__main__":
+    main()
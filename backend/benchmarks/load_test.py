@@ -0,0 +1,109 @@
+"""Closed-loop HTTP load test for comparing the WSGI and ASGI stacks.
+
+    python -m benchmarks.load_test http://127.0.0.1:8000/api/assets \\
+        [--concurrency 50] [--duration 10] [--path /api/portfolio ...]
+
+Each of `--concurrency` clients sends GET requests back to back over a
+keep-alive connection (reconnecting when the server closes it), cycling
+through the given paths, for `--duration` seconds. Reports throughput and
+latency percentiles; only the standard library is needed.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from urllib.parse import urlsplit
+
+
+async def _request(reader, writer, host: str, path: str) -> tuple[int, bool]:
+    request = f"GET {path} HTTP/1.1\r\nHost: {host}\r\nConnection: keep-alive\r\n\r\n"
+    writer.write(request.encode())
+    await writer.drain()
+
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionResetError
+    status = int(status_line.split()[1])
+    length, keep_alive = 0, True
+    while (line := await reader.readline()) not in (b"\r\n", b""):
+        name, _, value = line.decode("latin-1").partition(":")
+        name, value = name.strip().lower(), value.strip().lower()
+        if name == "content-length":
+            length = int(value)
+        elif name == "connection" and value == "close":
+            keep_alive = False
+    await reader.readexactly(length)
+    return status, keep_alive
+
+
+async def _client(host, port, paths, deadline, latencies, errors) -> None:
+    connection = None
+    index = 0
+    while time.perf_counter() < deadline:
+        if connection is None:
+            connection = await asyncio.open_connection(host, port)
+        path = paths[index % len(paths)]
+        index += 1
+        started = time.perf_counter()
+        try:
+            status, keep_alive = await _request(*connection, f"{host}:{port}", path)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            connection[1].close()
+            connection = None
+            continue
+        latencies.append(time.perf_counter() - started)
+        if status >= 400:
+            errors.append(status)
+        if not keep_alive:
+            connection[1].close()
+            connection = None
+    if connection is not None:
+        connection[1].close()
+
+
+async def run(url: str, paths: list[str], concurrency: int, duration: float) -> dict:
+    parts = urlsplit(url)
+    paths = [parts.path + (f"?{parts.query}" if parts.query else ""), *paths]
+    latencies: list[float] = []
+    errors: list[int] = []
+    host, port = parts.hostname, parts.port or 80
+    started = time.perf_counter()
+    deadline = started + duration
+    await asyncio.gather(
+        *(
+            _client(host, port, paths, deadline, latencies, errors)
+            for _ in range(concurrency)
+        )
+    )
+    elapsed = time.perf_counter() - started
+
+    percentiles = statistics.quantiles(latencies, n=100)
+    return {
+        "requests": len(latencies),
+        "errors": len(errors),
+        "rps": len(latencies) / elapsed,
+        "p50_ms": percentiles[49] * 1000,
+        "p95_ms": percentiles[94] * 1000,
+        "p99_ms": percentiles[98] * 1000,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("url")
+    parser.add_argument("--path", action="append", default=[])
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=10)
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args.url, args.path, args.concurrency, args.duration))
+    print(
+        f"{result['requests']} requests ({result['errors']} errors), "
+        f"{result['rps']:.1f} req/s, p50 {result['p50_ms']:.1f} ms, "
+        f"p95 {result['p95_ms']:.1f} ms, p99 {result['p99_ms']:.1f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,36 @@
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse
 from ninja import NinjaAPI
 
+from config.metrics import serializing
+from config.profiling import profile_operation
 
-api = NinjaAPI(title="Crypto Portfolio API")
 
+def _renderer():
+    if not settings.API_ORJSON_RENDERER:
+        return None
+
+    from config.renderers import ORJSONRenderer
+
+    return ORJSONRenderer()
+
+
+class API(NinjaAPI):
+    """Reports response rendering as serialization time in the request metrics."""
+
+    def create_response(self, request: HttpRequest, data, **kwargs) -> HttpResponse:
+        with serializing():
+            return super().create_response(request, data, **kwargs)
+
+
+api = API(title="Crypto Portfolio API", renderer=_renderer())
+api.add_decorator(profile_operation, mode="view")
+
+
+def render(request: HttpRequest, data, status: int = 200) -> HttpResponse:
+    """Render `data` as-is, skipping response schema validation.
+
+    For hot list endpoints whose payloads are already built in the exact
+    shape of their declared response schema.
+    """
+    return api.create_response(request, data, status=status)
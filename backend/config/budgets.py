@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import logging
+from contextlib import contextmanager
+from functools import wraps
+from typing import Iterator
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from ninja.decorators import decorate_view
+
+from config.metrics import tracking
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+@contextmanager
+def query_budget_block(max_queries: int, label: str = "block") -> Iterator[None]:
+    """Check that the enclosed block runs at most `max_queries` queries.
+
+    Over budget, `API_QUERY_BUDGETS = "raise"` raises QueryBudgetExceeded
+    (the test settings do) and `"warn"` logs a warning; `"off"` skips the
+    bookkeeping altogether.
+    """
+    mode = settings.API_QUERY_BUDGETS
+    if mode == "off":
+        yield
+        return
+
+    with tracking() as metrics:
+        before = metrics.queries
+        yield
+        used = metrics.queries - before
+
+    if used > max_queries:
+        message = f"{label} ran {used} queries, budget is {max_queries}"
+        if mode == "raise":
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
+
+
+def query_budget(max_queries: int | None):
+    """Declare the most queries an API operation may run.
+
+    Place it right under the route decorator so the budget also covers the
+    conditional-GET fingerprint and response serialization. None marks
+    batched operations whose cost grows with the input; those check a
+    budget per batch with query_budget_block() instead.
+    """
+
+    def decorator(view):
+        label = view.__qualname__
+
+        def wrap_run(run):
+            if max_queries is None:
+
+                @wraps(run)
+                def inner(request, *args, **kwargs):
+                    return run(request, *args, **kwargs)
+
+            elif iscoroutinefunction(run):
+
+                @wraps(run)
+                async def inner(request, *args, **kwargs):
+                    with query_budget_block(max_queries, label):
+                        return await run(request, *args, **kwargs)
+
+            else:
+
+                @wraps(run)
+                def inner(request, *args, **kwargs):
+                    with query_budget_block(max_queries, label):
+                        return run(request, *args, **kwargs)
+
+            inner.query_budget = max_queries
+            return inner
+
+        return decorate_view(wrap_run)(view)
+
+    return decorator
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import hashlib
+from dataclasses import dataclass
+from datetime import datetime
+from functools import wraps
+from typing import Awaitable, Callable
+
+from django.views.decorators.http import condition
+from ninja.decorators import decorate_view
+
+
+@dataclass(frozen=True)
+class Fingerprint:
+    """Cheap summary of the rows behind a response: the newest `updated_at`
+    and how many rows there are (so deletions change it too)."""
+
+    last_modified: datetime | None
+    count: int = 1
+
+
+def latest(*values: datetime | None) -> datetime | None:
+    return max((value for value in values if value is not None), default=None)
+
+
+def conditional(
+    fingerprint: Callable[..., Awaitable[Fingerprint | None]],
+    *,
+    last_modified: bool = True,
+):
+    """Answer conditional GETs with 304 before the view runs.
+
+    `fingerprint` is awaited with the request and the raw path parameters
+    and returns None when the resource does not exist. The strong ETag
+    covers the full path, so every query string gets its own validator.
+
+    Collections pass `last_modified=False`: deleting a row leaves the
+    newest `updated_at` untouched, so `If-Modified-Since` would keep
+    answering 304. Their ETag still changes with the row count.
+    """
+
+    def _etag(request, *args, **kwargs) -> str | None:
+        resolved = request._fingerprint
+        if resolved is None:
+            return None
+        stamp = resolved.last_modified.isoformat() if resolved.last_modified else ""
+        payload = f"{request.get_full_path()}|{stamp}|{resolved.count}"
+        return hashlib.md5(payload.encode(), usedforsecurity=False).hexdigest()
+
+    def _last_modified(request, *args, **kwargs) -> datetime | None:
+        resolved = request._fingerprint
+        return resolved.last_modified if resolved else None
+
+    # Django's condition() calls its validator functions synchronously, so
+    # the fingerprint is awaited up front and stashed on the request.
+    def _resolve_first(view):
+        @wraps(view)
+        async def inner(request, *args, **kwargs):
+            request._fingerprint = await fingerprint(request, **kwargs)
+            return await view(request, *args, **kwargs)
+
+        return inner
+
+    return decorate_view(
+        condition(
+            etag_func=_etag,
+            last_modified_func=_last_modified if last_modified else None,
+        ),
+        _resolve_first,
+    )
@@ -0,0 +1,275 @@
+from __future__ import annotations
+
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import Iterator
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import Http404, HttpResponse
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+@dataclass
+class RequestMetrics:
+    queries: int = 0
+    db_seconds: float = 0.0
+    serialize_seconds: float = 0.0
+
+
+_current: ContextVar[RequestMetrics | None] = ContextVar(
+    "request_metrics", default=None
+)
+
+
+def _record_query(execute, sql, params, many, context):
+    current = _current.get()
+    if current is None:
+        return execute(sql, params, many, context)
+    started = perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        current.db_seconds += perf_counter() - started
+        current.queries += 1
+
+
+def _instrument(connection, **kwargs) -> None:
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+connection_created.connect(_instrument)
+
+
+def _instrument_open_connections() -> None:
+    # Connections opened before this module was imported missed the
+    # connection_created signal; only this thread's can be reached.
+    for connection in connections.all(initialized_only=True):
+        _instrument(connection)
+
+
+_instrument_open_connections()
+
+
+@contextmanager
+def tracking() -> Iterator[RequestMetrics]:
+    """Metrics of the request being recorded, or fresh ones for the block
+    when the middleware is not recording."""
+    current = _current.get()
+    if current is not None:
+        yield current
+        return
+    _instrument_open_connections()
+    current = RequestMetrics()
+    token = _current.set(current)
+    try:
+        yield current
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def serializing():
+    """Count the enclosed block as serialization time of the current request."""
+    current = _current.get()
+    if current is None:
+        yield
+        return
+    started = perf_counter()
+    try:
+        yield
+    finally:
+        current.serialize_seconds += perf_counter() - started
+
+
+@dataclass
+class _Histogram:
+    buckets: tuple
+    counts: list[int] = field(default_factory=list)
+    sum: float = 0.0
+
+    def __post_init__(self) -> None:
+        self.counts = [0] * (len(self.buckets) + 1)
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+
+@dataclass
+class _RouteStats:
+    duration: _Histogram = field(default_factory=lambda: _Histogram(DURATION_BUCKETS))
+    queries: _Histogram = field(default_factory=lambda: _Histogram(QUERY_BUCKETS))
+    db_seconds: float = 0.0
+    serialize_seconds: float = 0.0
+    responses: dict[int, int] = field(default_factory=dict)
+
+
+class MetricsRegistry:
+    """Per-process aggregates keyed by `(method, route)`.
+
+    Routes are URL patterns rather than paths, so the number of series
+    stays bounded however many assets are requested.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._routes: dict[tuple[str, str], _RouteStats] = {}
+
+    def observe(
+        self,
+        method: str,
+        route: str,
+        status: int,
+        seconds: float,
+        metrics: RequestMetrics,
+    ) -> None:
+        with self._lock:
+            stats = self._routes.get((method, route))
+            if stats is None:
+                stats = self._routes[(method, route)] = _RouteStats()
+            stats.duration.observe(seconds)
+            stats.queries.observe(metrics.queries)
+            stats.db_seconds += metrics.db_seconds
+            stats.serialize_seconds += metrics.serialize_seconds
+            stats.responses[status] = stats.responses.get(status, 0) + 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self._routes.clear()
+
+    def render(self) -> str:
+        with self._lock:
+            routes = [
+                (f'method="{_escape(method)}",route="{_escape(route)}"', stats)
+                for (method, route), stats in sorted(self._routes.items())
+            ]
+
+            lines = _header("http_requests_total", "counter", "Responses by status.")
+            for labels, stats in routes:
+                lines.extend(
+                    f'http_requests_total{{{labels},status="{status}"}} {count}'
+                    for status, count in sorted(stats.responses.items())
+                )
+
+            name = "http_request_duration_seconds"
+            lines += _header(name, "histogram", "Time to produce a response.")
+            for labels, stats in routes:
+                lines.extend(_histogram(name, labels, stats.duration))
+
+            name = "http_request_db_queries"
+            lines += _header(name, "histogram", "Database queries per request.")
+            for labels, stats in routes:
+                lines.extend(_histogram(name, labels, stats.queries))
+
+            name = "http_request_db_seconds_total"
+            lines += _header(name, "counter", "Time spent waiting on the database.")
+            for labels, stats in routes:
+                lines.append(f"{name}{{{labels}}} {stats.db_seconds:.6f}")
+
+            name = "http_request_serialize_seconds_total"
+            lines += _header(name, "counter", "Time spent rendering response bodies.")
+            for labels, stats in routes:
+                lines.append(f"{name}{{{labels}}} {stats.serialize_seconds:.6f}")
+
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _header(name: str, kind: str, help_text: str) -> list[str]:
+    return [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+
+
+def _histogram(name: str, labels: str, histogram: _Histogram) -> list[str]:
+    lines = []
+    cumulative = 0
+    for bound, count in zip((*histogram.buckets, "+Inf"), histogram.counts):
+        cumulative += count
+        lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+    lines.append(f"{name}_sum{{{labels}}} {histogram.sum:.6f}")
+    lines.append(f"{name}_count{{{labels}}} {cumulative}")
+    return lines
+
+
+registry = MetricsRegistry()
+
+
+def server_timing(metrics: RequestMetrics, seconds: float) -> str:
+    return (
+        f'db;dur={metrics.db_seconds * 1000:.2f};desc="{metrics.queries} queries", '
+        f"serialize;dur={metrics.serialize_seconds * 1000:.2f}, "
+        f"total;dur={seconds * 1000:.2f}"
+    )
+
+
+class MetricsMiddleware:
+    """Per-route query count, database, serialization and total time.
+
+    Each request gets a `Server-Timing` header and feeds the histograms
+    served by `/api/_metrics`. Disabled unless `API_METRICS_ENABLED`.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response) -> None:
+        if not settings.API_METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        _instrument_open_connections()
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        started = perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._finish(request, response, metrics, perf_counter() - started)
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        started = perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._finish(request, response, metrics, perf_counter() - started)
+
+    def _finish(self, request, response, metrics, seconds):
+        match = request.resolver_match
+        route = match.route if match else UNMATCHED_ROUTE
+        registry.observe(request.method, route, response.status_code, seconds, metrics)
+        response["Server-Timing"] = server_timing(metrics, seconds)
+        return response
+
+
+def metrics_view(request):
+    """Prometheus text exposition of this process's request metrics."""
+    if not settings.API_METRICS_ENABLED:
+        raise Http404
+    return HttpResponse(
+        registry.render(), content_type="text/plain; version=0.0.4; charset=utf-8"
+    )
@@ -0,0 +1,328 @@
+from __future__ import annotations
+
+import asyncio
+import io
+import json
+import marshal
+import pstats
+import random
+import re
+import sys
+import threading
+import uuid
+from collections import Counter
+from contextvars import ContextVar
+from functools import wraps
+from pathlib import Path
+from time import perf_counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core import signing
+from django.core.exceptions import MiddlewareNotUsed, PermissionDenied
+from django.http import FileResponse, Http404, HttpResponse, JsonResponse
+from django.utils import timezone
+
+PROFILE_HEADER = "X-Profile"
+
+_SALT = "config.profiling"
+_NAME = re.compile(r"^[\w.-]+$")
+_SORT_KEYS = ("cumulative", "tottime", "calls")
+
+# Seconds between stack samples.
+SAMPLE_INTERVAL = 0.001
+
+# One capture at a time keeps the sampler's overhead off all but one
+# request.
+_capturing = threading.Lock()
+_capture: ContextVar[_Sampler | None] = ContextVar("profile_capture", default=None)
+
+
+class _Sampler(threading.Thread):
+    """Samples the stacks of the threads one request runs on.
+
+    cProfile only sees the thread it is enabled on, while a request is
+    spread over several: the WSGI worker or event loop running the
+    middleware, asgiref's loop thread driving async views under WSGI and
+    the thread `sync_to_async` runs ORM calls on. Each thread joins with
+    `watch()`; the samples are written as pstats stats, with call counts
+    standing for samples.
+
+    An event loop runs every request in flight, so its thread is only
+    sampled while the request's own task is the one running.
+    """
+
+    def __init__(self) -> None:
+        super().__init__(name="api-profiler", daemon=True)
+        self.threads: dict[int, asyncio.Task | None] = {}
+        self.stacks: Counter[tuple] = Counter()
+        self._stopped = threading.Event()
+
+    def watch(self, task: asyncio.Task | None = None) -> None:
+        self.threads[threading.get_ident()] = task
+
+    def run(self) -> None:
+        while not self._stopped.wait(SAMPLE_INTERVAL):
+            frames = sys._current_frames()
+            for ident, task in tuple(self.threads.items()):
+                frame = frames.get(ident)
+                if frame is None:
+                    continue
+                if (
+                    task is not None
+                    and asyncio.current_task(task.get_loop()) is not task
+                ):
+                    continue
+                self.stacks[_stack(frame)] += 1
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+    def dump_stats(self, path: Path) -> None:
+        self.join()
+        with open(path, "wb") as file:
+            marshal.dump(_stats(self.stacks), file)
+
+
+def _stack(frame) -> tuple:
+    stack = []
+    while frame is not None:
+        code = frame.f_code
+        stack.append((code.co_filename, code.co_firstlineno, code.co_name))
+        frame = frame.f_back
+    return tuple(reversed(stack))
+
+
+def _stats(stacks: Counter) -> dict:
+    """pstats' `{function: (cc, nc, tt, ct, callers)}` from sampled stacks."""
+    stats: dict = {}
+    for stack, count in stacks.items():
+        seconds = count * SAMPLE_INTERVAL
+        seen = set()
+        for depth, function in enumerate(stack):
+            entry = stats.setdefault(function, [0, 0, 0.0, 0.0, {}])
+            leaf = depth == len(stack) - 1
+            if leaf:
+                entry[2] += seconds
+            # A recursive function counts once per sample.
+            if function in seen:
+                continue
+            seen.add(function)
+            entry[0] += count
+            entry[1] += count
+            entry[3] += seconds
+            if depth:
+                caller = entry[4].setdefault(stack[depth - 1], [0, 0, 0.0, 0.0])
+                caller[0] += count
+                caller[1] += count
+                caller[2] += seconds if leaf else 0.0
+                caller[3] += seconds
+    return {
+        function: (
+            cc,
+            nc,
+            tt,
+            ct,
+            {key: tuple(value) for key, value in callers.items()},
+        )
+        for function, (cc, nc, tt, ct, callers) in stats.items()
+    }
+
+
+def profile_operation(run):
+    """API view decorator adding the threads an operation runs on to the
+    request's capture, if it is being profiled."""
+    if not iscoroutinefunction(run):
+
+        @wraps(run)
+        def inner(request, *args, **kwargs):
+            sampler = _capture.get()
+            if sampler is not None:
+                sampler.watch()
+            return run(request, *args, **kwargs)
+
+        return inner
+
+    @wraps(run)
+    async def ainner(request, *args, **kwargs):
+        sampler = _capture.get()
+        if sampler is not None:
+            sampler.watch(asyncio.current_task())
+            await sync_to_async(sampler.watch)()
+        return await run(request, *args, **kwargs)
+
+    return ainner
+
+
+def profile_token() -> str:
+    """Value for the `X-Profile` header that asks for one request to be
+    profiled, valid for `API_PROFILE_TOKEN_MAX_AGE` seconds."""
+    return signing.TimestampSigner(salt=_SALT).sign("profile")
+
+
+def _requested(request) -> bool:
+    token = request.headers.get(PROFILE_HEADER)
+    if token is None:
+        return False
+    try:
+        signing.TimestampSigner(salt=_SALT).unsign(
+            token, max_age=settings.API_PROFILE_TOKEN_MAX_AGE
+        )
+    except signing.BadSignature:
+        return False
+    return True
+
+
+def _trigger(request) -> str | None:
+    # Skip non-API paths and the /api/_metrics and /api/_profiles endpoints.
+    if not request.path.startswith("/api/") or request.path.startswith("/api/_"):
+        return None
+    if _requested(request):
+        return "header"
+    if random.random() < settings.API_PROFILE_SAMPLE_RATE:
+        return "sample"
+    return None
+
+
+def _directory() -> Path:
+    return Path(settings.API_PROFILE_DIR)
+
+
+def _save(request, response, sampler: _Sampler, seconds: float, trigger: str) -> None:
+    match = request.resolver_match
+    route = match.route if match else request.path
+    started = timezone.now()
+    slug = re.sub(r"\W+", "-", route).strip("-") or "root"
+    name = f"{started:%Y%m%dT%H%M%S}-{request.method.lower()}-{slug}"
+    name = f"{name}-{uuid.uuid4().hex[:8]}"
+
+    directory = _directory()
+    directory.mkdir(parents=True, exist_ok=True)
+    sampler.dump_stats(directory / f"{name}.prof")
+    (directory / f"{name}.json").write_text(
+        json.dumps(
+            {
+                "name": name,
+                "created_at": started.isoformat(),
+                "method": request.method,
+                "route": route,
+                "path": request.path,
+                "params": {key: request.GET.getlist(key) for key in request.GET},
+                "status": response.status_code,
+                "duration_ms": round(seconds * 1000, 3),
+                "trigger": trigger,
+            }
+        )
+    )
+    _rotate(directory)
+
+
+def _rotate(directory: Path) -> None:
+    captured = sorted(directory.glob("*.json"), reverse=True)
+    for stale in captured[settings.API_PROFILE_MAX_FILES :]:
+        stale.with_suffix(".prof").unlink(missing_ok=True)
+        stale.unlink(missing_ok=True)
+
+
+class ProfilingMiddleware:
+    """Profile sampled or explicitly requested API requests.
+
+    A request is captured when it carries a valid `X-Profile` token or
+    falls within `API_PROFILE_SAMPLE_RATE`. Stats and a JSON sidecar with
+    the route and query parameters go to `API_PROFILE_DIR`, which keeps
+    the newest `API_PROFILE_MAX_FILES` captures.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response) -> None:
+        if not settings.API_PROFILING_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        trigger = _trigger(request)
+        if trigger is None or not _capturing.acquire(blocking=False):
+            return self.get_response(request)
+        try:
+            sampler = _Sampler()
+            sampler.watch()
+            token = _capture.set(sampler)
+            started = perf_counter()
+            sampler.start()
+            try:
+                response = self.get_response(request)
+            finally:
+                sampler.stop()
+                _capture.reset(token)
+            _save(request, response, sampler, perf_counter() - started, trigger)
+        finally:
+            _capturing.release()
+        return response
+
+    async def __acall__(self, request):
+        trigger = _trigger(request)
+        if trigger is None or not _capturing.acquire(blocking=False):
+            return await self.get_response(request)
+        try:
+            sampler = _Sampler()
+            sampler.watch(asyncio.current_task())
+            token = _capture.set(sampler)
+            started = perf_counter()
+            sampler.start()
+            try:
+                response = await self.get_response(request)
+            finally:
+                sampler.stop()
+                _capture.reset(token)
+            # Joining the sampler and writing files would block the loop.
+            await sync_to_async(_save, thread_sensitive=False)(
+                request, response, sampler, perf_counter() - started, trigger
+            )
+        finally:
+            _capturing.release()
+        return response
+
+
+def _staff_only(request) -> None:
+    if not settings.API_PROFILING_ENABLED:
+        raise Http404
+    if not (request.user.is_active and request.user.is_staff):
+        raise PermissionDenied
+
+
+def profiles_view(request):
+    """Captured profiles, newest first, and a fresh `X-Profile` token."""
+    _staff_only(request)
+    captured = sorted(_directory().glob("*.json"), reverse=True)
+    return JsonResponse(
+        {
+            "header": PROFILE_HEADER,
+            "token": profile_token(),
+            "profiles": [json.loads(path.read_text()) for path in captured],
+        }
+    )
+
+
+def profile_view(request, name: str):
+    """`pstats` report of one capture (`?sort=cumulative|tottime|calls`);
+    `?download=1` returns the raw stats file for snakeviz and friends."""
+    _staff_only(request)
+    path = _directory() / f"{name}.prof"
+    if not _NAME.match(name) or not path.exists():
+        raise Http404
+    if request.GET.get("download"):
+        return FileResponse(path.open("rb"), as_attachment=True, filename=path.name)
+
+    sort = request.GET.get("sort", "cumulative")
+    if sort not in _SORT_KEYS:
+        sort = "cumulative"
+    report = io.StringIO()
+    pstats.Stats(str(path), stream=report).sort_stats(sort).print_stats(50)
+    return HttpResponse(report.getvalue(), content_type="text/plain; charset=utf-8")
@@ -17,6 +17,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
 
     "corsheaders",
 
@@ -26,6 +27,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "config.metrics.MetricsMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -34,6 +36,7 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "config.profiling.ProfilingMiddleware",
 ]
 
 ROOT_URLCONF = "config.urls"
@@ -51,6 +54,26 @@ DATABASES = {
     )
 }
 
+# The asset catalog version lives in this cache, so every process serving
+# the API (and ingest_prices) must share it; LocMemCache only suits a single
+# process. See "Cache compartilhado" in the README.
+CACHE_BACKEND = os.getenv(
+    "DJANGO_CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+)
+
+CACHES = {
+    "default": {
+        "BACKEND": CACHE_BACKEND,
+        "LOCATION": os.getenv("DJANGO_CACHE_LOCATION", "crypto-portfolio"),
+        "TIMEOUT": 300,
+    }
+}
+
+if CACHE_BACKEND.endswith("LocMemCache"):
+    CACHES["default"]["OPTIONS"] = {
+        "MAX_ENTRIES": int(os.getenv("DJANGO_CACHE_MAX_ENTRIES", "10000")),
+    }
+
 TEMPLATES = [
     {
         "BACKEND": "django.template.backends.django.DjangoTemplates",
@@ -98,5 +121,53 @@ CORS_ALLOW_ALL_ORIGINS = True
 
 CORS_ALLOW_CREDENTIALS = True
 
+CORS_EXPOSE_HEADERS = ["Link", "X-Next-Cursor"]
+
 NINJA_PAGINATION_CLASS = "ninja.pagination.PageNumberPagination"
 NINJA_PAGINATION_PER_PAGE = 20
+
+# Requires the optional `orjson` dependency (poetry install -E fast-json).
+API_ORJSON_RENDERER = os.getenv("API_ORJSON_RENDERER", "false").lower() == "true"
+
+# Per-route query counts and timings: Server-Timing headers and Prometheus
+# metrics at /api/_metrics.
+API_METRICS_ENABLED = os.getenv("API_METRICS_ENABLED", "false").lower() == "true"
+
+# What to do when an API operation runs more queries than its @query_budget:
+# "off", "warn" (log) or "raise".
+API_QUERY_BUDGETS = os.getenv("API_QUERY_BUDGETS", "off")
+
+# cProfile captures of API requests, listed for staff at /api/_profiles.
+# Requests are profiled at API_PROFILE_SAMPLE_RATE or when they carry the
+# signed X-Profile token handed out by that index.
+API_PROFILING_ENABLED = os.getenv("API_PROFILING_ENABLED", "false").lower() == "true"
+API_PROFILE_SAMPLE_RATE = float(os.getenv("API_PROFILE_SAMPLE_RATE", "0"))
+API_PROFILE_TOKEN_MAX_AGE = int(os.getenv("API_PROFILE_TOKEN_MAX_AGE", "3600"))
+API_PROFILE_DIR = os.getenv("API_PROFILE_DIR", str(BASE_DIR / "profiles"))
+API_PROFILE_MAX_FILES = int(os.getenv("API_PROFILE_MAX_FILES", "200"))
+
+ASSETS_CACHE_TIMEOUT = int(os.getenv("ASSETS_CACHE_TIMEOUT", "60"))
+ASSETS_COUNT_CACHE_TIMEOUT = int(os.getenv("ASSETS_COUNT_CACHE_TIMEOUT", "300"))
+ASSETS_COUNT_ESTIMATE_MIN_ROWS = int(
+    os.getenv("ASSETS_COUNT_ESTIMATE_MIN_ROWS", "100000")
+)
+
+# Server-Sent Events price stream: seconds between broadcasts and between
+# keep-alive comments on idle connections.
+ASSETS_STREAM_INTERVAL = float(os.getenv("ASSETS_STREAM_INTERVAL", "1.0"))
+ASSETS_STREAM_KEEPALIVE = float(os.getenv("ASSETS_STREAM_KEEPALIVE", "15"))
+
+# Seconds between checks of the autocomplete index against the database,
+# which pick up asset writes made by other processes.
+ASSETS_AUTOCOMPLETE_CHECK_SECONDS = float(
+    os.getenv("ASSETS_AUTOCOMPLETE_CHECK_SECONDS", "5")
+)
+
+# /api/assets/changes only reports writes at least this many seconds old, so
+# transactions that commit after a sync cannot slip behind its token.
+ASSETS_CHANGES_SETTLE_SECONDS = float(os.getenv("ASSETS_CHANGES_SETTLE_SECONDS", "2"))
+
+# Rows whose transaction commits a little after a read can carry an
+# updated_at older than the reader's watermark; the price stream and the
+# autocomplete index re-read this many seconds behind it.
+ASSETS_COMMIT_LAG_SECONDS = float(os.getenv("ASSETS_COMMIT_LAG_SECONDS", "2"))
@@ -7,6 +7,8 @@ DATABASES = {
     }
 }
 
+API_QUERY_BUDGETS = "raise"
+
 PASSWORD_HASHERS = [
     "django.contrib.auth.hashers.MD5PasswordHasher",
 ]
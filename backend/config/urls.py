@@ -1,7 +1,10 @@
 from django.contrib import admin
+from django.contrib.staticfiles.urls import staticfiles_urlpatterns
 from django.urls import path
 
 from config.api import api
+from config.metrics import metrics_view
+from config.profiling import profile_view, profiles_view
 from apps.assets.api import router as assets_router
 from apps.favorites.api import router as favorites_router
 from apps.portfolio.api import router as portfolio_router
@@ -13,6 +16,12 @@ api.add_router("/portfolio", portfolio_router, tags=["portfolio"])
 
 urlpatterns = [
     path("admin/", admin.site.urls),
+    path("api/_metrics", metrics_view),
+    path("api/_profiles", profiles_view),
+    path("api/_profiles/<str:name>", profile_view),
     path("api/", api.urls),
 ]
 
+# runserver serves static files itself; gunicorn needs them routed (DEBUG only).
+urlpatterns += staticfiles_urlpatterns()
+
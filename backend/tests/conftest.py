@@ -3,6 +3,26 @@ from decimal import Decimal
 from uuid import uuid4
 
 
+@pytest.fixture(autouse=True)
+def _clear_cache():
+    from django.core.cache import cache
+
+    from apps.assets.autocomplete import asset_index
+
+    cache.clear()
+    asset_index.invalidate()
+    yield
+    cache.clear()
+    asset_index.invalidate()
+
+
+@pytest.fixture
+def shared_cache(monkeypatch):
+    """Treat the local-memory test cache as one shared by every process,
+    as Redis is in production."""
+    monkeypatch.setattr("apps.assets.cache.is_shared_cache", lambda: True)
+
+
 @pytest.fixture
 def asset_factory(db):
     from apps.assets.models import Asset
@@ -1,8 +1,12 @@
 import pytest
+import asyncio
 import json
+from datetime import datetime, timedelta, timezone
 from decimal import Decimal
 
-from django.test import Client
+from django.test import AsyncClient, Client
+
+from apps.assets.history import Tick, record_ticks
 
 
 @pytest.mark.integration
@@ -179,3 +183,650 @@ class TestAssetsAPI:
         assert symbols[2] == "BNB"
         assert symbols[3] == "NO_RANK"
 
+    def test_list_assets_cursor_pagination(self, client, asset_factory):
+        for i in range(5):
+            asset_factory(symbol=f"CRYPTO{i}", market_cap_rank=i + 1)
+        asset_factory(symbol="AAA", market_cap_rank=None)
+        asset_factory(symbol="ZZZ", market_cap_rank=None)
+
+        response = client.get("/api/assets", {"page_size": 3})
+        data = json.loads(response.content)
+        symbols = [item["symbol"] for item in data["data"]]
+        assert data["hasMore"] is True
+        assert data["nextCursor"]
+
+        while data["nextCursor"]:
+            response = client.get(
+                "/api/assets", {"page_size": 3, "cursor": data["nextCursor"]}
+            )
+            assert response.status_code == 200
+            data = json.loads(response.content)
+            symbols += [item["symbol"] for item in data["data"]]
+
+        assert data["hasMore"] is False
+        assert data["total"] == 7
+        assert symbols == [
+            "CRYPTO0",
+            "CRYPTO1",
+            "CRYPTO2",
+            "CRYPTO3",
+            "CRYPTO4",
+            "AAA",
+            "ZZZ",
+        ]
+
+    def test_list_assets_cursor_breaks_ties_by_id(self, client, asset_factory):
+        asset_factory(id="b", symbol="SAME", market_cap_rank=1)
+        asset_factory(id="a", symbol="SAME", market_cap_rank=1)
+        asset_factory(id="c", symbol="SAME", market_cap_rank=1)
+
+        response = client.get("/api/assets", {"page_size": 1})
+        data = json.loads(response.content)
+        ids = [item["id"] for item in data["data"]]
+        while data["nextCursor"]:
+            response = client.get(
+                "/api/assets", {"page_size": 1, "cursor": data["nextCursor"]}
+            )
+            data = json.loads(response.content)
+            ids += [item["id"] for item in data["data"]]
+
+        assert ids == ["a", "b", "c"]
+
+    def test_list_assets_cursor_with_search(self, client, asset_factory):
+        asset_factory(id="bitcoin", symbol="BTC", name="Bitcoin", market_cap_rank=1)
+        asset_factory(id="ethereum", symbol="ETH", name="Ethereum", market_cap_rank=2)
+        asset_factory(
+            id="bitcoin-cash", symbol="BCH", name="Bitcoin Cash", market_cap_rank=3
+        )
+
+        response = client.get("/api/assets", {"search": "bitcoin", "page_size": 1})
+        data = json.loads(response.content)
+        assert data["data"][0]["id"] == "bitcoin"
+
+        response = client.get(
+            "/api/assets",
+            {"search": "bitcoin", "page_size": 1, "cursor": data["nextCursor"]},
+        )
+        data = json.loads(response.content)
+        assert [item["id"] for item in data["data"]] == ["bitcoin-cash"]
+        assert data["hasMore"] is False
+        assert data["nextCursor"] is None
+
+    def test_list_assets_invalid_cursor(self, client):
+        response = client.get("/api/assets", {"cursor": "not-a-cursor"})
+        assert response.status_code == 400
+
+        data = json.loads(response.content)
+        assert "cursor" in data["detail"].lower()
+
+    def test_list_assets_without_total(self, client, asset_factory):
+        for i in range(3):
+            asset_factory(symbol=f"CRYPTO{i}", market_cap_rank=i + 1)
+
+        response = client.get("/api/assets", {"page_size": 2, "include_total": False})
+        data = json.loads(response.content)
+        assert data["total"] is None
+        assert data["hasMore"] is True
+
+        response = client.get(
+            "/api/assets", {"page": 2, "page_size": 2, "include_total": False}
+        )
+        data = json.loads(response.content)
+        assert len(data["data"]) == 1
+        assert data["hasMore"] is False
+
+    def test_list_assets_total_is_cached(
+        self, client, asset_factory, django_assert_num_queries, shared_cache
+    ):
+        asset_factory(symbol="BTC", name="Bitcoin")
+
+        client.get("/api/assets", {"search": "bit"})
+        with django_assert_num_queries(1):
+            response = client.get("/api/assets", {"search": " BIT ", "page": 2})
+        assert json.loads(response.content)["total"] == 1
+
+    @pytest.mark.django_db(transaction=True)
+    def test_list_assets_total_invalidated_on_write(self, client, asset_factory):
+        from apps.assets.models import Asset
+
+        asset_factory(id="bitcoin", symbol="BTC", name="Bitcoin")
+        assert json.loads(client.get("/api/assets").content)["total"] == 1
+
+        asset_factory(id="ethereum", symbol="ETH", name="Ethereum")
+        assert json.loads(client.get("/api/assets").content)["total"] == 2
+
+        Asset.objects.filter(id="ethereum").update(name="Bitcoin Fork")
+        response = client.get("/api/assets", {"search": "bitcoin"})
+        assert json.loads(response.content)["total"] == 2
+
+        Asset.objects.filter(id="ethereum").delete()
+        response = client.get("/api/assets", {"search": "bitcoin"})
+        assert json.loads(response.content)["total"] == 1
+
+    def test_list_assets_search_ranks_exact_then_prefix_then_contains(
+        self, client, asset_factory
+    ):
+        asset_factory(
+            id="wrapped-eth", symbol="WETH", name="Wrapped Ether", market_cap_rank=1
+        )
+        asset_factory(
+            id="ethereum-classic",
+            symbol="ETC",
+            name="Ethereum Classic",
+            market_cap_rank=2,
+        )
+        asset_factory(id="ethereum", symbol="ETH", name="Ethereum", market_cap_rank=3)
+
+        response = client.get("/api/assets", {"search": "eth"})
+        data = json.loads(response.content)
+        ids = [item["id"] for item in data["data"]]
+        assert ids == ["ethereum", "ethereum-classic", "wrapped-eth"]
+
+    def test_list_assets_search_cursor_spans_rank_buckets(self, client, asset_factory):
+        asset_factory(
+            id="wrapped-eth", symbol="WETH", name="Wrapped Ether", market_cap_rank=1
+        )
+        asset_factory(
+            id="ethereum-classic",
+            symbol="ETC",
+            name="Ethereum Classic",
+            market_cap_rank=2,
+        )
+        asset_factory(id="ethereum", symbol="ETH", name="Ethereum", market_cap_rank=3)
+
+        response = client.get("/api/assets", {"search": "eth", "page_size": 1})
+        data = json.loads(response.content)
+        ids = [item["id"] for item in data["data"]]
+        while data["nextCursor"]:
+            response = client.get(
+                "/api/assets",
+                {"search": "eth", "page_size": 1, "cursor": data["nextCursor"]},
+            )
+            data = json.loads(response.content)
+            ids += [item["id"] for item in data["data"]]
+
+        assert ids == ["ethereum", "ethereum-classic", "wrapped-eth"]
+
+    def test_list_assets_search_cursor_rejected_without_search(
+        self, client, asset_factory
+    ):
+        asset_factory(id="ethereum", symbol="ETH", market_cap_rank=1)
+        asset_factory(id="ethereum-classic", symbol="ETC", market_cap_rank=2)
+
+        response = client.get("/api/assets", {"search": "eth", "page_size": 1})
+        cursor = json.loads(response.content)["nextCursor"]
+
+        response = client.get("/api/assets", {"cursor": cursor})
+        assert response.status_code == 400
+
+    def test_autocomplete_assets(self, client, asset_factory):
+        asset_factory(id="bitcoin", symbol="BTC", name="Bitcoin", market_cap_rank=1)
+        asset_factory(
+            id="bitcoin-cash", symbol="BCH", name="Bitcoin Cash", market_cap_rank=15
+        )
+        asset_factory(id="binancecoin", symbol="BNB", name="BNB", market_cap_rank=4)
+        asset_factory(id="ethereum", symbol="ETH", name="Ethereum", market_cap_rank=2)
+
+        response = client.get("/api/assets/autocomplete", {"q": "b"})
+        assert response.status_code == 200
+        ids = [item["id"] for item in json.loads(response.content)]
+        assert ids == ["bitcoin", "binancecoin", "bitcoin-cash"]
+
+        response = client.get("/api/assets/autocomplete", {"q": "cash"})
+        ids = [item["id"] for item in json.loads(response.content)]
+        assert ids == ["bitcoin-cash"]
+
+        response = client.get("/api/assets/autocomplete", {"q": "B", "limit": 1})
+        ids = [item["id"] for item in json.loads(response.content)]
+        assert ids == ["bitcoin"]
+
+    def test_autocomplete_assets_empty_query(self, client, asset_factory):
+        asset_factory(symbol="BTC")
+
+        response = client.get("/api/assets/autocomplete", {"q": "  "})
+        assert response.status_code == 200
+        assert json.loads(response.content) == []
+
+    def test_autocomplete_assets_served_from_memory(
+        self, client, asset_factory, django_assert_num_queries, shared_cache
+    ):
+        asset_factory(id="bitcoin", symbol="BTC", name="Bitcoin", market_cap_rank=1)
+        client.get("/api/assets/autocomplete", {"q": "bit"})
+
+        with django_assert_num_queries(0):
+            response = client.get("/api/assets/autocomplete", {"q": "btc"})
+        assert [item["id"] for item in json.loads(response.content)] == ["bitcoin"]
+
+    @pytest.mark.django_db(transaction=True)
+    def test_autocomplete_assets_tracks_writes(self, client, asset_factory):
+        from apps.assets.models import Asset
+
+        asset = asset_factory(id="bitcoin", symbol="BTC", name="Bitcoin")
+        client.get("/api/assets/autocomplete", {"q": "bit"})
+
+        asset.name = "Digital Gold"
+        asset.save()
+        asset_factory(id="bitcoin-cash", symbol="BCH", name="Bitcoin Cash")
+
+        response = client.get("/api/assets/autocomplete", {"q": "bit"})
+        assert [item["id"] for item in json.loads(response.content)] == [
+            "bitcoin-cash",
+            "bitcoin",
+        ]
+
+        response = client.get("/api/assets/autocomplete", {"q": "digital"})
+        assert [item["id"] for item in json.loads(response.content)] == ["bitcoin"]
+
+        Asset.objects.filter(id="bitcoin-cash").delete()
+        response = client.get("/api/assets/autocomplete", {"q": "cash"})
+        assert json.loads(response.content) == []
+
+    def test_autocomplete_catches_up_on_version_bump(
+        self, client, asset_factory, monkeypatch
+    ):
+        from django.core.cache import cache
+        from django.db import connection
+
+        from apps.assets.autocomplete import asset_index
+        from apps.assets.cache import CATALOG_VERSION_KEY, catalog_version
+        from apps.assets.models import Asset
+
+        asset_factory(id="bitcoin", symbol="BTC", name="Bitcoin")
+        client.get("/api/assets/autocomplete", {"q": "bit"})
+        rebuilds = []
+        monkeypatch.setattr(asset_index, "_rebuild", rebuilds.append)
+
+        # Another process renames the asset and bumps the shared version.
+        later = connection.ops.adapt_datetimefield_value(
+            datetime.now(timezone.utc) + timedelta(seconds=1)
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"UPDATE {Asset._meta.db_table} SET name = %s, updated_at = %s"
+                " WHERE id = %s",
+                ["Digital Gold", later, "bitcoin"],
+            )
+        catalog_version()
+        cache.incr(CATALOG_VERSION_KEY)
+
+        response = client.get("/api/assets/autocomplete", {"q": "digital"})
+        assert [item["id"] for item in json.loads(response.content)] == ["bitcoin"]
+        assert rebuilds == []
+
+    @pytest.mark.django_db(transaction=True)
+    def test_caches_invalidated_after_commit(self, client, asset_factory):
+        from django.db import transaction
+
+        from apps.assets.cache import catalog_version
+        from apps.assets.models import Asset
+
+        asset_factory(id="bitcoin", symbol="BTC", name="Bitcoin")
+        client.get("/api/assets/autocomplete", {"q": "bit"})
+        version = catalog_version()
+
+        with transaction.atomic():
+            Asset.objects.filter(id="bitcoin").update(name="Digital Gold")
+            assert catalog_version() == version
+            response = client.get("/api/assets/autocomplete", {"q": "bit"})
+            assert [item["id"] for item in json.loads(response.content)] == [
+                "bitcoin"
+            ]
+
+        assert catalog_version() == version + 1
+        response = client.get("/api/assets/autocomplete", {"q": "digital"})
+        assert [item["id"] for item in json.loads(response.content)] == ["bitcoin"]
+
+    def test_autocomplete_assets_sees_other_processes(
+        self, client, asset_factory, settings
+    ):
+        from django.db import connection
+
+        from apps.assets.models import Asset
+
+        settings.ASSETS_AUTOCOMPLETE_CHECK_SECONDS = 0
+        asset_factory(id="bitcoin", symbol="BTC", name="Bitcoin")
+        asset_factory(id="ethereum", symbol="ETH", name="Ethereum")
+        client.get("/api/assets/autocomplete", {"q": "bit"})
+
+        # Raw SQL sends no signal and bumps no cache version, like a write
+        # made by another worker.
+        table = Asset._meta.db_table
+        later = connection.ops.adapt_datetimefield_value(
+            datetime.now(timezone.utc) + timedelta(seconds=1)
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"UPDATE {table} SET name = %s, updated_at = %s WHERE id = %s",
+                ["Digital Gold", later, "bitcoin"],
+            )
+            cursor.execute(f"DELETE FROM {table} WHERE id = %s", ["ethereum"])
+
+        response = client.get("/api/assets/autocomplete", {"q": "digital"})
+        assert [item["id"] for item in json.loads(response.content)] == ["bitcoin"]
+        response = client.get("/api/assets/autocomplete", {"q": "eth"})
+        assert json.loads(response.content) == []
+
+    def test_conditional_get_sees_other_processes(self, client, asset_factory):
+        from django.db import connection
+
+        from apps.assets.models import Asset
+
+        asset_factory(id="bitcoin", current_price=Decimal("100"))
+        etag = client.get("/api/assets/bitcoin").headers["ETag"]
+
+        # Raw SQL bumps no cache version, like a write from another process
+        # whose per-process cache this one cannot see.
+        later = connection.ops.adapt_datetimefield_value(
+            datetime.now(timezone.utc) + timedelta(seconds=1)
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"UPDATE {Asset._meta.db_table} SET current_price = %s,"
+                " updated_at = %s WHERE id = %s",
+                [110, later, "bitcoin"],
+            )
+
+        response = client.get("/api/assets/bitcoin", HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+
+    def test_get_asset_is_cached(
+        self, client, asset_factory, django_assert_num_queries, shared_cache
+    ):
+        asset_factory(id="bitcoin", symbol="BTC", current_price=Decimal("100"))
+        client.get("/api/assets/bitcoin")
+
+        with django_assert_num_queries(0):
+            response = client.get("/api/assets/bitcoin")
+        assert json.loads(response.content)["current_price"] == 100.0
+
+    @pytest.mark.django_db(transaction=True)
+    def test_get_asset_cache_invalidated_on_price_update(self, client, asset_factory):
+        from apps.assets.models import Asset
+
+        asset = asset_factory(id="bitcoin", current_price=Decimal("100"))
+        client.get("/api/assets/bitcoin")
+        client.get("/api/assets")
+
+        asset.current_price = Decimal("110")
+        asset.save()
+        response = client.get("/api/assets/bitcoin")
+        assert json.loads(response.content)["current_price"] == 110.0
+
+        Asset.objects.bulk_update(
+            [Asset(id="bitcoin", current_price=Decimal("120"))], ["current_price"]
+        )
+        response = client.get("/api/assets/bitcoin")
+        assert json.loads(response.content)["current_price"] == 120.0
+
+        Asset.objects.filter(id="bitcoin").update(current_price=Decimal("130"))
+        response = client.get("/api/assets")
+        assert json.loads(response.content)["data"][0]["current_price"] == 130.0
+
+    def test_list_assets_is_cached(
+        self, client, asset_factory, django_assert_num_queries, shared_cache
+    ):
+        asset_factory(symbol="BTC", market_cap_rank=1)
+        client.get("/api/assets", {"page_size": 5})
+
+        with django_assert_num_queries(0):
+            response = client.get("/api/assets", {"page_size": 5})
+        assert json.loads(response.content)["total"] == 1
+
+    @pytest.mark.django_db(transaction=True)
+    def test_get_asset_not_found_after_create(self, client, asset_factory):
+        assert client.get("/api/assets/bitcoin").status_code == 404
+
+        asset_factory(id="bitcoin")
+        assert client.get("/api/assets/bitcoin").status_code == 200
+
+    @pytest.mark.django_db(transaction=True)
+    def test_list_assets_conditional_get(self, client, asset_factory):
+        asset = asset_factory(id="bitcoin", current_price=Decimal("100"))
+
+        response = client.get("/api/assets")
+        etag = response.headers["ETag"]
+        assert etag.startswith('"')
+        assert "Last-Modified" not in response.headers
+
+        response = client.get("/api/assets", HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+        assert response.content == b""
+
+        response = client.get("/api/assets", {"page": 2}, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+
+        asset.current_price = Decimal("110")
+        asset.save()
+        response = client.get("/api/assets", HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+
+    def test_get_asset_conditional_get(self, client, asset_factory):
+        asset_factory(id="bitcoin")
+
+        etag = client.get("/api/assets/bitcoin").headers["ETag"]
+        response = client.get("/api/assets/bitcoin", HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+
+        response = client.get("/api/assets/missing", HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 404
+        assert "ETag" not in response.headers
+
+    def test_batch_assets(
+        self, client, asset_factory, django_assert_num_queries, shared_cache
+    ):
+        asset_factory(id="bitcoin", symbol="BTC")
+        asset_factory(id="ethereum", symbol="ETH")
+        asset_factory(id="solana", symbol="SOL")
+
+        client.get("/api/assets/batch")  # warm the catalog fingerprint
+        with django_assert_num_queries(1):
+            response = client.get(
+                "/api/assets/batch", {"ids": "solana,missing,bitcoin,solana"}
+            )
+        assert response.status_code == 200
+
+        data = json.loads(response.content)
+        assert [item["id"] for item in data["data"]] == ["solana", "bitcoin"]
+        assert data["missing"] == ["missing"]
+
+    def test_batch_assets_empty(self, client):
+        response = client.get("/api/assets/batch", {"ids": ""})
+        assert response.status_code == 200
+        assert json.loads(response.content) == {"data": [], "missing": []}
+
+    def test_batch_assets_too_many_ids(self, client):
+        ids = ",".join(f"asset-{i}" for i in range(101))
+        response = client.get("/api/assets/batch", {"ids": ids})
+        assert response.status_code == 400
+
+    def test_list_assets_sparse_fields(self, client, asset_factory):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        asset_factory(id="bitcoin", symbol="BTC", current_price=Decimal("10.5"))
+
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(
+                "/api/assets", {"fields": "symbol,current_price", "page_size": 1}
+            )
+        assert response.status_code == 200
+
+        data = json.loads(response.content)
+        assert data["data"] == [
+            {"id": "bitcoin", "symbol": "BTC", "current_price": 10.5}
+        ]
+        assert all('"image"' not in query["sql"] for query in queries.captured_queries)
+
+    def test_list_assets_sparse_fields_with_cursor(self, client, asset_factory):
+        asset_factory(id="bitcoin", symbol="BTC", market_cap_rank=1)
+        asset_factory(id="ethereum", symbol="ETH", market_cap_rank=2)
+
+        response = client.get("/api/assets", {"fields": "id", "page_size": 1})
+        data = json.loads(response.content)
+        assert data["data"] == [{"id": "bitcoin"}]
+
+        response = client.get(
+            "/api/assets",
+            {"fields": "id", "page_size": 1, "cursor": data["nextCursor"]},
+        )
+        assert json.loads(response.content)["data"] == [{"id": "ethereum"}]
+
+    def test_list_assets_unknown_fields(self, client):
+        response = client.get("/api/assets", {"fields": "symbol,secret"})
+        assert response.status_code == 400
+        assert "secret" in json.loads(response.content)["detail"]
+
+    def test_asset_history(self, client, asset_factory):
+        asset = asset_factory(id="bitcoin")
+        record_ticks(
+            [
+                Tick(asset.id, datetime(2024, 1, 1, 10, 5, tzinfo=timezone.utc), Decimal("100")),
+                Tick(asset.id, datetime(2024, 1, 1, 10, 40, tzinfo=timezone.utc), Decimal("90")),
+                Tick(asset.id, datetime(2024, 1, 1, 11, 15, tzinfo=timezone.utc), Decimal("120")),
+            ]
+        )
+
+        response = client.get("/api/assets/bitcoin/history", {"interval": "1h"})
+        assert response.status_code == 200
+        data = json.loads(response.content)
+        assert len(data) == 2
+        assert data[0]["open"] == 100.0
+        assert data[0]["low"] == 90.0
+        assert data[0]["close"] == 90.0
+        assert data[1]["close"] == 120.0
+
+        response = client.get("/api/assets/bitcoin/history", {"interval": "1d"})
+        assert len(json.loads(response.content)) == 1
+
+    def test_asset_history_empty_and_not_found(self, client, asset_factory):
+        asset_factory(id="bitcoin")
+
+        response = client.get("/api/assets/bitcoin/history")
+        assert response.status_code == 200
+        assert json.loads(response.content) == []
+
+        response = client.get("/api/assets/nonexistent/history")
+        assert response.status_code == 404
+
+    def test_asset_history_invalid_interval(self, client, asset_factory):
+        asset_factory(id="bitcoin")
+        response = client.get("/api/assets/bitcoin/history", {"interval": "5m"})
+        assert response.status_code == 422
+
+    @pytest.mark.django_db(transaction=True)
+    def test_list_assets_over_asgi(self, asset_factory):
+        asset_factory(id="bitcoin", symbol="BTC", market_cap_rank=1)
+
+        async def fetch_twice():
+            client = AsyncClient()
+            first = await client.get("/api/assets")
+            second = await client.get(
+                "/api/assets", headers={"If-None-Match": first["ETag"]}
+            )
+            return first, second
+
+        first, second = asyncio.run(fetch_twice())
+        assert first.status_code == 200
+        assert [item["id"] for item in json.loads(first.content)["data"]] == ["bitcoin"]
+        assert second.status_code == 304
+
+    def test_stream_requires_asgi(self, client):
+        response = client.get("/api/assets/stream")
+        assert response.status_code == 501
+
+    @pytest.mark.django_db(transaction=True)
+    def test_stream_over_asgi(self, asset_factory):
+        asset_factory(id="bitcoin", current_price=Decimal("1"))
+
+        async def first_events():
+            response = await AsyncClient().get(
+                "/api/assets/stream", {"ids": "bitcoin,unknown"}
+            )
+            events = response.streaming_content
+            received = [await anext(events), await anext(events)]
+            await events.aclose()
+            return response, received
+
+        response, (retry, snapshot) = asyncio.run(first_events())
+        assert response.status_code == 200
+        assert response["Content-Type"] == "text/event-stream"
+        assert retry.startswith(b"retry:")
+        data = json.loads(snapshot.split(b"data: ", 1)[1])
+        assert [delta["id"] for delta in data] == ["bitcoin"]
+
+    def test_stream_rejects_too_many_ids(self):
+        ids = ",".join(f"asset-{index}" for index in range(501))
+
+        async def request():
+            return await AsyncClient().get("/api/assets/stream", {"ids": ids})
+
+        assert asyncio.run(request()).status_code == 400
+
+    def test_asset_changes(self, client, asset_factory, settings):
+        settings.ASSETS_CHANGES_SETTLE_SECONDS = 0
+        bitcoin = asset_factory(id="bitcoin", symbol="BTC")
+        ethereum = asset_factory(id="ethereum", symbol="ETH")
+
+        response = client.get("/api/assets/changes")
+        assert response.status_code == 200
+        data = json.loads(response.content)
+        assert {item["id"] for item in data["changed"]} == {"bitcoin", "ethereum"}
+        assert data["deleted"] == []
+        assert data["hasMore"] is False
+
+        response = client.get("/api/assets/changes", {"since": data["next"]})
+        synced = json.loads(response.content)
+        assert synced["changed"] == []
+        assert synced["next"] == data["next"]
+
+        bitcoin.status = "inactive"
+        bitcoin.save()
+        ethereum.delete()
+
+        response = client.get("/api/assets/changes", {"since": data["next"]})
+        data = json.loads(response.content)
+        assert [(item["id"], item["status"]) for item in data["changed"]] == [
+            ("bitcoin", "inactive")
+        ]
+        assert data["deleted"] == ["ethereum"]
+
+    def test_asset_changes_paginates(self, client, asset_factory, settings):
+        settings.ASSETS_CHANGES_SETTLE_SECONDS = 0
+        for index in range(5):
+            asset_factory(id=f"asset-{index}")
+
+        seen, since = [], None
+        while True:
+            params = {"limit": 2, **({"since": since} if since else {})}
+            data = json.loads(client.get("/api/assets/changes", params).content)
+            seen.extend(item["id"] for item in data["changed"])
+            since = data["next"]
+            if not data["hasMore"]:
+                break
+
+        assert sorted(seen) == [f"asset-{index}" for index in range(5)]
+
+    def test_asset_changes_waits_for_settle_window(
+        self, client, asset_factory, settings
+    ):
+        settings.ASSETS_CHANGES_SETTLE_SECONDS = 60
+        asset_factory(id="bitcoin")
+
+        data = json.loads(client.get("/api/assets/changes").content)
+        assert data["changed"] == []
+
+    def test_asset_changes_recreated_asset_not_deleted(
+        self, client, asset_factory, settings
+    ):
+        settings.ASSETS_CHANGES_SETTLE_SECONDS = 0
+        asset_factory(id="bitcoin").delete()
+        asset_factory(id="bitcoin")
+
+        data = json.loads(client.get("/api/assets/changes").content)
+        assert [item["id"] for item in data["changed"]] == ["bitcoin"]
+        assert data["deleted"] == []
+
+    def test_asset_changes_invalid_token(self, client):
+        response = client.get("/api/assets/changes", {"since": "garbage"})
+        assert response.status_code == 400
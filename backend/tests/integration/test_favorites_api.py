@@ -1,8 +1,13 @@
 import pytest
 import json
+import time
+from decimal import Decimal
 from uuid import UUID
 
 from django.test import Client
+from django.utils.http import http_date
+
+from apps.assets.pagination import encode_keyset
 
 
 @pytest.mark.integration
@@ -183,3 +188,251 @@ class TestFavoritesAPI:
         data = json.loads(response.content)
         assert "not found" in data["detail"].lower()
 
+
+    def test_list_favorites_conditional_get(
+        self, client, favorite_factory, django_assert_num_queries
+    ):
+        favorite = favorite_factory()
+
+        etag = client.get("/api/favorites").headers["ETag"]
+        with django_assert_num_queries(1):
+            response = client.get("/api/favorites", HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+
+        favorite.asset.current_price = 10
+        favorite.asset.save()
+        response = client.get("/api/favorites", HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+
+        etag = response.headers["ETag"]
+        favorite.delete()
+        response = client.get("/api/favorites", HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+
+    def test_list_favorites_ignores_if_modified_since(self, client, favorite_factory):
+        kept, deleted = favorite_factory(), favorite_factory()
+
+        response = client.get("/api/favorites")
+        assert "Last-Modified" not in response.headers
+
+        deleted.delete()
+        response = client.get(
+            "/api/favorites", HTTP_IF_MODIFIED_SINCE=http_date(time.time() + 60)
+        )
+        assert response.status_code == 200
+        assert [item["id"] for item in json.loads(response.content)] == [str(kept.id)]
+
+    def test_get_favorite_conditional_get(self, client, favorite_factory):
+        favorite = favorite_factory()
+
+        response = client.get(f"/api/favorites/{favorite.id}")
+        assert "Last-Modified" in response.headers
+        etag = response.headers["ETag"]
+        response = client.get(
+            f"/api/favorites/{favorite.id}", HTTP_IF_NONE_MATCH=etag
+        )
+        assert response.status_code == 304
+
+    def test_list_favorites_sparse_fields(self, client, favorite_factory, asset_factory):
+        asset = asset_factory(id="bitcoin", symbol="BTC")
+        favorite = favorite_factory(asset=asset)
+
+        response = client.get("/api/favorites", {"fields": "symbol"})
+        assert response.status_code == 200
+        assert json.loads(response.content) == [
+            {"id": str(favorite.id), "asset": {"id": "bitcoin", "symbol": "BTC"}}
+        ]
+
+        response = client.get("/api/favorites", {"fields": "nope"})
+        assert response.status_code == 400
+
+    def _pages(self, client, **params):
+        pages = []
+        while True:
+            response = client.get("/api/favorites", params)
+            assert response.status_code == 200
+            pages.append([item["asset"]["id"] for item in json.loads(response.content)])
+            if "X-Next-Cursor" not in response.headers:
+                return pages
+            assert 'rel="next"' in response.headers["Link"]
+            params["cursor"] = response.headers["X-Next-Cursor"]
+
+    def test_list_favorites_sorted_and_paginated(
+        self, client, favorite_factory, asset_factory
+    ):
+        for asset_id, rank in [("b", 2), ("a", 1), ("unranked", None), ("c", 3)]:
+            favorite_factory(asset=asset_factory(id=asset_id, market_cap_rank=rank))
+
+        assert self._pages(client, sort="rank", limit=2) == [
+            ["a", "b"],
+            ["c", "unranked"],
+        ]
+        assert self._pages(client, sort="-rank", limit=3) == [
+            ["c", "b", "a"],
+            ["unranked"],
+        ]
+        assert self._pages(client, limit=4) == [["c", "unranked", "a", "b"]]
+
+    def test_list_favorites_by_change(self, client, favorite_factory, asset_factory):
+        for asset_id, change in [("flat", "0"), ("up", "5.5"), ("down", "-3")]:
+            favorite_factory(
+                asset=asset_factory(
+                    id=asset_id, price_change_percentage_24h=Decimal(change)
+                )
+            )
+
+        assert self._pages(client, sort="-change_24h", limit=1) == [
+            ["up"],
+            ["flat"],
+            ["down"],
+        ]
+
+    def test_list_favorites_default_page(self, client):
+        from apps.assets.models import Asset
+        from apps.favorites.models import Favorite
+
+        assets = Asset.objects.bulk_create(
+            Asset(id=f"coin-{index:03}", symbol="C", name="Coin")
+            for index in range(101)
+        )
+        Favorite.objects.bulk_create(Favorite(asset=asset) for asset in assets)
+
+        assert [len(page) for page in self._pages(client)] == [100, 1]
+
+    def test_list_favorites_rejects_bad_cursors(self, client, favorite_factory):
+        favorite_factory()
+        favorite_factory()
+        cursor = client.get("/api/favorites", {"limit": 1}).headers["X-Next-Cursor"]
+
+        response = client.get("/api/favorites", {"sort": "rank", "cursor": cursor})
+        assert response.status_code == 400
+        response = client.get("/api/favorites", {"cursor": "not-a-cursor"})
+        assert response.status_code == 400
+        bad_id = encode_keyset("-created_at", "2020-01-01T00:00:00+00:00", "zzz")
+        response = client.get("/api/favorites", {"cursor": bad_id})
+        assert response.status_code == 400
+        bad_id = encode_keyset("-updated_at", "2020-01-01T00:00:00+00:00", "zzz")
+        response = client.get("/api/portfolio", {"cursor": bad_id})
+        assert response.status_code == 400
+        response = client.get("/api/favorites", {"sort": "market_value"})
+        assert response.status_code == 422
+
+    def test_create_favorite_is_one_round_trip_per_step(
+        self, client, favorite_factory, asset_factory, django_assert_num_queries
+    ):
+        asset = asset_factory()
+        payload = json.dumps({"asset_id": asset.id})
+
+        # Asset lookup, then a single upsert, whether or not it is new.
+        with django_assert_num_queries(2):
+            first = client.post(
+                "/api/favorites", data=payload, content_type="application/json"
+            )
+        with django_assert_num_queries(2):
+            second = client.post(
+                "/api/favorites", data=payload, content_type="application/json"
+            )
+
+        assert first.status_code == second.status_code == 200
+        assert json.loads(first.content) == json.loads(second.content)
+        assert asset.favorites.count() == 1
+
+    def test_update_favorite_is_two_statements(
+        self, client, favorite_factory, asset_factory, django_assert_num_queries
+    ):
+        favorite = favorite_factory()
+        asset = asset_factory(id="ethereum")
+
+        with django_assert_num_queries(2):
+            response = client.put(
+                f"/api/favorites/{favorite.id}",
+                data=json.dumps({"asset_id": "ethereum"}),
+                content_type="application/json",
+            )
+        assert response.status_code == 200
+        assert json.loads(response.content)["asset"]["id"] == "ethereum"
+        favorite.refresh_from_db()
+        assert favorite.asset == asset
+
+    def _batch(self, client, method, path, asset_ids):
+        response = getattr(client, method)(
+            f"/api/favorites/batch{path}",
+            data=json.dumps({"asset_ids": asset_ids}),
+            content_type="application/json",
+        )
+        assert response.status_code == 200
+        return {
+            result["asset_id"]: result["status"]
+            for result in json.loads(response.content)["results"]
+        }
+
+    def _favorite_ids(self, client):
+        return sorted(
+            item["asset"]["id"] for item in json.loads(client.get("/api/favorites").content)
+        )
+
+    def test_add_favorites_batch(
+        self, client, favorite_factory, asset_factory, django_assert_num_queries
+    ):
+        favorite_factory(asset=asset_factory(id="bitcoin"))
+        asset_factory(id="ethereum")
+        asset_factory(id="solana")
+
+        # One query validates every id, one insert adds the new favorites.
+        with django_assert_num_queries(2):
+            outcomes = self._batch(
+                client, "post", "", ["bitcoin", "ethereum", "unknown", "solana", "ethereum"]
+            )
+        assert outcomes == {
+            "bitcoin": "exists",
+            "ethereum": "added",
+            "unknown": "not_found",
+            "solana": "added",
+        }
+        assert self._favorite_ids(client) == ["bitcoin", "ethereum", "solana"]
+
+    def test_remove_favorites_batch(
+        self, client, favorite_factory, asset_factory, django_assert_num_queries
+    ):
+        favorite_factory(asset=asset_factory(id="bitcoin"))
+        favorite_factory(asset=asset_factory(id="ethereum"))
+        asset_factory(id="solana")
+
+        with django_assert_num_queries(2):
+            outcomes = self._batch(
+                client, "post", "/remove", ["bitcoin", "solana", "unknown"]
+            )
+        assert outcomes == {
+            "bitcoin": "removed",
+            "solana": "not_favorite",
+            "unknown": "not_found",
+        }
+        assert self._favorite_ids(client) == ["ethereum"]
+
+    def test_replace_favorites_batch(self, client, favorite_factory, asset_factory):
+        favorite_factory(asset=asset_factory(id="bitcoin"))
+        favorite_factory(asset=asset_factory(id="ethereum"))
+        asset_factory(id="solana")
+
+        outcomes = self._batch(client, "put", "", ["ethereum", "solana", "unknown"])
+        assert outcomes == {
+            "ethereum": "exists",
+            "solana": "added",
+            "unknown": "not_found",
+            "bitcoin": "removed",
+        }
+        assert self._favorite_ids(client) == ["ethereum", "solana"]
+
+        assert self._batch(client, "put", "", []) == {
+            "ethereum": "removed",
+            "solana": "removed",
+        }
+        assert self._favorite_ids(client) == []
+
+    def test_favorites_batch_limit(self, client):
+        response = client.post(
+            "/api/favorites/batch",
+            data=json.dumps({"asset_ids": [f"asset-{index}" for index in range(501)]}),
+            content_type="application/json",
+        )
+        assert response.status_code == 400
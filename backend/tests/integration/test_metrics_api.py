@@ -0,0 +1,88 @@
+import asyncio
+import json
+import re
+from decimal import Decimal
+
+import pytest
+from django.test import AsyncClient, Client
+
+from config.metrics import registry
+
+
+@pytest.fixture
+def metrics_enabled(settings):
+    settings.API_METRICS_ENABLED = True
+    registry.reset()
+    yield
+    registry.reset()
+
+
+def _server_timing(response) -> dict[str, str]:
+    return {
+        entry.split(";")[0].strip(): entry
+        for entry in response["Server-Timing"].split(",")
+    }
+
+
+@pytest.mark.integration
+@pytest.mark.django_db
+class TestMetricsAPI:
+    def test_disabled_by_default(self):
+        response = Client().get("/api/assets")
+        assert "Server-Timing" not in response
+        assert Client().get("/api/_metrics").status_code == 404
+
+    def test_server_timing_header(self, metrics_enabled, asset_factory):
+        asset_factory(id="bitcoin", current_price=Decimal("50000"))
+
+        response = Client().get("/api/assets")
+        assert response.status_code == 200
+
+        timing = _server_timing(response)
+        assert set(timing) == {"db", "serialize", "total"}
+        queries = int(re.search(r'desc="(\d+) queries"', timing["db"]).group(1))
+        assert queries > 0
+        assert re.search(r"total;dur=\d+\.\d+", timing["total"])
+
+    def test_prometheus_exposition(self, metrics_enabled, asset_factory):
+        asset = asset_factory(id="bitcoin")
+        client = Client()
+        client.get("/api/assets")
+        client.get("/api/assets")
+        client.get(f"/api/assets/{asset.id}")
+        client.get("/api/assets/missing")
+
+        response = client.get("/api/_metrics")
+        assert response.status_code == 200
+        assert response["Content-Type"].startswith("text/plain; version=0.0.4")
+        body = response.content.decode()
+
+        assert "# TYPE http_request_duration_seconds histogram" in body
+        labels = 'method="GET",route="api/assets"'
+        assert f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} 2' in body
+        assert f"http_request_duration_seconds_count{{{labels}}} 2" in body
+        assert f"http_request_db_queries_count{{{labels}}} 2" in body
+        assert f'http_requests_total{{{labels},status="200"}} 2' in body
+
+        detail = 'method="GET",route="api/assets/<asset_id>"'
+        assert f'http_requests_total{{{detail},status="200"}} 1' in body
+        assert f'http_requests_total{{{detail},status="404"}} 1' in body
+
+    def test_unmatched_routes_share_one_series(self, metrics_enabled):
+        client = Client()
+        client.get("/nope/1")
+        client.get("/nope/2")
+
+        body = client.get("/api/_metrics").content.decode()
+        assert 'route="<unmatched>",status="404"} 2' in body
+
+    @pytest.mark.django_db(transaction=True)
+    def test_counts_queries_of_async_views(self, metrics_enabled, asset_factory):
+        asset_factory(id="bitcoin")
+
+        async def fetch():
+            return await AsyncClient().get("/api/assets/bitcoin")
+
+        response = asyncio.run(fetch())
+        assert json.loads(response.content)["id"] == "bitcoin"
+        assert 'desc="0 queries"' not in response["Server-Timing"]
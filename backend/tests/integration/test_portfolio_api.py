@@ -1,10 +1,13 @@
 
+import asyncio
 import pytest
 import json
+from datetime import datetime, timezone
 from decimal import Decimal
 from uuid import UUID
 
-from django.test import Client
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import AsyncClient, Client
 
 
 @pytest.mark.integration
@@ -216,3 +219,353 @@ class TestPortfolioAPI:
         data = json.loads(response.content)
         assert "not found" in data["detail"].lower()
 
+
+    def test_list_portfolio_conditional_get(self, client, portfolio_item_factory):
+        item = portfolio_item_factory()
+
+        etag = client.get("/api/portfolio").headers["ETag"]
+        response = client.get("/api/portfolio", HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+
+        item.quantity = Decimal("3")
+        item.save()
+        response = client.get("/api/portfolio", HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+
+    def test_get_portfolio_item_conditional_get(self, client, portfolio_item_factory):
+        item = portfolio_item_factory()
+
+        etag = client.get(f"/api/portfolio/{item.id}").headers["ETag"]
+        response = client.get(f"/api/portfolio/{item.id}", HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+
+        response = client.get("/api/portfolio/not-a-uuid")
+        assert "ETag" not in response.headers
+
+    def test_list_portfolio_sparse_fields(
+        self, client, portfolio_item_factory, asset_factory
+    ):
+        asset = asset_factory(id="bitcoin", symbol="BTC", current_price=Decimal("2"))
+        portfolio_item_factory(asset=asset, quantity=Decimal("1.5"))
+
+        response = client.get("/api/portfolio", {"fields": "current_price"})
+        assert response.status_code == 200
+
+        data = json.loads(response.content)
+        assert data[0]["asset"] == {"id": "bitcoin", "current_price": 2.0}
+        assert data[0]["quantity"] == 1.5
+
+    def test_portfolio_summary(
+        self, client, portfolio_item_factory, asset_factory, django_assert_num_queries
+    ):
+        btc = asset_factory(id="bitcoin", symbol="BTC", current_price=Decimal("200"))
+        eth = asset_factory(id="ethereum", symbol="ETH", current_price=Decimal("50"))
+        unpriced = asset_factory(id="unpriced", symbol="UNP", current_price=None)
+        portfolio_item_factory(asset=btc, quantity=Decimal("1"), avg_price=Decimal("100"))
+        portfolio_item_factory(asset=eth, quantity=Decimal("2"), avg_price=Decimal("75"))
+        portfolio_item_factory(
+            asset=unpriced, quantity=Decimal("10"), avg_price=Decimal("5")
+        )
+
+        with django_assert_num_queries(2):
+            response = client.get("/api/portfolio/summary")
+        assert response.status_code == 200
+
+        data = json.loads(response.content)
+        assert data["total_value"] == 350.0
+        assert data["total_cost"] == 300.0
+        assert data["pnl"] == 50.0
+        assert data["pnl_percentage"] == pytest.approx(16.6667, rel=1e-4)
+
+        positions = {item["asset_id"]: item for item in data["positions"]}
+        assert [item["asset_id"] for item in data["positions"]] == [
+            "bitcoin",
+            "ethereum",
+            "unpriced",
+        ]
+        assert positions["bitcoin"]["pnl"] == 100.0
+        assert positions["bitcoin"]["pnl_percentage"] == 100.0
+        assert positions["bitcoin"]["weight"] == pytest.approx(200 / 350)
+        assert positions["ethereum"]["pnl"] == -50.0
+        assert positions["unpriced"]["current_price"] is None
+        assert positions["unpriced"]["market_value"] == 50.0
+        assert positions["unpriced"]["pnl"] == 0.0
+
+    def test_portfolio_summary_empty(self, client):
+        response = client.get("/api/portfolio/summary")
+        assert response.status_code == 200
+        assert json.loads(response.content) == {
+            "total_value": 0.0,
+            "total_cost": 0.0,
+            "pnl": 0.0,
+            "pnl_percentage": None,
+            "realized_pnl": 0.0,
+            "positions": [],
+        }
+
+    def _create(self, client, asset_id, quantity=1.0, avg_price=100.0):
+        response = client.post(
+            "/api/portfolio",
+            data=json.dumps(
+                {"asset_id": asset_id, "quantity": quantity, "avg_price": avg_price}
+            ),
+            content_type="application/json",
+        )
+        assert response.status_code == 200
+        return json.loads(response.content)
+
+    def test_record_transactions(self, client, asset_factory):
+        asset_factory(id="bitcoin", current_price=Decimal("200"))
+        item = self._create(client, "bitcoin", quantity=2, avg_price=100)
+
+        response = client.post(
+            f"/api/portfolio/{item['id']}/transactions",
+            data=json.dumps({"side": "sell", "quantity": "0.5", "price": "180"}),
+            content_type="application/json",
+        )
+        assert response.status_code == 200
+        data = json.loads(response.content)
+        assert data["quantity"] == 1.5
+        assert data["avg_price"] == 100.0
+        assert data["realized_pnl"] == 40.0
+
+        response = client.get(f"/api/portfolio/{item['id']}/transactions")
+        entries = json.loads(response.content)
+        assert [(entry["side"], entry["quantity"]) for entry in entries] == [
+            ("sell", 0.5),
+            ("adjust", 2.0),
+        ]
+
+        summary = json.loads(client.get("/api/portfolio/summary").content)
+        assert summary["realized_pnl"] == 40.0
+        assert summary["positions"][0]["realized_pnl"] == 40.0
+
+    def test_update_is_recorded_in_the_ledger(self, client, asset_factory):
+        asset_factory(id="bitcoin")
+        item = self._create(client, "bitcoin")
+
+        client.put(
+            f"/api/portfolio/{item['id']}",
+            data=json.dumps({"quantity": 3.0}),
+            content_type="application/json",
+        )
+
+        entries = json.loads(
+            client.get(f"/api/portfolio/{item['id']}/transactions").content
+        )
+        assert entries[0]["side"] == "adjust"
+        assert (entries[0]["quantity"], entries[0]["price"]) == (3.0, 100.0)
+
+    def test_oversell_is_rejected(self, client, asset_factory):
+        asset_factory(id="bitcoin")
+        item = self._create(client, "bitcoin", quantity=1)
+
+        response = client.post(
+            f"/api/portfolio/{item['id']}/transactions",
+            data=json.dumps({"side": "sell", "quantity": 2, "price": 1}),
+            content_type="application/json",
+        )
+        assert response.status_code == 400
+        assert "Cannot sell" in json.loads(response.content)["detail"]
+
+    def test_naive_executed_at_uses_default_timezone(self, client, asset_factory):
+        asset_factory(id="bitcoin")
+        item = self._create(client, "bitcoin", quantity=1, avg_price=1)
+
+        response = client.post(
+            f"/api/portfolio/{item['id']}/transactions",
+            data=json.dumps(
+                {
+                    "side": "buy",
+                    "quantity": "1",
+                    "price": "2",
+                    "executed_at": "2020-01-01T00:00:00",
+                }
+            ),
+            content_type="application/json",
+        )
+        assert response.status_code == 200
+
+        entries = json.loads(
+            client.get(f"/api/portfolio/{item['id']}/transactions").content
+        )
+        assert entries[-1]["side"] == "buy"
+        executed_at = datetime.fromisoformat(entries[-1]["executed_at"])
+        assert executed_at == datetime(2020, 1, 1, tzinfo=timezone.utc)
+
+    def test_oversized_quantity_is_rejected(self, client, asset_factory):
+        asset_factory(id="bitcoin")
+        item = self._create(client, "bitcoin")
+
+        response = client.post(
+            f"/api/portfolio/{item['id']}/transactions",
+            data=json.dumps({"side": "buy", "quantity": "1e25", "price": "2"}),
+            content_type="application/json",
+        )
+        assert response.status_code == 400
+        assert "too large" in json.loads(response.content)["detail"]
+
+    def test_transactions_of_missing_item(self, client):
+        missing = "00000000-0000-0000-0000-000000000000"
+        assert client.get(f"/api/portfolio/{missing}/transactions").status_code == 404
+        response = client.post(
+            f"/api/portfolio/{missing}/transactions",
+            data=json.dumps({"side": "buy", "quantity": 1, "price": 1}),
+            content_type="application/json",
+        )
+        assert response.status_code == 404
+
+    def _import(self, client, name, content, **params):
+        return client.post(
+            "/api/portfolio/import" + (f"?format={params['format']}" if params else ""),
+            {"file": SimpleUploadedFile(name, content.encode())},
+        )
+
+    def test_import_csv(self, client, asset_factory, portfolio_item_factory):
+        asset_factory(id="bitcoin")
+        ethereum = asset_factory(id="ethereum")
+        existing = portfolio_item_factory(asset=ethereum, quantity=Decimal("1"))
+
+        response = self._import(
+            client,
+            "positions.csv",
+            "asset_id,quantity,avg_price\n"
+            "bitcoin,1,100\n"
+            "ethereum,5,2000\n"
+            "unknown,1,1\n"
+            "bitcoin,2,150\n",
+        )
+        assert response.status_code == 200
+        assert json.loads(response.content) == {
+            "rows": 4,
+            "created": 1,
+            "updated": 1,
+            "missing": ["unknown"],
+        }
+
+        items = {
+            item["asset"]["id"]: item
+            for item in json.loads(client.get("/api/portfolio").content)
+        }
+        assert (items["bitcoin"]["quantity"], items["bitcoin"]["avg_price"]) == (2.0, 150.0)
+        assert items["ethereum"]["id"] == str(existing.id)
+        assert items["ethereum"]["quantity"] == 5.0
+
+        entries = json.loads(
+            client.get(f"/api/portfolio/{existing.id}/transactions").content
+        )
+        assert (entries[0]["side"], entries[0]["quantity"]) == ("adjust", 5.0)
+
+    def test_import_ndjson(self, client, asset_factory):
+        asset_factory(id="bitcoin")
+
+        response = self._import(
+            client,
+            "positions.txt",
+            '{"asset_id": "bitcoin", "quantity": 0.5, "avg_price": "30000"}\n\n',
+            format="ndjson",
+        )
+        assert response.status_code == 200
+        assert json.loads(response.content)["created"] == 1
+        [item] = json.loads(client.get("/api/portfolio").content)
+        assert (item["quantity"], item["avg_price"]) == (0.5, 30000.0)
+
+    def test_import_rejects_bad_rows(self, client, asset_factory):
+        asset_factory(id="bitcoin")
+
+        response = self._import(
+            client,
+            "positions.csv",
+            "asset_id,quantity,avg_price\nbitcoin,1,100\nbitcoin,-1,100\n",
+        )
+        assert response.status_code == 400
+        assert json.loads(response.content)["detail"].startswith("Line 3:")
+        assert json.loads(client.get("/api/portfolio").content) == []
+
+    def test_export_round_trip(self, client, asset_factory, portfolio_item_factory):
+        bitcoin = asset_factory(id="bitcoin", symbol="BTC")
+        portfolio_item_factory(
+            asset=bitcoin, quantity=Decimal("1.5"), avg_price=Decimal("100")
+        )
+
+        response = client.get("/api/portfolio/export")
+        assert response.status_code == 200
+        assert response["Content-Type"] == "text/csv"
+        assert "portfolio.csv" in response["Content-Disposition"]
+        exported = b"".join(response.streaming_content).decode()
+        assert exported.splitlines()[0] == "asset_id,symbol,quantity,avg_price,realized_pnl"
+
+        client.delete(f"/api/portfolio/{bitcoin.portfolio_item.id}")
+        response = self._import(client, "portfolio.csv", exported)
+        assert json.loads(response.content)["created"] == 1
+        [item] = json.loads(client.get("/api/portfolio").content)
+        assert (item["quantity"], item["avg_price"]) == (1.5, 100.0)
+
+    @pytest.mark.django_db(transaction=True)
+    def test_export_ndjson_over_asgi(self, asset_factory, portfolio_item_factory):
+        portfolio_item_factory(
+            asset=asset_factory(id="bitcoin", symbol="BTC"), quantity=Decimal("2")
+        )
+
+        async def export():
+            response = await AsyncClient().get(
+                "/api/portfolio/export", {"format": "ndjson"}
+            )
+            return response, [line async for line in response.streaming_content]
+
+        response, lines = asyncio.run(export())
+        assert response["Content-Type"] == "application/x-ndjson"
+        [row] = [json.loads(line) for line in lines]
+        assert (row["asset_id"], row["symbol"]) == ("bitcoin", "BTC")
+        assert Decimal(row["quantity"]) == 2
+
+    def test_list_portfolio_sorted_by_value_and_pnl(
+        self, client, asset_factory, portfolio_item_factory
+    ):
+        for asset_id, quantity, avg_price, price in [
+            ("small", "1", "10", "20"),
+            ("large", "10", "100", "90"),
+            ("unpriced", "2", "50", None),
+        ]:
+            portfolio_item_factory(
+                asset=asset_factory(
+                    id=asset_id,
+                    current_price=price and Decimal(price),
+                ),
+                quantity=Decimal(quantity),
+                avg_price=Decimal(avg_price),
+            )
+
+        pages, params = [], {"sort": "-market_value", "limit": 2}
+        while True:
+            response = client.get("/api/portfolio", params)
+            pages.append([item["asset"]["id"] for item in json.loads(response.content)])
+            if "X-Next-Cursor" not in response.headers:
+                break
+            params["cursor"] = response.headers["X-Next-Cursor"]
+        assert pages == [["large", "unpriced"], ["small"]]
+
+        response = client.get("/api/portfolio", {"sort": "pnl"})
+        assert [item["asset"]["id"] for item in json.loads(response.content)] == [
+            "large",
+            "unpriced",
+            "small",
+        ]
+
+    def test_create_portfolio_item_statements(
+        self, client, asset_factory, django_assert_num_queries
+    ):
+        asset_factory(id="bitcoin")
+
+        # Asset lookup and the two inserts; the test transaction adds a
+        # savepoint pair around them.
+        with django_assert_num_queries(5):
+            self._create(client, "bitcoin")
+        # A duplicate fails on the unique column, with no lookup beforehand.
+        with django_assert_num_queries(5):
+            response = client.post(
+                "/api/portfolio",
+                data=json.dumps({"asset_id": "bitcoin", "quantity": 1, "avg_price": 1}),
+                content_type="application/json",
+            )
+        assert response.status_code == 409
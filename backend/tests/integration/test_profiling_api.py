@@ -0,0 +1,181 @@
+import asyncio
+import json
+import pstats
+import time
+from functools import wraps
+
+import pytest
+from django.db.models.sql import Query
+from django.test import AsyncClient, Client
+
+from apps.assets.search import search_assets
+from config.profiling import PROFILE_HEADER, profile_token
+
+
+@pytest.fixture
+def profiling(settings, tmp_path):
+    settings.API_PROFILING_ENABLED = True
+    settings.API_PROFILE_SAMPLE_RATE = 0
+    settings.API_PROFILE_DIR = str(tmp_path)
+    return tmp_path
+
+
+def _slow(func, seconds=0.05):
+    @wraps(func)
+    def inner(*args, **kwargs):
+        time.sleep(seconds)
+        return func(*args, **kwargs)
+
+    return inner
+
+
+@pytest.mark.integration
+@pytest.mark.django_db
+class TestProfilingAPI:
+    def test_disabled_by_default(self, admin_client, tmp_path, settings):
+        settings.API_PROFILE_DIR = str(tmp_path)
+        Client().get("/api/assets", headers={PROFILE_HEADER: profile_token()})
+        assert list(tmp_path.iterdir()) == []
+        assert admin_client.get("/api/_profiles").status_code == 404
+
+    def test_signed_header_triggers_capture(self, profiling, asset_factory):
+        asset_factory(id="bitcoin")
+
+        response = Client().get(
+            "/api/assets",
+            {"search": "bit", "page_size": 5},
+            headers={PROFILE_HEADER: profile_token()},
+        )
+        assert response.status_code == 200
+
+        [sidecar] = profiling.glob("*.json")
+        meta = json.loads(sidecar.read_text())
+        assert meta["route"] == "api/assets"
+        assert meta["method"] == "GET"
+        assert meta["params"] == {"search": ["bit"], "page_size": ["5"]}
+        assert meta["status"] == 200
+        assert meta["trigger"] == "header"
+        assert sidecar.with_suffix(".prof").exists()
+
+    def test_forged_header_is_ignored(self, profiling):
+        Client().get("/api/assets", headers={PROFILE_HEADER: "profile:forged:sig"})
+        assert list(profiling.iterdir()) == []
+
+    def test_sample_rate(self, profiling, settings):
+        settings.API_PROFILE_SAMPLE_RATE = 1
+        Client().get("/api/favorites")
+        Client().get("/api/portfolio")
+        assert len(list(profiling.glob("*.prof"))) == 2
+
+    def test_keeps_newest_captures(self, profiling, settings):
+        settings.API_PROFILE_SAMPLE_RATE = 1
+        settings.API_PROFILE_MAX_FILES = 2
+        for _ in range(4):
+            Client().get("/api/favorites")
+        assert len(list(profiling.glob("*.json"))) == 2
+        assert len(list(profiling.glob("*.prof"))) == 2
+
+    def test_index_requires_staff(self, profiling):
+        assert Client().get("/api/_profiles").status_code == 403
+
+    def test_index_and_report(self, profiling, settings, admin_client):
+        settings.API_PROFILE_SAMPLE_RATE = 1
+        Client().get("/api/favorites")
+
+        index = admin_client.get("/api/_profiles").json()
+        assert index["header"] == PROFILE_HEADER
+        assert index["token"]
+        [profile] = index["profiles"]
+        assert profile["route"] == "api/favorites"
+
+        report = admin_client.get(f"/api/_profiles/{profile['name']}")
+        assert report.status_code == 200
+        assert "function calls" in report.content.decode()
+
+        download = admin_client.get(f"/api/_profiles/{profile['name']}?download=1")
+        assert download.status_code == 200
+        assert admin_client.get("/api/_profiles/missing").status_code == 404
+
+    def test_index_token_triggers_capture(self, profiling, admin_client):
+        token = admin_client.get("/api/_profiles").json()["token"]
+        Client().get("/api/favorites", headers={PROFILE_HEADER: token})
+        assert len(list(profiling.glob("*.prof"))) == 1
+
+    @pytest.mark.django_db(transaction=True)
+    def test_captures_async_requests(self, profiling):
+        async def fetch():
+            return await AsyncClient().get(
+                "/api/portfolio/summary", headers={PROFILE_HEADER: profile_token()}
+            )
+
+        assert asyncio.run(fetch()).status_code == 200
+        [sidecar] = profiling.glob("*.json")
+        assert json.loads(sidecar.read_text())["route"] == "api/portfolio/summary"
+
+    @pytest.mark.django_db(transaction=True)
+    @pytest.mark.parametrize("asgi", [False, True], ids=["wsgi", "asgi"])
+    def test_stats_cover_every_thread_of_the_request(
+        self, profiling, asset_factory, monkeypatch, asgi
+    ):
+        asset_factory(id="profiled-coin", name="Profiled Coin")
+        # One slow call on the view's coroutine and one in the ORM thread.
+        monkeypatch.setattr("apps.assets.api.search_assets", _slow(search_assets))
+        monkeypatch.setattr(Query, "get_count", _slow(Query.get_count))
+        params = {"search": "profiled"}
+        headers = {PROFILE_HEADER: profile_token()}
+
+        if asgi:
+
+            async def fetch():
+                return await AsyncClient().get("/api/assets", params, headers=headers)
+
+            response = asyncio.run(fetch())
+        else:
+            response = Client().get("/api/assets", params, headers=headers)
+        assert response.status_code == 200
+
+        [path] = profiling.glob("*.prof")
+        stats = pstats.Stats(str(path)).stats
+        functions = {(filename, name) for filename, _, name in stats}
+        names = {name for _, name in functions}
+        assert {"list_assets", "_load_asset_page", "read_through"} <= names
+        assert any(
+            filename.endswith("django/db/models/query.py") and name == "count"
+            for filename, name in functions
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_asgi_capture_skips_other_tasks_on_the_loop(
+        self, profiling, asset_factory, monkeypatch
+    ):
+        asset_factory(id="profiled-coin", name="Profiled Coin")
+        monkeypatch.setattr(Query, "get_count", _slow(Query.get_count, 0.3))
+
+        def unrelated_work():
+            time.sleep(0.1)
+
+        async def other_request():
+            # Runs on the loop while the profiled request waits on its query.
+            await asyncio.sleep(0.1)
+            unrelated_work()
+
+        async def scenario():
+            profiled = AsyncClient().get(
+                "/api/assets",
+                {"search": "profiled"},
+                headers={PROFILE_HEADER: profile_token()},
+            )
+            response, _ = await asyncio.gather(profiled, other_request())
+            return response
+
+        assert asyncio.run(scenario()).status_code == 200
+
+        [path] = profiling.glob("*.prof")
+        functions = {
+            (filename, name) for filename, _, name in pstats.Stats(str(path)).stats
+        }
+        assert any(
+            filename.endswith("django/db/models/query.py") and name == "count"
+            for filename, name in functions
+        )
+        assert "unrelated_work" not in {name for _, name in functions}
@@ -0,0 +1,80 @@
+import logging
+
+import pytest
+from django.test import Client
+
+from apps.assets.models import Asset
+from config.budgets import QueryBudgetExceeded, query_budget_block
+from config.urls import api
+
+
+def _operations():
+    for prefix, router in api._routers:
+        for path, path_view in router.path_operations.items():
+            for operation in path_view.operations:
+                yield f"{operation.methods[0]} {prefix}{path}", operation
+
+
+def test_every_operation_declares_a_budget():
+    operations = dict(_operations())
+    assert operations
+    missing = [
+        name
+        for name, operation in operations.items()
+        if not hasattr(operation.run, "query_budget")
+    ]
+    assert missing == []
+
+
+@pytest.mark.django_db
+class TestQueryBudgetBlock:
+    def test_raises_over_budget(self, settings):
+        settings.API_QUERY_BUDGETS = "raise"
+        with pytest.raises(QueryBudgetExceeded, match="ran 2 queries, budget is 1"):
+            with query_budget_block(1):
+                Asset.objects.count()
+                Asset.objects.count()
+
+    def test_within_budget(self, settings):
+        settings.API_QUERY_BUDGETS = "raise"
+        with query_budget_block(1):
+            Asset.objects.count()
+
+    def test_warns_over_budget(self, settings, caplog):
+        settings.API_QUERY_BUDGETS = "warn"
+        with caplog.at_level(logging.WARNING, logger="config.budgets"):
+            with query_budget_block(0, "counting"):
+                Asset.objects.count()
+        assert "counting ran 1 queries, budget is 0" in caplog.text
+
+    def test_off(self, settings, caplog):
+        settings.API_QUERY_BUDGETS = "off"
+        with query_budget_block(0):
+            Asset.objects.count()
+        assert caplog.text == ""
+
+
+@pytest.mark.integration
+@pytest.mark.django_db
+class TestListBudgets:
+    """List endpoints must not issue a query per row."""
+
+    @pytest.fixture(autouse=True)
+    def _rows(self, favorite_factory, portfolio_item_factory, asset_factory):
+        for index in range(10):
+            favorite_factory(asset_factory(id=f"coin-{index}", symbol=f"C{index}"))
+            portfolio_item_factory(asset_factory(id=f"token-{index}"))
+
+    @pytest.mark.parametrize(
+        "path",
+        [
+            "/api/favorites",
+            "/api/favorites?fields=id,symbol",
+            "/api/portfolio",
+            "/api/portfolio?fields=id,current_price",
+            "/api/portfolio/summary",
+            "/api/assets?page_size=100",
+        ],
+    )
+    def test_list_stays_within_budget(self, path):
+        assert Client().get(path).status_code == 200
@@ -76,4 +76,39 @@ class TestAssetModel:
     def test_asset_meta_indexes(self, db):
         indexes = [idx.fields for idx in Asset._meta.indexes]
         assert ["status", "symbol"] in indexes
+        assert ["market_cap_rank", "symbol", "id"] in indexes
 
+
+    def test_bulk_writes_send_assets_changed(self, asset_factory):
+        from apps.assets.signals import assets_changed
+
+        received = []
+
+        def _listener(sender, ids, **kwargs):
+            received.append(ids)
+
+        assets_changed.connect(_listener)
+        try:
+            asset = asset_factory(id="bitcoin")
+            Asset.objects.bulk_create([Asset(id="ethereum", symbol="ETH", name="E")])
+            asset.name = "Bitcoin"
+            Asset.objects.bulk_update([asset], ["name"])
+            Asset.objects.filter(id="ethereum").update(name="Ethereum")
+        finally:
+            assets_changed.disconnect(_listener)
+
+        assert received == [["bitcoin"], ["ethereum"], ["bitcoin"], None]
+
+    def test_queryset_writes_touch_updated_at(self, asset_factory):
+        asset = asset_factory(id="bitcoin")
+        previous = asset.updated_at
+
+        Asset.objects.filter(id="bitcoin").update(name="Bitcoin")
+        asset.refresh_from_db()
+        assert asset.updated_at > previous
+
+        previous = asset.updated_at
+        asset.name = "BTC"
+        Asset.objects.bulk_update([asset], ["name"])
+        asset.refresh_from_db()
+        assert asset.updated_at > previous
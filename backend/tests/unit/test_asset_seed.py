@@ -0,0 +1,79 @@
+import pytest
+import io
+
+from django.core.management import CommandError, call_command
+
+from apps.assets.models import Asset, HourCandle, PriceTick
+from apps.assets.seed import synthetic_assets, synthetic_sample
+from apps.favorites.models import Favorite
+from apps.portfolio.models import PortfolioItem, PortfolioTransaction
+
+
+@pytest.mark.unit
+class TestSyntheticSeed:
+    def test_synthetic_assets_are_deterministic(self):
+        first = [
+            (asset.id, asset.symbol, asset.name, asset.current_price)
+            for asset in synthetic_assets(50, seed=7)
+        ]
+        second = [
+            (asset.id, asset.symbol, asset.name, asset.current_price)
+            for asset in synthetic_assets(50, seed=7)
+        ]
+
+        assert first == second
+        assert len({symbol for _, symbol, _, _ in first}) == 50
+
+    def test_synthetic_assets_leave_tail_unranked(self):
+        ranks = [asset.market_cap_rank for asset in synthetic_assets(10)]
+        assert ranks == [1, 2, 3, 4, 5, 6, None, None, None, None]
+
+    def test_synthetic_sample_is_distinct_and_bounded(self):
+        sample = synthetic_sample(100, 30, seed=1)
+        assert len(set(sample)) == 30
+        assert synthetic_sample(5, 30, seed=1) == [
+            f"synthetic-{index}" for index in range(5)
+        ]
+
+
+@pytest.mark.unit
+@pytest.mark.django_db
+class TestSeedAssetsCommand:
+    def test_seed_synthetic_catalog(self):
+        out = io.StringIO()
+        call_command(
+            "seed_assets",
+            "--count=120",
+            "--favorites=5",
+            "--portfolio-items=3",
+            "--history-days=1",
+            "--batch-size=50",
+            stdout=out,
+        )
+
+        assert Asset.objects.count() == 120
+        assert Favorite.objects.count() == 5
+        assert PortfolioItem.objects.count() == 3
+        assert PortfolioTransaction.objects.filter(side="adjust").count() == 3
+        assert PriceTick.objects.count() == 24 * len(
+            set(Favorite.objects.values_list("asset_id", flat=True))
+            | set(PortfolioItem.objects.values_list("asset_id", flat=True))
+        )
+        assert HourCandle.objects.exists()
+        assert "assets: 120 rows" in out.getvalue()
+
+    def test_seed_twice_keeps_existing_positions(self):
+        for _ in range(2):
+            call_command(
+                "seed_assets",
+                "--count=50",
+                "--portfolio-items=5",
+                stdout=io.StringIO(),
+            )
+
+        assert PortfolioItem.objects.count() == 5
+        assert PortfolioTransaction.objects.count() == 5
+
+    def test_seed_rejects_invalid_count(self):
+        with pytest.raises(CommandError):
+            call_command("seed_assets", "--count=0", stdout=io.StringIO())
@@ -2,6 +2,8 @@
 import pytest
 from uuid import UUID
 
+from django.db import IntegrityError, transaction
+
 from apps.favorites.models import Favorite
 
 
@@ -24,14 +26,13 @@ class TestFavoriteModel:
         assert favorite in asset.favorites.all()
         assert favorite.asset == asset
 
-    def test_multiple_favorites_per_asset_allowed(self, favorite_factory, asset_factory, db):   
+    def test_one_favorite_per_asset(self, favorite_factory, asset_factory, db):
         asset = asset_factory()
-        favorite1 = favorite_factory(asset=asset)
-        favorite2 = favorite_factory(asset=asset)
+        favorite_factory(asset=asset)
 
-        assert favorite1.id != favorite2.id
-        assert favorite1.asset == favorite2.asset == asset
-        assert asset.favorites.count() == 2
+        with pytest.raises(IntegrityError), transaction.atomic():
+            favorite_factory(asset=asset)
+        assert asset.favorites.count() == 1
 
     def test_favorite_cascade_on_delete(self, favorite_factory, asset_factory, db):
         asset = asset_factory()
@@ -0,0 +1,36 @@
+import pytest
+from datetime import datetime, timezone
+
+from apps.assets.changes import ChangeToken, decode_token, encode_token
+from apps.assets.pagination import (
+    Cursor,
+    InvalidCursor,
+    Keyset,
+    decode_cursor,
+    decode_keyset,
+    encode_cursor,
+    encode_keyset,
+)
+
+
+@pytest.mark.unit
+class TestTokens:
+    def test_round_trips(self):
+        cursor = Cursor(1, "BTC", "bitcoin", search_rank=0)
+        assert decode_cursor(encode_cursor(cursor)) == cursor
+        assert decode_cursor(encode_cursor(Cursor(None, "X", "x"))) == Cursor(
+            None, "X", "x"
+        )
+
+        keyset = encode_keyset("-rank", 3, "abc")
+        assert decode_keyset(keyset) == Keyset("-rank", "3", "abc")
+
+        token = ChangeToken(datetime(2024, 1, 1, tzinfo=timezone.utc), "bitcoin")
+        assert decode_token(encode_token(token)) == token
+
+    @pytest.mark.parametrize("decode", [decode_cursor, decode_keyset, decode_token])
+    @pytest.mark.parametrize("token", ["not-a-cursor", "e30", "WzFd", "IngiCg"])
+    def test_rejects_malformed(self, decode, token):
+        # Not base64 JSON, an object, a one-item list and a bare string.
+        with pytest.raises(InvalidCursor):
+            decode(token)
@@ -0,0 +1,162 @@
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from apps.portfolio.ledger import (
+    LedgerError,
+    Position,
+    apply_trade,
+    open_position,
+    record_trade,
+    replay_ledger,
+)
+from apps.portfolio.models import PortfolioItem, PortfolioTransaction
+
+D = Decimal
+
+
+@pytest.mark.unit
+class TestApplyTrade:
+    def test_buys_average_the_price(self):
+        position = apply_trade(Position(), "buy", D("2"), D("100"))
+        position = apply_trade(position, "buy", D("1"), D("130"))
+        assert position == Position(D("3"), D("110"), D("0"))
+
+    def test_sell_realizes_against_the_average(self):
+        position = apply_trade(Position(D("3"), D("110")), "sell", D("2"), D("150"))
+        assert position == Position(D("1"), D("110"), D("80"))
+
+    def test_adjust_sets_the_position_and_keeps_realized(self):
+        position = apply_trade(Position(D("1"), D("10"), D("5")), "adjust", 4, 2.5)
+        assert position == Position(D("4"), D("2.5"), D("5"))
+
+    def test_average_is_rounded_to_column_scale(self):
+        position = apply_trade(Position(D("1"), D("1")), "buy", D("2"), D("0"))
+        assert position.avg_price == D("0.33333333")
+
+    @pytest.mark.parametrize(
+        "side, quantity, price",
+        [
+            ("sell", D("2"), D("1")),
+            ("buy", D("0"), D("1")),
+            ("buy", D("-1"), D("1")),
+            ("hold", D("1"), D("1")),
+            ("buy", D("1e25"), D("1")),
+            ("buy", D("1"), D("1e12")),
+            ("buy", D("NaN"), D("1")),
+        ],
+    )
+    def test_rejects_invalid_entries(self, side, quantity, price):
+        with pytest.raises(LedgerError):
+            apply_trade(Position(D("1"), D("1")), side, quantity, price)
+
+
+@pytest.mark.unit
+@pytest.mark.django_db
+class TestRecordTrade:
+    @pytest.fixture
+    def item(self, asset_factory):
+        return open_position(asset_factory(id="bitcoin"), D("1"), D("100"))
+
+    def test_open_position_starts_the_ledger(self, item):
+        [entry] = item.transactions.all()
+        assert (entry.side, entry.quantity, entry.price) == ("adjust", D("1"), D("100"))
+        assert item.last_executed_at == entry.executed_at
+
+    def test_updates_aggregates_in_place(self, item, django_assert_max_num_queries):
+        with django_assert_max_num_queries(5):
+            record_trade(item.id, "buy", D("1"), D("200"))
+        item = record_trade(item.id, "sell", D("1.5"), D("250"))
+
+        item.refresh_from_db()
+        assert item.quantity == D("0.5")
+        assert item.avg_price == D("150")
+        assert item.realized_pnl == D("150")
+        assert item.transactions.count() == 3
+
+    def test_rejected_trade_leaves_no_trace(self, item):
+        with pytest.raises(LedgerError):
+            record_trade(item.id, "sell", D("5"), D("100"))
+        item.refresh_from_db()
+        assert item.quantity == D("1")
+        assert item.transactions.count() == 1
+
+    def test_backdated_trade_replays_the_position(self, item):
+        now = timezone.now()
+        record_trade(item.id, "sell", D("1"), D("200"), now + timedelta(hours=2))
+        item = record_trade(item.id, "buy", D("1"), D("300"), now + timedelta(hours=1))
+
+        # buy at 300 moves the average to 200 before the sell realizes 0.
+        item.refresh_from_db()
+        assert item.quantity == D("1")
+        assert item.avg_price == D("200")
+        assert item.realized_pnl == D("0")
+        assert item.last_executed_at == now + timedelta(hours=2)
+
+    def test_backdated_trade_cannot_break_later_sells(self, item):
+        now = timezone.now()
+        record_trade(item.id, "sell", D("1"), D("200"), now + timedelta(hours=2))
+        with pytest.raises(LedgerError):
+            record_trade(item.id, "adjust", D("0"), D("0"), now + timedelta(hours=1))
+
+    def test_missing_item(self):
+        from uuid import uuid4
+
+        with pytest.raises(PortfolioItem.DoesNotExist):
+            record_trade(uuid4(), "buy", D("1"), D("1"))
+
+
+@pytest.mark.unit
+@pytest.mark.django_db
+class TestReplayLedger:
+    def test_replay_matches_incremental_aggregates(self, asset_factory):
+        items = [
+            open_position(asset_factory(id=f"coin-{index}"), D("1"), D("10"))
+            for index in range(5)
+        ]
+        for index, item in enumerate(items):
+            record_trade(item.id, "buy", D(index + 1), D("20.3"))
+            record_trade(item.id, "sell", D("0.7"), D("31"))
+        expected = {
+            row[0]: row[1:]
+            for row in PortfolioItem.objects.values_list(
+                "id", "quantity", "avg_price", "realized_pnl", "last_executed_at"
+            )
+        }
+
+        PortfolioItem.objects.update(quantity=0, avg_price=0, realized_pnl=0)
+        assert sum(replay_ledger(batch_size=2)) == 5
+
+        rebuilt = {
+            row[0]: row[1:]
+            for row in PortfolioItem.objects.values_list(
+                "id", "quantity", "avg_price", "realized_pnl", "last_executed_at"
+            )
+        }
+        assert rebuilt == expected
+
+    def test_command(self, asset_factory):
+        item = open_position(asset_factory(id="bitcoin"), D("2"), D("10"))
+        record_trade(item.id, "sell", D("1"), D("15"))
+        PortfolioItem.objects.update(realized_pnl=0)
+
+        out = StringIO()
+        call_command("replay_ledger", stdout=out)
+
+        item.refresh_from_db()
+        assert item.realized_pnl == D("5")
+        assert "1 positions replayed" in out.getvalue()
+
+    def test_command_reports_inconsistent_ledgers(self, asset_factory):
+        from django.core.management import CommandError
+
+        item = open_position(asset_factory(id="bitcoin"), D("1"), D("10"))
+        PortfolioTransaction.objects.create(
+            portfolio_item=item, side="sell", quantity=D("3"), price=D("1")
+        )
+        with pytest.raises(CommandError, match="Cannot sell"):
+            call_command("replay_ledger", stdout=StringIO())
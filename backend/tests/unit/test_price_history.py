@@ -0,0 +1,82 @@
+import pytest
+from datetime import datetime, timezone
+from decimal import Decimal
+
+from asgiref.sync import async_to_sync
+
+from apps.assets.history import Tick, candle_history, record_ticks
+from apps.assets.models import DayCandle, HourCandle, MinuteCandle, PriceTick
+
+
+def at(hour, minute=0, second=0):
+    return datetime(2024, 1, 1, hour, minute, second, tzinfo=timezone.utc)
+
+
+@pytest.mark.unit
+@pytest.mark.django_db
+class TestPriceHistory:
+    def test_record_ticks_builds_every_rollup(self, asset_factory):
+        asset = asset_factory(id="bitcoin")
+        record_ticks(
+            [
+                Tick(asset.id, at(10, 0, 5), Decimal("100")),
+                Tick(asset.id, at(10, 0, 30), Decimal("120")),
+                Tick(asset.id, at(10, 0, 50), Decimal("90")),
+                Tick(asset.id, at(10, 1, 10), Decimal("95")),
+            ]
+        )
+
+        assert PriceTick.objects.count() == 4
+        assert MinuteCandle.objects.count() == 2
+        minute = MinuteCandle.objects.get(asset=asset, bucket=at(10))
+        assert (minute.open, minute.high, minute.low, minute.close) == (
+            Decimal("100"),
+            Decimal("120"),
+            Decimal("90"),
+            Decimal("90"),
+        )
+
+        hour = HourCandle.objects.get(asset=asset)
+        assert hour.open == Decimal("100")
+        assert hour.close == Decimal("95")
+        assert DayCandle.objects.get(asset=asset).high == Decimal("120")
+
+    def test_late_ticks_merge_into_existing_candles(self, asset_factory):
+        asset = asset_factory(id="bitcoin")
+        record_ticks([Tick(asset.id, at(10, 30), Decimal("100"))])
+        record_ticks(
+            [
+                Tick(asset.id, at(10, 10), Decimal("80")),
+                Tick(asset.id, at(10, 50), Decimal("130")),
+            ]
+        )
+
+        hour = HourCandle.objects.get(asset=asset)
+        assert hour.open == Decimal("80")
+        assert hour.close == Decimal("130")
+        assert hour.low == Decimal("80")
+        assert hour.high == Decimal("130")
+
+    def test_replayed_ticks_are_idempotent(self, asset_factory):
+        asset = asset_factory(id="bitcoin")
+        ticks = [
+            Tick(asset.id, at(10, 5), Decimal("100")),
+            Tick(asset.id, at(10, 45), Decimal("110")),
+        ]
+        record_ticks(ticks)
+        record_ticks(ticks[:1])
+
+        assert PriceTick.objects.count() == 2
+        hour = HourCandle.objects.get(asset=asset)
+        assert hour.open == Decimal("100")
+        assert hour.close == Decimal("110")
+
+    def test_candle_history_returns_latest_oldest_first(self, asset_factory):
+        asset = asset_factory(id="bitcoin")
+        record_ticks(
+            [Tick(asset.id, at(hour), Decimal(hour)) for hour in range(10, 15)]
+        )
+
+        candles = async_to_sync(candle_history)(asset.id, "1h", limit=3)
+
+        assert [candle.bucket.hour for candle in candles] == [12, 13, 14]
@@ -0,0 +1,155 @@
+import pytest
+import io
+from decimal import Decimal
+
+from django.core.management import CommandError, call_command
+
+from apps.assets.ingest import PriceUpdate, ingest_prices, read_updates
+from apps.assets.models import Asset, HourCandle, PriceTick
+
+
+@pytest.mark.unit
+class TestReadUpdates:
+    def test_read_ndjson(self):
+        stream = io.StringIO(
+            '{"id": "bitcoin", "current_price": 43000.12345678}\n'
+            "\n"
+            '{"id": "ethereum", "market_cap_rank": 2}\n'
+        )
+
+        updates = list(read_updates(stream))
+
+        assert updates == [
+            PriceUpdate("bitcoin", current_price=Decimal("43000.12345678")),
+            PriceUpdate("ethereum", market_cap_rank=2),
+        ]
+
+    def test_read_csv(self):
+        stream = io.StringIO(
+            "id,current_price,price_change_percentage_24h,timestamp\n"
+            "bitcoin,43000.5,-1.25,2024-01-01T10:00:00Z\n"
+            "ethereum,,,\n"
+        )
+
+        bitcoin, ethereum = read_updates(stream, "csv")
+
+        assert bitcoin.current_price == Decimal("43000.5")
+        assert bitcoin.price_change_percentage_24h == Decimal("-1.25")
+        assert bitcoin.timestamp.hour == 10
+        assert ethereum == PriceUpdate("ethereum")
+
+    def test_invalid_line_reports_line_number(self):
+        stream = io.StringIO('{"id": "bitcoin"}\n{"current_price": 1}\n')
+        with pytest.raises(ValueError, match="Line 2"):
+            list(read_updates(stream))
+
+    def test_rejects_negative_rank(self):
+        stream = io.StringIO('{"id": "bitcoin", "market_cap_rank": -1}\n')
+        with pytest.raises(ValueError, match="Line 1: Invalid market_cap_rank"):
+            list(read_updates(stream))
+
+    def test_naive_timestamp_uses_default_timezone(self, settings):
+        settings.TIME_ZONE = "America/Sao_Paulo"
+        stream = io.StringIO('{"id": "bitcoin", "timestamp": "2024-01-01T10:00:00"}\n')
+
+        [update] = read_updates(stream)
+
+        assert update.timestamp.isoformat() == "2024-01-01T10:00:00-03:00"
+
+
+@pytest.mark.unit
+@pytest.mark.django_db
+class TestIngestPrices:
+    def test_ingest_updates_known_assets(self, asset_factory):
+        asset_factory(id="bitcoin", current_price=Decimal("1"), market_cap_rank=1)
+        asset_factory(id="ethereum", current_price=Decimal("2"), market_cap_rank=2)
+
+        result = ingest_prices(
+            [
+                PriceUpdate("bitcoin", current_price=Decimal("43000")),
+                PriceUpdate("ethereum", price_change_percentage_24h=Decimal("1.5")),
+                PriceUpdate("unknown", current_price=Decimal("3")),
+            ],
+            batch_size=2,
+        )
+
+        assert result.rows == 3
+        assert result.updated == 2
+        assert result.missing == ["unknown"]
+        bitcoin = Asset.objects.get(id="bitcoin")
+        assert bitcoin.current_price == Decimal("43000")
+        assert bitcoin.market_cap_rank == 1
+        ethereum = Asset.objects.get(id="ethereum")
+        assert ethereum.current_price == Decimal("2")
+        assert ethereum.price_change_percentage_24h == Decimal("1.5")
+
+    def test_ingest_records_history(self, asset_factory):
+        asset_factory(id="bitcoin")
+
+        ingest_prices([PriceUpdate("bitcoin", current_price=Decimal("100"))])
+        assert PriceTick.objects.filter(asset_id="bitcoin").count() == 1
+        assert HourCandle.objects.get(asset_id="bitcoin").close == Decimal("100")
+
+        ingest_prices(
+            [PriceUpdate("bitcoin", current_price=Decimal("110"))],
+            record_history=False,
+        )
+        assert PriceTick.objects.count() == 1
+
+    def test_updated_at_stamped_after_history(self, asset_factory, monkeypatch):
+        from django.utils import timezone
+
+        from apps.assets import ingest
+
+        asset_factory(id="bitcoin", current_price=Decimal("1"))
+        original = ingest.record_ticks
+        recorded = []
+
+        def record_ticks(ticks):
+            original(ticks)
+            recorded.append(timezone.now())
+
+        monkeypatch.setattr(ingest, "record_ticks", record_ticks)
+
+        ingest_prices([PriceUpdate("bitcoin", current_price=Decimal("5"))])
+
+        assert Asset.objects.get(id="bitcoin").updated_at >= recorded[0]
+
+    def test_commit_lag_past_settle_window_is_logged(
+        self, asset_factory, settings, caplog
+    ):
+        settings.ASSETS_CHANGES_SETTLE_SECONDS = 0
+        asset_factory(id="bitcoin")
+
+        result = ingest_prices([PriceUpdate("bitcoin", current_price=Decimal("5"))])
+
+        assert result.commit_lag > 0
+        assert "ASSETS_CHANGES_SETTLE_SECONDS" in caplog.text
+
+    @pytest.mark.django_db(transaction=True)
+    def test_ingest_invalidates_cached_asset(self, client, asset_factory):
+        asset_factory(id="bitcoin", current_price=Decimal("1"))
+        client.get("/api/assets/bitcoin")
+
+        ingest_prices([PriceUpdate("bitcoin", current_price=Decimal("5"))])
+
+        response = client.get("/api/assets/bitcoin")
+        assert response.json()["current_price"] == 5.0
+
+    def test_command_reads_files(self, asset_factory, tmp_path):
+        asset_factory(id="bitcoin")
+        path = tmp_path / "prices.csv"
+        path.write_text("id,current_price\nbitcoin,42\nmissing,1\n")
+        out = io.StringIO()
+
+        call_command("ingest_prices", str(path), stdout=out)
+
+        assert Asset.objects.get(id="bitcoin").current_price == Decimal("42")
+        assert "2 rows, 1 updated" in out.getvalue()
+        assert "1 unknown asset ids skipped" in out.getvalue()
+
+    def test_command_rejects_invalid_input(self, tmp_path):
+        path = tmp_path / "prices.ndjson"
+        path.write_text("not json\n")
+        with pytest.raises(CommandError, match="Line 1"):
+            call_command("ingest_prices", str(path), stdout=io.StringIO())
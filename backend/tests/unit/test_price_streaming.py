@@ -0,0 +1,135 @@
+import pytest
+import asyncio
+import json
+from decimal import Decimal
+
+from apps.assets.models import Asset
+from apps.assets.streaming import PriceBroadcaster, Subscription, price_events
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+@pytest.mark.unit
+class TestSubscription:
+    def test_coalesces_updates_per_asset(self):
+        async def scenario():
+            subscription = Subscription()
+            subscription.push([{"id": "bitcoin", "current_price": 1.0}])
+            subscription.push(
+                [
+                    {"id": "bitcoin", "current_price": 2.0},
+                    {"id": "ethereum", "current_price": 3.0},
+                ]
+            )
+            return await subscription.next_batch(timeout=1)
+
+        assert run(scenario()) == [
+            {"id": "bitcoin", "current_price": 2.0},
+            {"id": "ethereum", "current_price": 3.0},
+        ]
+
+    def test_filters_to_subscribed_assets(self):
+        async def scenario():
+            subscription = Subscription(["ethereum"])
+            subscription.push([{"id": "bitcoin"}, {"id": "ethereum"}])
+            first = await subscription.next_batch(timeout=1)
+            subscription.push([{"id": "bitcoin"}])
+            second = await subscription.next_batch(timeout=0.01)
+            return first, second
+
+        assert run(scenario()) == ([{"id": "ethereum"}], [])
+
+
+@pytest.mark.unit
+@pytest.mark.django_db(transaction=True)
+class TestPriceBroadcaster:
+    def test_poll_returns_only_changed_prices(self, asset_factory):
+        asset_factory(id="bitcoin", current_price=Decimal("1"))
+        broadcaster = PriceBroadcaster()
+
+        async def scenario():
+            broadcaster.subscribe()
+            first = await broadcaster.poll()
+            await Asset.objects.filter(id="bitcoin").aupdate(current_price=Decimal("1"))
+            touched = await broadcaster.poll()
+            await Asset.objects.filter(id="bitcoin").aupdate(current_price=Decimal("2"))
+            second = await broadcaster.poll()
+            third = await broadcaster.poll()
+            return first, touched, second, third
+
+        first, touched, second, third = run(scenario())
+        assert first == []
+        assert [delta["current_price"] for delta in touched] == [1.0]
+        assert second == [
+            {
+                "id": "bitcoin",
+                "current_price": 2.0,
+                "price_change_percentage_24h": None,
+            }
+        ]
+        assert third == []
+
+    def test_keeps_polling_after_a_failure(self, asset_factory, settings, caplog):
+        settings.ASSETS_STREAM_INTERVAL = 0.01
+        asset_factory(id="bitcoin", current_price=Decimal("1"))
+        broadcaster = PriceBroadcaster()
+        poll = broadcaster.poll
+        calls = []
+
+        async def flaky_poll():
+            calls.append(None)
+            if len(calls) == 1:
+                raise ConnectionError("database went away")
+            return await poll()
+
+        broadcaster.poll = flaky_poll
+
+        async def scenario():
+            subscription = broadcaster.subscribe()
+            await asyncio.sleep(0.05)
+            await Asset.objects.filter(id="bitcoin").aupdate(current_price=Decimal("2"))
+            batch = await subscription.next_batch(timeout=2)
+            broadcaster.unsubscribe(subscription)
+            return batch
+
+        batch = run(scenario())
+        assert [delta["current_price"] for delta in batch] == [2.0]
+        assert len(calls) > 1
+        assert "Price poll failed" in caplog.text
+
+    def test_price_events_stream(self, asset_factory, settings):
+        settings.ASSETS_STREAM_INTERVAL = 0.01
+        asset_factory(id="bitcoin", current_price=Decimal("1"))
+        asset_factory(id="ethereum", current_price=Decimal("5"))
+
+        async def scenario():
+            events = price_events(["bitcoin"])
+            received = [await anext(events), await anext(events)]
+            await asyncio.sleep(0.05)
+            await Asset.objects.filter(id="ethereum").aupdate(
+                current_price=Decimal("6")
+            )
+            await Asset.objects.filter(id="bitcoin").aupdate(current_price=Decimal("2"))
+            await Asset.objects.filter(id="bitcoin").aupdate(current_price=Decimal("3"))
+            while True:
+                event = await anext(events)
+                if json.loads(event.split("data: ", 1)[1]) != []:
+                    received.append(event)
+                    break
+            await events.aclose()
+            return received
+
+        retry, snapshot, prices = run(scenario())
+        assert retry == "retry: 10\n\n"
+        assert snapshot.startswith("event: snapshot\n")
+        assert json.loads(snapshot.split("data: ", 1)[1])[0]["current_price"] == 1.0
+        assert prices.startswith("event: prices\n")
+        assert json.loads(prices.split("data: ", 1)[1]) == [
+            {
+                "id": "bitcoin",
+                "current_price": 3.0,
+                "price_change_percentage_24h": None,
+            }
+        ]
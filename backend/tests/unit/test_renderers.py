@@ -0,0 +1,25 @@
+import pytest
+import json
+from decimal import Decimal
+from uuid import uuid4
+
+pytest.importorskip("orjson")
+
+from config.renderers import ORJSONRenderer  # noqa: E402
+
+
+@pytest.mark.unit
+class TestORJSONRenderer:
+    def test_render_matches_json(self):
+        favorite_id = uuid4()
+        data = [{"id": favorite_id, "price": Decimal("1.5"), "rank": None}]
+
+        content = ORJSONRenderer().render(None, data, response_status=200)
+
+        assert json.loads(content) == [
+            {"id": str(favorite_id), "price": 1.5, "rank": None}
+        ]
+
+    def test_render_rejects_unknown_types(self):
+        with pytest.raises(TypeError):
+            ORJSONRenderer().render(None, {"value": object()}, response_status=200)
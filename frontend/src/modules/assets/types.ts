@@ -15,4 +15,5 @@ export interface AssetListResponse {
   pageSize: number
   total: number
   hasMore: boolean
+  nextCursor?: string | null
 }
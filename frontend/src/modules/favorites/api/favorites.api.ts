@@ -17,7 +17,7 @@ function syncWatchlistFromFavorites(favorites: FavoriteDto[]) {
 export const favoritesApi = {
   async listFavorites(): Promise<Asset[]> {
     try {
-      const favorites = await http.get<FavoriteDto[]>('/favorites')
+      const favorites = await http.getAllPages<FavoriteDto>('/favorites')
       syncWatchlistFromFavorites(favorites)
       return favorites.map(f => f.asset)
     } catch {
@@ -41,7 +41,7 @@ export const favoritesApi = {
       const isInLocalWatchlist = cryptoService.isInWatchlist(assetId)
 
       if (isInLocalWatchlist && !favoriteIdByAssetId.has(assetId)) {
-        const favorites = await http.get<FavoriteDto[]>('/favorites')
+        const favorites = await http.getAllPages<FavoriteDto>('/favorites')
         syncWatchlistFromFavorites(favorites)
       }
 
@@ -1,5 +1,5 @@
 import { http } from '../../../services/http'
-import type { Portfolio, PortfolioItem } from '../types'
+import type { Portfolio, PortfolioItem, PortfolioSummary } from '../types'
 
 const PORTFOLIO_KEY = 'crypto_portfolio'
 
@@ -10,6 +10,22 @@ type PortfolioItemDto = {
   avg_price: number
 }
 
+type PortfolioSummaryDto = {
+  total_value: number
+  total_cost: number
+  pnl: number
+  pnl_percentage: number | null
+  positions: {
+    id: string
+    asset_id: string
+    symbol: string
+    name: string
+    market_value: number
+    pnl: number
+    weight: number | null
+  }[]
+}
+
 function getPortfolioFromStorage(): PortfolioItem[] {
   if (typeof window === 'undefined') return []
   const stored = localStorage.getItem(PORTFOLIO_KEY)
@@ -37,10 +53,65 @@ function mapDtoToItem(dto: PortfolioItemDto): PortfolioItem {
   }
 }
 
+function summarizeItems(items: PortfolioItem[]): PortfolioSummary {
+  const positions = items.map((item) => {
+    const marketValue = item.quantity * (item.asset.current_price ?? item.avgPrice)
+    return {
+      id: item.id,
+      assetId: item.asset.id,
+      symbol: item.asset.symbol,
+      name: item.asset.name,
+      marketValue,
+      pnl: marketValue - item.quantity * item.avgPrice,
+      weight: null as number | null,
+    }
+  })
+  const totalValue = positions.reduce((sum, position) => sum + position.marketValue, 0)
+  const totalCost = items.reduce((sum, item) => sum + item.quantity * item.avgPrice, 0)
+  const pnl = totalValue - totalCost
+
+  positions.sort((a, b) => b.marketValue - a.marketValue)
+  positions.forEach((position) => {
+    position.weight = totalValue > 0 ? position.marketValue / totalValue : null
+  })
+
+  return {
+    totalValue,
+    totalCost,
+    pnl,
+    pnlPercentage: totalCost > 0 ? (pnl / totalCost) * 100 : null,
+    positions,
+  }
+}
+
 export const portfolioApi = {
+  async getSummary(): Promise<PortfolioSummary> {
+    try {
+      const dto = await http.get<PortfolioSummaryDto>('/portfolio/summary')
+      return {
+        totalValue: dto.total_value,
+        totalCost: dto.total_cost,
+        pnl: dto.pnl,
+        pnlPercentage: dto.pnl_percentage,
+        positions: dto.positions.map((position) => ({
+          id: position.id,
+          assetId: position.asset_id,
+          symbol: position.symbol,
+          name: position.name,
+          marketValue: position.market_value,
+          pnl: position.pnl,
+          weight: position.weight,
+        })),
+      }
+    } catch {
+      return summarizeItems(getPortfolioFromStorage())
+    }
+  },
+
+
   async getPortfolio(): Promise<Portfolio> {
     try {
-      const items = await http.get<PortfolioItemDto[]>('/portfolio')
+      const items = await http.getAllPages<PortfolioItemDto>('/portfolio')
       const mapped = items.map(mapDtoToItem)
       const totalValue = mapped.reduce((sum, item) => sum + (item.totalValue || 0), 0)
       return { items: mapped, totalValue }
@@ -60,7 +131,7 @@ export const portfolioApi = {
     avgPrice: number
   }): Promise<PortfolioItem> {
     try {
-      const existing = await http.get<PortfolioItemDto[]>('/portfolio')
+      const existing = await http.getAllPages<PortfolioItemDto>('/portfolio')
       const found = existing.find(i => i.asset.id === data.assetId)
 
       if (!found) {
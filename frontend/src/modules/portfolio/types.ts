@@ -13,3 +13,21 @@ export interface Portfolio {
   items: PortfolioItem[]
   totalValue?: number
 }
+
+export interface PortfolioPosition {
+  id: string
+  assetId: string
+  symbol: string
+  name: string
+  marketValue: number
+  pnl: number
+  weight: number | null
+}
+
+export interface PortfolioSummary {
+  totalValue: number
+  totalCost: number
+  pnl: number
+  pnlPercentage: number | null
+  positions: PortfolioPosition[]
+}
@@ -58,10 +58,7 @@ function buildUrlWithParams(baseUrl: string, params?: Record<string, string | nu
   return baseUrl + (baseUrl.includes('?') ? '&' : '?') + queryString
 }
 
-export async function httpRequest<T>(
-  endpoint: string,
-  options: HttpRequestOptions = {}
-): Promise<T> {
+async function send(endpoint: string, options: HttpRequestOptions = {}): Promise<Response> {
   let url = endpoint.startsWith('http') ? endpoint : `${API_BASE_URL}${endpoint}`
   const { params, ...fetchOptions } = options
   url = buildUrlWithParams(url, params)
@@ -86,7 +83,7 @@ export async function httpRequest<T>(
       )
     }
 
-    return await parseResponse<T>(response)
+    return response
   } catch (error) {
     if (error instanceof HttpError) {
       throw error
@@ -95,10 +92,41 @@ export async function httpRequest<T>(
   }
 }
 
+export async function httpRequest<T>(
+  endpoint: string,
+  options: HttpRequestOptions = {}
+): Promise<T> {
+  return await parseResponse<T>(await send(endpoint, options))
+}
+
+const NEXT_CURSOR_HEADER = 'X-Next-Cursor'
+
+// List endpoints return one page per request and the next page's cursor in
+// a header; follow it until the last page.
+export async function httpRequestAllPages<T>(
+  endpoint: string,
+  options: HttpRequestOptions = {}
+): Promise<T[]> {
+  const items: T[] = []
+  let cursor: string | null = null
+  do {
+    const params: Record<string, string | number> = cursor
+      ? { ...options.params, cursor }
+      : { ...options.params }
+    const response = await send(endpoint, { ...options, method: 'GET', params })
+    items.push(...(await parseResponse<T[]>(response)))
+    cursor = response.headers.get(NEXT_CURSOR_HEADER)
+  } while (cursor)
+  return items
+}
+
 export const http = {
   get: <T>(endpoint: string, options?: HttpRequestOptions) =>
     httpRequest<T>(endpoint, { ...options, method: 'GET' }),
 
+  getAllPages: <T>(endpoint: string, options?: HttpRequestOptions) =>
+    httpRequestAllPages<T>(endpoint, options),
+
   post: <T>(endpoint: string, data?: unknown, options?: HttpRequestOptions) =>
     httpRequest<T>(endpoint, {
       ...options,